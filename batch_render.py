@@ -0,0 +1,159 @@
+"""
+Пакетный рендер графиков без GUI (без Qt).
+Каждая спецификация - набор полей ApplicationState; для нее вызывается
+processing.get_plot_data, результат рисуется в стиле MplCanvas (core.plot_style)
+на backend Agg и сохраняется в файл. Спецификации распределяются по пулу процессов,
+в каждом процессе одновременно строится одна фигура.
+
+Запуск:  python batch_render.py specs.json [-o plots] [-j 4] [--format png] [--dpi 150]
+
+Файл спецификаций (JSON или YAML, если установлен PyYAML):
+  [ {"name": "day200", "stdbinning": "P3L4E4", "lb": 4, "eb": 4, "pitchb": 3,
+     "pam_pers": [200], "l": [1.2], "pitch": [50, 60]}, ... ]
+или {"defaults": {...общие поля...}, "plots": [ {...}, ... ]}.
+pam_pers можно задать диапазоном: {"first": 200, "last": 230}.
+Служебные поля: name (имя файла), title, width, height.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+matplotlib.use('Agg')
+
+SERVICE_FIELDS = ('name', 'title', 'width', 'height')
+
+
+def load_specs(path):
+    """Список спецификаций из JSON/YAML (поля defaults подставляются в каждую)."""
+    with open(path, 'r', encoding='utf-8') as f:
+        text = f.read()
+    if os.path.splitext(path)[1].lower() in ('.yaml', '.yml'):
+        try:
+            import yaml
+        except ImportError:
+            raise SystemExit("Для YAML-спецификаций нужен PyYAML (pip install pyyaml) или используйте JSON.")
+        data = yaml.safe_load(text)
+    else:
+        data = json.loads(text)
+
+    if isinstance(data, dict):
+        defaults, plots = data.get('defaults', {}), data.get('plots', [])
+    else:
+        defaults, plots = {}, data
+    specs = []
+    for i, spec in enumerate(plots):
+        merged = dict(defaults, **spec)
+        merged.setdefault('name', f"plot_{i:04d}")
+        specs.append(merged)
+    return specs
+
+
+def _expand_days(value):
+    if isinstance(value, dict):
+        return list(range(int(value['first']), int(value['last']) + 1))
+    if isinstance(value, (int, float)):
+        return [int(value)]
+    return [int(d) for d in value]
+
+
+def make_state(spec):
+    """ApplicationState из спецификации (неизвестные поля - предупреждение в update_multiple)."""
+    from core.state import ApplicationState
+    fields = {k: v for k, v in spec.items() if k not in SERVICE_FIELDS}
+    if 'pam_pers' in fields:
+        fields['pam_pers'] = _expand_days(fields['pam_pers'])
+    app_state = ApplicationState()
+    app_state.update_multiple(**fields)
+    return app_state
+
+
+def render_spec(spec, out_dir, fmt='png', dpi=150):
+    """
+    Строит один график. Возвращает (name, путь или None, сообщение).
+    Фигура создается без pyplot и освобождается сразу после сохранения.
+    """
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from core import processing, plot_style
+
+    name = str(spec['name'])
+    t0 = time.perf_counter()
+    try:
+        app_state = make_state(spec)
+        plot_data_list = processing.get_plot_data(app_state, ax_index=0)
+    except Exception as e:
+        return name, None, f"ошибка обработки: {e}"
+    if not plot_data_list:
+        return name, None, "нет данных (processing вернул пустой список)"
+
+    plot_style.apply_rc()
+    fig = Figure(figsize=(spec.get('width', 7), spec.get('height', 5)), dpi=dpi)
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot(1, 1, 1)
+    fig.tight_layout(pad=2.5)  # как MplCanvas.set_layout_mode: раскладка до отрисовки данных
+    for plot_data in plot_data_list:
+        if spec.get('title'): plot_data = dict(plot_data, title=spec['title'])
+        plot_style.draw_plot_data(ax, plot_data)
+    path = os.path.join(out_dir, f"{name}.{fmt}")
+    fig.savefig(path, format=fmt)
+    fig.clf()
+    return name, path, f"{time.perf_counter() - t0:.2f} s"
+
+
+def _render_task(task):
+    """Воркер пула: (spec, out_dir, fmt, dpi, base, verbose)."""
+    spec, out_dir, fmt, dpi, base, verbose = task
+    if base:
+        from core import config
+        config.BASE_DATA_PATH = base
+    if verbose:
+        return render_spec(spec, out_dir, fmt, dpi)
+    # Консольный лог ядра (diagnostics._StdoutHandler пишет в текущий sys.stdout) и оставшиеся print
+    # подавляются; кольцевой буфер лога не затрагивается, итог печатает родительский процесс
+    import io
+    import contextlib
+    with contextlib.redirect_stdout(io.StringIO()):
+        return render_spec(spec, out_dir, fmt, dpi)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Пакетный рендер графиков PAMELA без GUI")
+    parser.add_argument('specs', help="JSON/YAML со списком спецификаций")
+    parser.add_argument('-o', '--out', default='plots', help="папка для изображений")
+    parser.add_argument('-j', '--workers', type=int, default=0, help="число процессов (0 - по числу ядер)")
+    parser.add_argument('--format', default='png', help="png, pdf, svg ...")
+    parser.add_argument('--dpi', type=int, default=150)
+    parser.add_argument('--base', default=None, help="корень данных (по умолчанию config.BASE_DATA_PATH)")
+    parser.add_argument('-v', '--verbose', action='store_true', help="не подавлять вывод ядра")
+    args = parser.parse_args(argv)
+
+    specs = load_specs(args.specs)
+    if not specs:
+        print("Спецификации не найдены.")
+        return 1
+    os.makedirs(args.out, exist_ok=True)
+    workers = args.workers or min(len(specs), os.cpu_count() or 1)
+    tasks = [(spec, args.out, args.format, args.dpi, args.base, args.verbose) for spec in specs]
+
+    t0 = time.perf_counter()
+    if workers <= 1:
+        results = [_render_task(t) for t in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_render_task, tasks))
+
+    failed = 0
+    for name, path, message in results:
+        if path is None: failed += 1
+        print(f"{'OK ' if path else 'ERR'} {name}: {path or ''} ({message})")
+    print(f"Готово: {len(results) - failed} из {len(results)} графиков за "
+          f"{time.perf_counter() - t0:.1f} s ({workers} процесс(а)).")
+    return 0 if failed == 0 else 2
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,71 @@
+"""
+Бенчмарк: выборочный читатель core.mat_reader против loadmat (текущий путь).
+Проверяет побайтовое совпадение Jday/dJday (dtype, форма, порядок, байты) и печатает ускорение.
+
+Запуск:  python benchmarks/bench_mat_reader.py [файлы или папки ...]
+По умолчанию - все RBflux-файлы из data/ проекта.
+"""
+import os
+import sys
+import glob
+import time
+from scipy.io import loadmat
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core import config
+from core import mat_reader
+
+
+def _collect(args):
+    paths = []
+    for a in args or [config.UI_DATA_PATH]:
+        if os.path.isdir(a):
+            paths += glob.glob(os.path.join(a, '**', 'RBflux*.mat'), recursive=True)
+        else:
+            paths.append(a)
+    return sorted(paths)
+
+
+def _same(a, b):
+    if a is None or b is None: return a is b
+    return (a.dtype == b.dtype and a.shape == b.shape and
+            a.flags.f_contiguous == b.flags.f_contiguous and
+            a.tobytes(order='A') == b.tobytes(order='A'))
+
+
+def _best_of(func, path, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        func(path)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main(argv=None):
+    paths = _collect(argv if argv is not None else sys.argv[1:])
+    if not paths:
+        print("RBflux-файлы не найдены.")
+        return 1
+    repeat = 5
+    full = lambda p: loadmat(p, squeeze_me=True, struct_as_record=False)
+    total_old = total_new = 0.0
+    all_same = True
+    print(f"{'file':<60} {'loadmat, ms':>12} {'fast, ms':>10} {'x':>6}  identical")
+    for p in paths:
+        old = full(p); new = mat_reader.load_flux_mat(p)
+        same = all(_same(old.get(k), new.get(k)) for k in ('Jday', 'dJday'))
+        all_same &= same
+        t_old = _best_of(full, p, repeat)
+        t_new = _best_of(mat_reader.load_flux_mat, p, repeat)
+        total_old += t_old; total_new += t_new
+        name = os.path.relpath(p, config.PROJECT_ROOT) if p.startswith(config.PROJECT_ROOT) else p
+        print(f"{name[-60:]:<60} {t_old * 1e3:12.2f} {t_new * 1e3:10.2f} {t_old / t_new:6.1f}  {same}")
+    print(f"ИТОГО: loadmat {total_old * 1e3:.1f} ms, fast {total_new * 1e3:.1f} ms, "
+          f"ускорение x{total_old / total_new:.1f}, совпадение: {all_same}")
+    return 0 if all_same else 2
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,85 @@
+"""
+Бенчмарк: векторная свертка блока дней (core.reduction.reduce_spectra_block)
+против прежнего цикла по дням (два последовательных fancy-индекса + nanmean/nansum на день).
+Проверяет совпадение результатов (с точностью float32: порядок суммирования
+в блоке может отличаться в последнем знаке) и печатает время для 10, 100 и 1000 дней.
+
+Запуск:  python benchmarks/bench_reduction.py [--shape L E P] [--days 10 100 1000]
+"""
+import os
+import sys
+import time
+import argparse
+import warnings
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.reduction import reduce_spectra_block
+
+
+def _reduce_loop(j_block, dj_block, l_indices, p_indices, n_E):
+    """Прежний путь processing._get_spectra_data: срез и свертка каждого дня отдельно."""
+    ys, errs = [], []
+    for j_data, dj_data in zip(j_block, dj_block):
+        subset_j = j_data[l_indices, :n_E, :]
+        subset_j = subset_j[:, :, p_indices]
+        subset_dj = dj_data[l_indices, :n_E, :]
+        subset_dj = subset_dj[:, :, p_indices]
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            ys.append(np.nanmean(subset_j, axis=(0, 2)))
+            errs.append(np.sqrt(np.nansum(subset_dj**2, axis=(0, 2))) / np.sum(~np.isnan(subset_j), axis=(0, 2)))
+    return np.array(ys), np.array(errs)
+
+
+def _make_block(n_days, shape, seed=0, nan_fraction=0.3):
+    rng = np.random.default_rng(seed)
+    j = rng.lognormal(0.0, 2.0, (n_days,) + shape).astype(np.float32)
+    j[rng.random(j.shape) < nan_fraction] = np.nan
+    dj = (j * 0.1).astype(np.float32)
+    return j, dj
+
+
+def _best_of(func, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Свертка спектров: цикл по дням против блока")
+    parser.add_argument('--shape', type=int, nargs=3, default=[40, 30, 20], metavar=('L', 'E', 'P'))
+    parser.add_argument('--days', type=int, nargs='+', default=[10, 100, 1000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    shape = tuple(args.shape)
+    n_E = shape[1] - 1  # последний E-бин (overflow) не используется
+    cases = {
+        'L одиночный, P диапазон': (np.array([3]), np.arange(5, 12)),
+        'L/P разреженные':         (np.array([1, 4, 9, 20]), np.array([0, 3, 7, 15])),
+        'все L и P':               (np.arange(shape[0]), np.arange(shape[2])),
+    }
+    all_same = True
+    print(f"Ячейка дня (L, E, P) = {shape}")
+    print(f"{'days':>6}  {'выборка':<24} {'loop, ms':>10} {'block, ms':>10} {'x':>6}  identical")
+    for n_days in args.days:
+        j, dj = _make_block(n_days, shape)
+        for name, (l_idx, p_idx) in cases.items():
+            y_old, e_old = _reduce_loop(j, dj, l_idx, p_idx, n_E)
+            y_new, e_new, _ = reduce_spectra_block(j, dj, l_idx, p_idx, n_E)
+            same = (np.allclose(y_old, y_new, rtol=1e-5, equal_nan=True) and
+                    np.allclose(e_old, e_new, rtol=1e-5, equal_nan=True))
+            all_same &= same
+            t_old = _best_of(lambda: _reduce_loop(j, dj, l_idx, p_idx, n_E), args.repeat)
+            t_new = _best_of(lambda: reduce_spectra_block(j, dj, l_idx, p_idx, n_E), args.repeat)
+            print(f"{n_days:>6}  {name:<24} {t_old * 1e3:10.2f} {t_new * 1e3:10.2f} {t_old / t_new:6.1f}  {same}")
+    return 0 if all_same else 2
+
+
+if __name__ == '__main__':
+    sys.exit(main())
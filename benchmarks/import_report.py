@@ -0,0 +1,71 @@
+"""
+Отчет о времени импорта: какой модуль сколько тратит при старте.
+Каждая цель импортируется в отдельном интерпретаторе с `python -X importtime`,
+плюс отдельно замеряется первое обращение к ленивым таблицам config (BIN_INFO).
+
+Запуск:  python benchmarks/import_report.py [модуль ...] [--top N]
+По умолчанию: core.processing (безголовый путь) и desktop_app.main (GUI).
+"""
+import os
+import sys
+import argparse
+import subprocess
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_TARGETS = ['core.processing', 'desktop_app.main']
+PROJECT_PACKAGES = ('core', 'desktop_app')
+
+
+def measure(module):
+    """Список (модуль, self_us, cumulative_us) из вывода -X importtime. None при ошибке импорта."""
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                          cwd=PROJECT_ROOT, capture_output=True, text=True)
+    if proc.returncode != 0:
+        last = proc.stderr.strip().splitlines()[-1:] or ['?']
+        print(f"  [!] {module}: импорт не удался ({last[0]})")
+        return None
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line: continue
+        parts = line[len('import time:'):].split('|')
+        if len(parts) != 3: continue
+        rows.append((parts[2].strip(), int(parts[0]), int(parts[1])))
+    return rows
+
+
+def measure_lazy_tables():
+    code = ("import time; from core import config; t=time.perf_counter(); config.BIN_INFO; "
+            "print(f'{(time.perf_counter()-t)*1e3:.1f}')")
+    proc = subprocess.run([sys.executable, '-c', code], cwd=PROJECT_ROOT, capture_output=True, text=True)
+    return proc.stdout.strip() if proc.returncode == 0 else None
+
+
+def report(module, top):
+    rows = measure(module)
+    if rows is None: return
+    total = max((r[2] for r in rows if r[0] == module), default=sum(r[1] for r in rows))
+    print(f"\n=== {module}: всего {total / 1e3:.1f} ms ===")
+    own = [r for r in rows if r[0].split('.')[0] in PROJECT_PACKAGES]
+    print("  Модули проекта (self / cumulative, ms):")
+    for name, self_us, cum_us in sorted(own, key=lambda r: -r[1])[:top]:
+        print(f"    {name:<45} {self_us / 1e3:8.1f} {cum_us / 1e3:10.1f}")
+    tops = [r for r in rows if '.' not in r[0].strip() and r[0].split('.')[0] not in PROJECT_PACKAGES]
+    print("  Внешние пакеты верхнего уровня (cumulative, ms):")
+    for name, _, cum_us in sorted(tops, key=lambda r: -r[2])[:top]:
+        print(f"    {name:<45} {cum_us / 1e3:10.1f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('modules', nargs='*', default=DEFAULT_TARGETS)
+    parser.add_argument('--top', type=int, default=10)
+    args = parser.parse_args(argv)
+    for module in args.modules:
+        report(module, args.top)
+    lazy = measure_lazy_tables()
+    if lazy is not None:
+        print(f"\nПервое обращение к config.BIN_INFO: {lazy} ms (не входит во время импорта)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,203 @@
+"""
+Набор бенчмарков обработки: поиск файлов, загрузка, срез, свертка, отрисовка - отдельно.
+Данные: существующее дерево (--data) или синтетическое (benchmarks/synthetic.py) во временной папке.
+Результат пишется в JSON (машиночитаемо); с --compare сравнивается с прошлым прогоном,
+замедление этапа больше порога (--threshold) дает код выхода 3.
+
+Запуск:  python benchmarks/run_benchmarks.py [--days 1000] [--binning P3L4E4] [-o results.json]
+                                            [--data ROOT] [--compare old.json]
+"""
+import io
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import contextlib
+import subprocess
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core import config
+
+
+def _timed(func, repeat=3, setup=None):
+    """Лучшее время из repeat запусков (setup перед каждым, не учитывается). Возвращает (t, результат)."""
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        if setup: setup()
+        t0 = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def _git_commit():
+    try:
+        out = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=config.PROJECT_ROOT,
+                             capture_output=True, text=True)
+        return out.stdout.strip() or None
+    except OSError:
+        return None
+
+
+class _State:
+    """Минимальный набор полей ApplicationState для file_manager/processing (без сигналов и print)."""
+
+    def __init__(self, days, binn, geo='RB3', sel='ItalianH', ver='v09'):
+        p, l, e = (int(x) for x in (binn[binn.index('P') + 1:binn.index('L')],
+                                     binn[binn.index('L') + 1:binn.index('E')],
+                                     binn[binn.index('E') + 1:]))
+        self.pam_pers = list(days)
+        self.geo_selection, self.selection, self.flux_version, self.stdbinning = geo, sel, ver, binn
+        self.pitchb, self.lb, self.eb = p, l, e
+        self.ror_e, self.plot_kind = 1, 1
+        self.l, self.pitch = [], []
+        self.l_max, self.pitch_max, self.e, self.e_max = [], [], [], []
+
+
+def run(base, days, binn, repeat=3):
+    from core import manifest, file_manager, loader, processing, reduction, plot_style, mat_cache
+    quiet = contextlib.redirect_stdout(io.StringIO())
+    st = _State(days, binn)
+    results = {}
+
+    # --- discover: манифест (холодный скан) и разрешение дней; старый перебор путей ---
+    t, man = _timed(lambda: manifest.FluxManifest.build(base), repeat)
+    t_resolve, day_files = _timed(lambda: man.resolve('RB3', 'ItalianH', 'v09', binn, st.pam_pers), repeat)
+    with quiet:
+        t_probe, _ = _timed(lambda: file_manager._probe_day_files(base, 'RB3', 'ItalianH', 'v09', binn,
+                                                                  st.pam_pers), 1)
+    paths = [p for _, p in day_files]
+    n_bytes = sum(os.path.getsize(p) for p in paths)
+    results['discover'] = {'seconds': t + t_resolve, 'scan_seconds': t, 'resolve_seconds': t_resolve,
+                           'legacy_probe_seconds': t_probe, 'items': len(paths)}
+
+    # --- load: декодирование всех файлов (холодный кэш), последовательно и пулом ---
+    clear = config.MAT_CACHE.clear
+    t_serial, blocks = _timed(lambda: [loader.load_flux_day(p) for p in paths], 1, clear)
+    t_pool, _ = _timed(lambda: list(loader.map_ordered(loader.load_flux_day, paths)), repeat, clear)
+    results['load'] = {'seconds': t_pool, 'serial_seconds': t_serial, 'items': len(paths),
+                       'bytes_read': n_bytes,
+                       'bytes_decoded': sum(mat_cache.estimate_nbytes(j) for j, _ in blocks)}
+
+    # --- slice / reduce: блок (days, L, E, P) ---
+    j_block = np.stack([j for j, _ in blocks]); dj_block = np.stack([dj for _, dj in blocks])
+    n_E = j_block.shape[2] - 1
+    l_idx = np.arange(min(2, j_block.shape[1])); p_idx = np.arange(j_block.shape[3] // 4, j_block.shape[3] // 2)
+    t_slice, _ = _timed(lambda: reduction.select_block(j_block, l_idx, p_idx, n_E).copy(), repeat)
+    results['slice'] = {'seconds': t_slice, 'items': len(paths), 'block_shape': list(j_block.shape)}
+
+    def _reduce():
+        y, y_err, _ = reduction.reduce_spectra_block(j_block, dj_block, l_idx, p_idx, n_E)
+        acc = reduction.SpectrumAccumulator()
+        for row, err in zip(y, y_err): acc.add(row, err)
+        return acc.result()
+    t_reduce, _ = _timed(_reduce, repeat)
+    results['reduce'] = {'seconds': t_reduce, 'items': len(paths)}
+
+    # --- end-to-end: processing.get_plot_data без дисковых кэшей (холодный и теплый MAT_CACHE) ---
+    saved = (config.USE_SPECTRA_CACHE, config.USE_MISSION_CUBE, config.USE_ROLLUPS)
+    config.USE_SPECTRA_CACHE = config.USE_MISSION_CUBE = config.USE_ROLLUPS = False
+    try:
+        with quiet:
+            t_cold, plot_data = _timed(lambda: processing.get_plot_data(st), 1, clear)
+            t_warm, _ = _timed(lambda: processing.get_plot_data(st), repeat)
+    finally:
+        config.USE_SPECTRA_CACHE, config.USE_MISSION_CUBE, config.USE_ROLLUPS = saved
+    results['processing'] = {'seconds': t_cold, 'warm_seconds': t_warm, 'items': len(paths)}
+
+    # --- render: Agg, стиль MplCanvas ---
+    import matplotlib
+    matplotlib.use('Agg')
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    def _render():
+        plot_style.apply_rc()
+        fig = Figure(figsize=(7, 5), dpi=100)
+        FigureCanvasAgg(fig)
+        ax = fig.add_subplot(1, 1, 1)
+        for pd in plot_data: plot_style.draw_plot_data(ax, pd)
+        buf = io.BytesIO()
+        fig.savefig(buf, format='png')
+        return buf.tell()
+    t_render, png_bytes = _timed(_render, repeat) if plot_data else (float('nan'), 0)
+    results['render'] = {'seconds': t_render, 'items': len(plot_data or []), 'bytes': png_bytes}
+    return results
+
+
+def compare(results, old_path, threshold):
+    """Печать отношения времен к прошлому прогону. Возвращает список этапов с регрессией."""
+    with open(old_path) as f:
+        old = json.load(f).get('results', {})
+    regressions = []
+    print(f"\nСравнение с {old_path} (порог x{threshold:.2f}):")
+    for stage, r in results.items():
+        if stage not in old or not old[stage].get('seconds'): continue
+        ratio = r['seconds'] / old[stage]['seconds']
+        flag = 'РЕГРЕССИЯ' if ratio > threshold else ''
+        if flag: regressions.append(stage)
+        print(f"  {stage:<12} {old[stage]['seconds'] * 1e3:10.2f} -> {r['seconds'] * 1e3:10.2f} ms  x{ratio:5.2f} {flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Бенчмарки этапов обработки PAMELA")
+    parser.add_argument('--data', default=None, help="существующее дерево данных (иначе синтетическое)")
+    parser.add_argument('--days', type=int, default=1000, help="число дней синтетического дерева")
+    parser.add_argument('--first', type=int, default=1)
+    parser.add_argument('--binning', default='P3L4E4')
+    parser.add_argument('--layout', choices=('new', 'old', 'mixed'), default='mixed')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('-o', '--output', default=None, help="JSON с результатами")
+    parser.add_argument('--compare', default=None, help="JSON прошлого прогона")
+    parser.add_argument('--threshold', type=float, default=1.25, help="допустимое замедление")
+    parser.add_argument('--keep', action='store_true', help="не удалять синтетическое дерево")
+    args = parser.parse_args(argv)
+
+    tmp = None
+    base = args.data
+    if base is None:
+        from synthetic import generate
+        tmp = base = tempfile.mkdtemp(prefix='pamela_bench_')
+        gen = generate(base, args.days, args.first, binnings=(args.binning,), layout=args.layout)
+        print(f"Синтетическое дерево: {gen['files']} файлов, {gen['bytes'] / 2**20:.1f} MB ({gen['seconds']:.1f} s)")
+    # Дисковые кэши бенчмарка не смешиваются с кэшами проекта
+    config.BASE_DATA_PATH = base
+    config.CACHE_PATH = tempfile.mkdtemp(prefix='pamela_bench_cache_')
+    config.CUBE_PATH = os.path.join(config.CACHE_PATH, 'cubes')
+    config.SPECTRA_CACHE_PATH = os.path.join(config.CACHE_PATH, 'spectra')
+    config.ROLLUP_PATH = os.path.join(config.CACHE_PATH, 'rollups')
+
+    try:
+        days = range(args.first, args.first + args.days)
+        results = run(base, days, args.binning, args.repeat)
+    finally:
+        shutil.rmtree(config.CACHE_PATH, ignore_errors=True)
+        if tmp and not args.keep: shutil.rmtree(tmp, ignore_errors=True)
+
+    report = {'meta': {'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'), 'commit': _git_commit(),
+                       'python': platform.python_version(), 'numpy': np.__version__,
+                       'platform': platform.platform(), 'cpu_count': os.cpu_count(),
+                       'data': args.data or 'synthetic', 'days': args.days, 'binning': args.binning,
+                       'loader': {'executor': config.LOADER_EXECUTOR, 'workers': config.LOADER_WORKERS}},
+              'results': results}
+    print(f"\n{'этап':<12} {'ms':>10} {'items':>7}")
+    for stage, r in results.items():
+        print(f"{stage:<12} {r['seconds'] * 1e3:10.2f} {r.get('items', ''):>7}")
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=1)
+        print(f"Результаты: {args.output}")
+    if args.compare and compare(results, args.compare, args.threshold):
+        return 3
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
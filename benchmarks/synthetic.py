@@ -0,0 +1,157 @@
+"""
+Генератор синтетического дерева RBflux-файлов масштаба миссии.
+Форма ячейки дня (L, E, P) берется из BinningInfo.mat по имени биннинга (P<p>L<l>E<e>),
+поэтому синтетические файлы подходят к настоящим bin edges и к processing.
+Потоки - степенной спектр по энергии с зависимостью от L и pitch, NaN-разреженность
+растет к высоким энергиям и малым питч-углам, часть дней пропущена целиком.
+
+Раскладки (обе понимает file_manager / core.manifest):
+  new   - <out>/dirflux_newStructure/<geo>/days/day_<d>/<sel>/Loc/Fluxdata/<ver>/
+  old   - <out>/<geo>/days/day_<d>/<sel>/Loc/Fluxdata/<ver>/
+  mixed - дни попеременно в обеих раскладках
+
+Запуск:  python benchmarks/synthetic.py OUT [--days 3000] [--first 1] [--versions v09 v08]
+                                          [--binnings P3L4E4 P3L3E2] [--layout mixed]
+"""
+import os
+import sys
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core import config
+
+LAYOUT_PREFIX = {'new': ('dirflux_newStructure',), 'old': ()}
+
+
+def parse_binning(binn):
+    """'P3L4E4' -> (p, l, e) (номера строк BinningInfo, с 1)."""
+    p = binn.index('P'); l = binn.index('L'); e = binn.index('E')
+    return int(binn[p + 1:l]), int(binn[l + 1:e]), int(binn[e + 1:])
+
+
+def cell_shape(binn):
+    """Форма Jday (L, E, P) для стандартного биннинга."""
+    p, l, e = parse_binning(binn)
+    info = config.BIN_INFO
+    return (len(info['Lbin'][l - 1]) - 1, len(info['Ebin'][e - 1]) - 1, len(info['pitchbin'][p - 1]) - 1)
+
+
+def day_dir(out, layout, geo, sel, ver, day):
+    return os.path.join(out, *LAYOUT_PREFIX[layout], geo, 'days', f'day_{day}', sel, 'Loc', 'Fluxdata', ver)
+
+
+def synth_day(binn, day, seed, nan_fraction=0.1, passages=0):
+    """Словарь переменных RBflux-файла одного дня (как в настоящих файлах, float32/uint16)."""
+    from numpy.random import default_rng
+    rng = default_rng([seed, day, sum(map(ord, binn))])
+    p, l, e = parse_binning(binn)
+    info = config.BIN_INFO
+    shape = cell_shape(binn)
+    e_c = np.asarray(info['Ecenters'][e - 1][:shape[1]], dtype=np.float64)
+    l_c = np.asarray(info['Lcenters'][l - 1][:shape[0]], dtype=np.float64)
+    p_c = np.asarray(info['pitchcenters'][p - 1][:shape[2]], dtype=np.float64)
+
+    # Степенной спектр E^-2.7, спад с L, максимум у 90 градусов, суточная модуляция
+    modulation = 1.0 + 0.2 * np.sin(2 * np.pi * day / 27.0)
+    j = (1e-2 * modulation * e_c[None, :, None] ** -2.7 * l_c[:, None, None] ** -3.0 *
+         (0.2 + np.sin(np.radians(p_c))[None, None, :] ** 2))
+    numev = rng.poisson(np.clip(j * 5e3, 0.1, 5e4)).astype(np.uint16)
+    lt = rng.uniform(50.0, 500.0, shape).astype(np.float32)
+    j = j * rng.lognormal(0.0, 0.15, shape)
+
+    # NaN: чаще на высоких энергиях и малых питч-углах
+    e_w = np.linspace(0.5, 1.5, shape[1])[None, :, None]
+    p_w = (1.5 - np.sin(np.radians(p_c)))[None, None, :]
+    nan_mask = rng.random(shape) < np.clip(nan_fraction * e_w * p_w, 0.0, 0.95)
+    nan_mask |= numev == 0
+    j[nan_mask] = np.nan
+    with np.errstate(divide='ignore', invalid='ignore'):
+        dj = j / np.sqrt(np.maximum(numev, 1))
+
+    mat = {'Jday': np.asfortranarray(j, dtype=np.float32),
+           'dJday': np.asfortranarray(dj, dtype=np.float32),
+           'numevday': np.asfortranarray(numev),
+           'LTpitchday': np.asfortranarray(lt)}
+    if passages:
+        cells = {k: np.empty((1, passages), dtype=object) for k in ('J', 'dJ', 'LTpitchp', 'numevu')}
+        weights = rng.dirichlet(np.ones(passages))
+        for i in range(passages):
+            jp = (j * rng.lognormal(0.0, 0.3, shape)).astype(np.float32)
+            cells['J'][0, i] = jp
+            cells['dJ'][0, i] = (jp * 0.2).astype(np.float32)
+            cells['LTpitchp'][0, i] = (lt * weights[i]).astype(np.float32)
+            cells['numevu'][0, i] = np.round(numev * weights[i]).astype(np.uint16)
+        mat.update(cells)
+    return mat
+
+
+def _write_day(task):
+    from scipy.io import savemat
+    out, layout, geo, sel, versions, binnings, day, seed, nan_fraction, passages, compress = task
+    written = 0
+    for ver in versions:
+        d = day_dir(out, layout, geo, sel, ver, day)
+        os.makedirs(d, exist_ok=True)
+        for binn in binnings:
+            path = os.path.join(d, f'RBflux_{day}_stdbinning_{binn}.mat')
+            savemat(path, synth_day(binn, day, seed, nan_fraction, passages), do_compression=compress)
+            written += os.path.getsize(path)
+    return written
+
+
+def generate(out, n_days=1000, first=1, versions=('v09',), binnings=('P3L4E4',), geo='RB3',
+             sel='ItalianH', layout='new', nan_fraction=0.1, missing_fraction=0.02, passages=0,
+             compress=True, seed=0, workers=0):
+    """
+    Пишет дерево и возвращает сводку {'days': [...], 'files': N, 'bytes': N, 'seconds': t}.
+    missing_fraction - доля дней без файлов (пропуски миссии).
+    """
+    rng = np.random.default_rng(seed)
+    days = [d for d in range(first, first + n_days) if rng.random() >= missing_fraction]
+    layouts = ['new', 'old'] if layout == 'mixed' else [layout]
+    tasks = [(out, layouts[i % len(layouts)], geo, sel, tuple(versions), tuple(binnings), day,
+              seed, nan_fraction, passages, compress) for i, day in enumerate(days)]
+    config.BIN_INFO  # таблицы биннинга загружаются до форка воркеров
+    t0 = time.perf_counter()
+    workers = workers or min(8, os.cpu_count() or 1)
+    if workers <= 1:
+        total = sum(map(_write_day, tasks))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            total = sum(pool.map(_write_day, tasks, chunksize=max(1, len(tasks) // (workers * 8))))
+    return {'days': days, 'files': len(days) * len(versions) * len(binnings), 'bytes': total,
+            'seconds': time.perf_counter() - t0}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Синтетическое дерево RBflux-файлов")
+    parser.add_argument('out', help="корень создаваемых данных")
+    parser.add_argument('--days', type=int, default=1000)
+    parser.add_argument('--first', type=int, default=1, help="первый pam-день")
+    parser.add_argument('--versions', nargs='+', default=['v09'])
+    parser.add_argument('--binnings', nargs='+', default=['P3L4E4'])
+    parser.add_argument('--geo', default='RB3')
+    parser.add_argument('--selection', default='ItalianH')
+    parser.add_argument('--layout', choices=('new', 'old', 'mixed'), default='new')
+    parser.add_argument('--nan', type=float, default=0.1, help="базовая доля NaN-ячеек")
+    parser.add_argument('--missing', type=float, default=0.02, help="доля пропущенных дней")
+    parser.add_argument('--passages', type=int, default=0, help="число пролетов (ячейки J/dJ/LTpitchp)")
+    parser.add_argument('--no-compress', action='store_true')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('-j', '--workers', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    s = generate(args.out, args.days, args.first, args.versions, args.binnings, args.geo,
+                 args.selection, args.layout, args.nan, args.missing, args.passages,
+                 not args.no_compress, args.seed, args.workers)
+    print(f"Записано {s['files']} файлов ({len(s['days'])} дней, {s['bytes'] / 2**20:.1f} MB) "
+          f"за {s['seconds']:.1f} s в {args.out}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,115 @@
+"""
+Таблицы выбора бинов по L, Pitch и E.
+Границы строки биннинга (config.BIN_INFO['Lbin'|'pitchbin'|'Ebin'][row-1]) и уже
+посчитанные наборы индексов кэшируются, поэтому повторный выбор не делает searchsorted.
+
+Выбор задается как в app_state: значения min (l, pitch, e) и, если есть, max (l_max, ...):
+  [1.2]                  - бин, содержащий 1.2;
+  [1.1, 2.0], [1.5, 3.0] - объединение диапазонов [1.1, 1.5] и [2.0, 3.0];
+  [-1]                   - все бины ('All');
+  []                     - первый бин (как раньше в processing._find_bin_indices).
+Пара (min, max) с max <= min - не диапазон: берется бин min.
+Диапазон берет бины, перекрытые им больше чем на RANGE_OVERLAP ширины бина
+(значения из диалогов биннинга округлены до 3-4 знаков).
+"""
+import threading
+import numpy as np
+from . import config
+
+AXIS_KEYS = {'L': 'Lbin', 'pitch': 'pitchbin', 'E': 'Ebin'}
+RANGE_OVERLAP = 0.01  # доля ширины бина
+ALL = -1
+
+_LOOKUPS = {}
+_LOCK = threading.Lock()
+
+
+def _as_list(values):
+    if values is None: return []
+    if isinstance(values, np.ndarray): return values.ravel().tolist()
+    if isinstance(values, (list, tuple)): return list(values)
+    return [values]
+
+
+class BinLookup:
+    """Границы одной строки биннинга и кэш выбранных по ним наборов индексов."""
+
+    def __init__(self, edges):
+        self.edges = np.asarray(edges, dtype=np.float64).ravel()
+        self.edges.flags.writeable = False
+        self.n_bins = len(self.edges) - 1
+        self._compiled = {}
+
+    def _point(self, value):
+        i = int(np.searchsorted(self.edges, value, side='right')) - 1
+        return min(max(i, 0), self.n_bins - 1)
+
+    def _range(self, lo, hi):
+        left, right = self.edges[:-1], self.edges[1:]
+        overlap = np.minimum(right, hi) - np.maximum(left, lo)
+        hit = np.flatnonzero(overlap > RANGE_OVERLAP * (right - left))
+        if len(hit) == 0: return [self._point(lo)]  # диапазон уже бина или вне сетки
+        return hit.tolist()
+
+    def _compile(self, mins, maxs):
+        if not mins: return np.array([0], dtype=np.intp)
+        if ALL in mins: return np.arange(self.n_bins, dtype=np.intp)
+        idx = set()
+        ranges = len(maxs) == len(mins)  # max учитываются только парами к min
+        for k, lo in enumerate(mins):
+            # Диапазон - только пара lo < hi (иначе max - остаток другого выбора, берется бин lo)
+            if ranges and maxs[k] is not None and float(maxs[k]) > float(lo):
+                idx.update(self._range(float(lo), float(maxs[k])))
+            else:
+                idx.add(self._point(float(lo)))
+        return np.array(sorted(idx), dtype=np.intp)
+
+    def indices(self, values, max_values=None):
+        """Отсортированные индексы бинов (np.intp, только для чтения)."""
+        key = (tuple(_as_list(values)), tuple(_as_list(max_values)))
+        out = self._compiled.get(key)
+        if out is None:
+            out = self._compile(list(key[0]), list(key[1]))
+            out.flags.writeable = False
+            self._compiled[key] = out
+        return out
+
+    def mask(self, values, max_values=None):
+        """Булева маска длины n_bins."""
+        m = np.zeros(self.n_bins, dtype=bool)
+        m[self.indices(values, max_values)] = True
+        return m
+
+
+def lookup(axis, row):
+    """BinLookup для оси 'L' | 'pitch' | 'E' и номера строки биннинга (lb, pitchb, eb; с 1)."""
+    key = (axis, int(row))
+    with _LOCK:
+        lk = _LOOKUPS.get(key)
+        if lk is None:
+            lk = _LOOKUPS[key] = BinLookup(config.BIN_INFO[AXIS_KEYS[axis]][int(row) - 1])
+        return lk
+
+
+def edges(axis, row):
+    return lookup(axis, row).edges
+
+
+def indices(axis, row, values, max_values=None):
+    return lookup(axis, row).indices(values, max_values)
+
+
+def mask(axis, row, values, max_values=None):
+    return lookup(axis, row).mask(values, max_values)
+
+
+def selection(app_state):
+    """Индексы (L, E, Pitch) текущего выбора app_state с учетом диапазонов *_max."""
+    return (indices('L', app_state.lb, app_state.l, app_state.l_max),
+            indices('E', app_state.eb, app_state.e, app_state.e_max),
+            indices('pitch', app_state.pitchb, app_state.pitch, app_state.pitch_max))
+
+
+def clear():
+    with _LOCK:
+        _LOOKUPS.clear()
@@ -1,11 +1,14 @@
 """
 Модуль конфигурации (CORE CONFIG STABLE)
 Исправлено: возвращена полная длина массивов биннингов для исключения IndexError.
+Таблица биннингов BIN_INFO вычисляется лениво при первом обращении
+(module __getattr__), поэтому импорт config не читает файлов.
 """
 import os
+import threading
 import numpy as np
-from scipy.io import loadmat
 from datetime import datetime
+from . import mat_cache
 
 # === ПУТИ ===
 CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -19,11 +22,54 @@ BASE_DATA_PATH = ext_clean if os.path.exists(ext_clean) else ext_root
 BINNING_INFO_FILE = os.path.join(UI_DATA_PATH, 'BinningInfo.mat')
 METADATA_FILE = os.path.join(UI_DATA_PATH, 'file_metadata.mat')
 
-def _load_mat_file(path):
-    if not path or not os.path.exists(path): return None
+# Локальные кэши (манифест файлов и т.п.). Не хранится в git.
+CACHE_PATH = os.path.join(PROJECT_ROOT, 'cache')
+USE_FILE_MANIFEST = True  # False - старый перебор путей по каждому дню
+CUBE_PATH = os.path.join(CACHE_PATH, 'cubes')  # кубы миссии (core.cube)
+USE_MISSION_CUBE = True   # брать дни из собранного куба, если он есть
+SPECTRA_CACHE_PATH = os.path.join(CACHE_PATH, 'spectra')  # свернутые дневные спектры (core.spectra_cache)
+USE_SPECTRA_CACHE = True
+ROLLUP_PATH = os.path.join(CACHE_PATH, 'rollups')  # блоки месяц/год/период (core.rollup)
+USE_ROLLUPS = True
+ROLLUP_PERIODS = {}  # пользовательские периоды: {'имя': (первый, последний pam-день)}
+
+# Параллельная загрузка дней (core.loader): 'thread' | 'process' | 'serial'
+LOADER_EXECUTOR = 'thread'
+LOADER_WORKERS = 0  # 0 - по числу ядер (не больше 8)
+
+# Общий кэш декодированных MAT-файлов (core.mat_cache)
+MAT_CACHE_BYTES = 512 * 1024 * 1024
+MAT_CACHE = mat_cache.MatCache(MAT_CACHE_BYTES)
+USE_FAST_MAT_READER = True  # RBflux: читать только Jday/dJday (core.mat_reader)
+
+# Диагностика ядра (core.diagnostics): общий уровень, уровни модулей, размер кольцевого буфера.
+# Переопределение без правки кода: PAMELA_LOG="file_manager=DEBUG,=INFO"
+LOG_LEVEL = 'INFO'
+LOG_LEVELS = {}  # например: {'file_manager': 'DEBUG'}
+LOG_RING_SIZE = 5000
+
+# Трассировка горячего пути (core.tracing): PAMELA_TRACE=1 или True здесь
+TRACE_ENABLED = os.environ.get('PAMELA_TRACE', '') not in ('', '0')
+TRACE_PATH = os.path.join(CACHE_PATH, 'traces')  # Chrome trace JSON после каждого PLOT
+
+# Фоновая предзагрузка выбранных дней в MAT_CACHE (core.prefetch)
+USE_PREFETCH = True
+PREFETCH_DELAY = 0.3            # сек. ожидания перед проходом (серия изменений диапазона)
+PREFETCH_BUDGET_FRACTION = 0.8  # доля MAT_CACHE_BYTES, которую может занять один проход
+
+# Гистограмма потоков (core.histogram): фиксированные логарифмические бины
+HIST_RANGE = (1e-8, 1e8)        # границы, (MeV cm^2 sr s)^-1; вне диапазона - under/overflow
+HIST_BINS_PER_DECADE = 10
+
+def _decode_mat_file(path):
+    from scipy.io import loadmat  # scipy импортируется только при первом чтении
     try: return loadmat(path, squeeze_me=True, struct_as_record=False)
     except: return None
 
+def _load_mat_file(path):
+    if not path or not os.path.exists(path): return None
+    return MAT_CACHE.get(path, _decode_mat_file)
+
 def get_val(obj, key):
     if isinstance(obj, dict): return obj.get(key, None)
     return getattr(obj, key, None)
@@ -49,6 +95,15 @@ def calculate_bin_params(edges_array, mode='geometric'):
         c = (edges[:-1] + edges[1:]) / 2.0
     return c, w, len(c)
 
+def _map_rows(rows, func):
+    """func для каждой строки массива строк биннинга (object-массив или одна строка)."""
+    if rows is None: return None
+    if isinstance(rows, np.ndarray) and rows.dtype == 'O':
+        out = np.empty(len(rows), dtype='O')
+        for i, row in enumerate(rows): out[i] = func(np.asarray(row, dtype=float))
+        return out
+    return func(np.asarray(rows, dtype=float))
+
 def load_binning_info_direct():
     bininfo = { 
         'Lbin': [], 'pitchbin': [], 'Ebin': [], 'Rig': [],
@@ -63,11 +118,13 @@ def load_binning_info_direct():
         # Загружаем ВСЕ 6 строк (не делим их здесь, чтобы не ломать индексы интерфейса)
         ebin_raw = get_val(mat, 'Ebin')
         bininfo['Ebin'] = ebin_raw
-        bininfo['Rig'] = ebin_raw # В файле они в одном массиве Ebin
+        # Границы по жесткости - те же бины Ebin, пересчитанные для протонов (core.kinematics)
+        from . import kinematics
+        bininfo['Rig'] = _map_rows(ebin_raw, lambda row: kinematics.t_to_r(row, kinematics.DEFAULT_SPECIES))
 
         # Считаем параметры для всех доступных строк
         bininfo['Ecenters'], bininfo['dE'], _ = calculate_bin_params(ebin_raw, 'geometric')
-        bininfo['Rigcenters'], bininfo['dR'], _ = calculate_bin_params(ebin_raw, 'geometric')
+        bininfo['Rigcenters'], bininfo['dR'], _ = calculate_bin_params(bininfo['Rig'], 'geometric')
         bininfo['Lcenters'], bininfo['dL'], _ = calculate_bin_params(bininfo['Lbin'], 'geometric')
         bininfo['pitchcenters'], bininfo['dPitch'], _ = calculate_bin_params(bininfo['pitchbin'], 'arithmetic')
     return bininfo
@@ -77,8 +134,31 @@ DATA_SOURCE_STR = ['PAMELA exp. data','Efficiency simulation','Anisotropic flux
 GEN_STR = ['Alt1sec', 'Babs1sec', 'BB01sec', 'L1sec','Lat1sec', 'Lon1sec']
 TBIN_STR = ['passage','day','month','Separate Periods']
 PLOT_KINDS = ['Energy spectra','Rigidity spectra','pitch-angular distribution','Radial distribution','Temporal variations','Variations along orbit','Fluxes Histogram']
+# Номера видов графика в GUI (plot_controls.PLOT_TYPES, app_state.plot_kind) -> имя из PLOT_KINDS.
+# 0 - старый номер энергетического спектра.
+PLOT_KIND_IDS = {0: PLOT_KINDS[0], 1: PLOT_KINDS[0], 2: PLOT_KINDS[1], 3: PLOT_KINDS[2],
+                 4: PLOT_KINDS[3], 5: PLOT_KINDS[4], 6: PLOT_KINDS[5], 12: PLOT_KINDS[6]}
 PAMSTART = (datetime(2005, 12, 31) - datetime(1, 1, 1)).days + 1721425.5 
 
-BIN_INFO = load_binning_info_direct()
 GEO_STR = ['RB3', 'Polar8']; SELECT_STR = ['ItalianH', 'BasicCalo']
 GS_ARRAY = np.ones((2, 2), dtype=bool); BINNING_STR = ['P3L4E4']
+
+# === ЛЕНИВЫЕ ТАБЛИЦЫ ===
+_LAZY_TABLES = {
+    'BIN_INFO': load_binning_info_direct,
+}
+_LAZY_LOCK = threading.Lock()
+
+def __getattr__(name):
+    """
+    config.BIN_INFO: вычисляется при первом обращении и запоминается в модуле.
+    Индекс file_metadata - через core.metadata_index.get_index() (с проверкой mtime).
+    """
+    loader = _LAZY_TABLES.get(name)
+    if loader is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    with _LAZY_LOCK:
+        if name not in globals():
+            globals()[name] = loader()
+    return globals()[name]
+
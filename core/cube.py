@@ -0,0 +1,202 @@
+"""
+Куб миссии (Mission Cube).
+Все дни одного набора (geo, selection, version, stdbinning) упакованы в два
+memory-mapped массива формы (n_days, L, E, P): J.npy и dJ.npy, плюс индекс дней days.npy.
+Временной запрос превращается в один срез по первой оси вместо тысяч декодирований MAT.
+В meta.json для каждого дня хранится исходный RBflux-файл и его mtime: строка куба
+используется, только если файл с тех пор не менялся (или недоступен), а сборка
+переупаковывает устаревшие строки.
+
+Сборка:  python -m core.cube RB3 ItalianH v09 P3L4E4
+"""
+import os
+import json
+import argparse
+import numpy as np
+from . import config
+from . import manifest
+from . import loader
+from . import diagnostics
+
+log = diagnostics.get_logger(__name__)
+
+CUBE_VERSION = 1
+
+
+def cube_dir(geo, sel, ver, binn):
+    return os.path.join(config.CUBE_PATH, geo, sel, ver, binn)
+
+
+def _source(path):
+    """[абсолютный путь, mtime_ns] исходного файла дня (None - файл недоступен)."""
+    try: return [os.path.abspath(path), os.stat(path).st_mtime_ns]
+    except OSError: return None
+
+
+def _read_day(path):
+    """Jday/dJday из одного RBflux-файла (dJ может отсутствовать)."""
+    j, dj = loader.load_flux_day(path)
+    if j is None or not isinstance(j, np.ndarray) or j.ndim != 3 or j.dtype == object:
+        return None, None
+    if dj is None or getattr(dj, 'shape', None) != j.shape:
+        dj = None
+    return j, dj
+
+
+class MissionCube:
+    """Читатель куба. J, dJ - np.memmap (n_days, L, E, P); days - отсортированные pam-дни."""
+
+    def __init__(self, path):
+        self.path = path
+        self.days = np.load(os.path.join(path, 'days.npy'))
+        self.J = np.load(os.path.join(path, 'J.npy'), mmap_mode='r')
+        self.dJ = np.load(os.path.join(path, 'dJ.npy'), mmap_mode='r')
+        self._pos = {int(d): i for i, d in enumerate(self.days)}
+        self.stamp = os.stat(os.path.join(path, 'days.npy')).st_mtime_ns  # меняется при пересборке куба
+        self.sources = {}  # day -> [путь, mtime_ns] исходного файла (кубы старых сборок - пусто)
+        try:
+            with open(os.path.join(path, 'meta.json')) as f:
+                self.sources = {int(d): src for d, src in (json.load(f).get('sources') or {}).items() if src}
+        except (OSError, ValueError):
+            pass
+
+    @property
+    def shape(self):
+        return self.J.shape[1:]
+
+    def __contains__(self, day):
+        return int(day) in self._pos
+
+    def positions(self, days):
+        """Индексы строк куба для дней, которые в нем есть (в порядке запроса)."""
+        return np.array([self._pos[int(d)] for d in days if int(d) in self._pos], dtype=np.intp)
+
+    def take(self, days):
+        """
+        Возвращает (days_found, J_block, dJ_block).
+        Непрерывный диапазон дней отдается срезом memmap (без копирования).
+        """
+        pos = self.positions(days)
+        if len(pos) == 0:
+            empty = np.empty((0,) + self.shape, dtype=self.J.dtype)
+            return np.array([], dtype=self.days.dtype), empty, empty
+        if np.all(np.diff(pos) == 1):
+            sl = slice(pos[0], pos[-1] + 1)
+            return self.days[sl], self.J[sl], self.dJ[sl]
+        return self.days[pos], self.J[pos], self.dJ[pos]
+
+    def day(self, day):
+        i = self._pos[int(day)]
+        return self.J[i], self.dJ[i]
+
+    def is_current(self, day, path):
+        """Строка дня собрана из файла path в его нынешнем виде (путь и mtime совпадают)."""
+        src = self.sources.get(int(day))
+        return src is not None and src == _source(path)
+
+
+def open_cube(geo, sel, ver, binn):
+    """Открывает куб, если он собран. Иначе None."""
+    path = cube_dir(geo, sel, ver, binn)
+    if not os.path.exists(os.path.join(path, 'days.npy')): return None
+    try:
+        return MissionCube(path)
+    except Exception as e:
+        log.error("[CUBE] Не удалось открыть куб %s: %s", path, e)
+        return None
+
+
+def open_cube_for(app_state):
+    return open_cube(app_state.geo_selection, app_state.selection,
+                     app_state.flux_version or 'v09', app_state.stdbinning)
+
+
+def build_cube(geo, sel, ver, binn, days=None, base=None, dtype=None):
+    """
+    Упаковывает RBflux-файлы в куб. days=None - все дни из манифеста.
+    Дни, уже лежащие в существующем кубе той же формы, копируются из него без чтения MAT,
+    если их файл не менялся после сборки (или недоступен); устаревшие строки читаются заново.
+    """
+    man = manifest.get_manifest(base)
+    index = man.lookup(geo, sel, ver, binn)
+    wanted = sorted(index) if days is None else sorted(set(days) & set(index))
+    old = open_cube(geo, sel, ver, binn)
+    if old is not None:
+        wanted = sorted(set(wanted) | set(int(d) for d in old.days))
+
+    # Форма и тип - по первому читаемому дню
+    shape = old.shape if old is not None else None
+    if shape is None:
+        for d in wanted:
+            j, _ = _read_day(index[d])
+            if j is not None:
+                shape, dtype = j.shape, dtype or j.dtype
+                break
+    if shape is None:
+        log.warning("[CUBE] Нет данных для %s/%s/%s/%s", geo, sel, ver, binn)
+        return None
+    dtype = np.dtype(dtype or (old.J.dtype if old is not None else np.float32))
+
+    path = cube_dir(geo, sel, ver, binn)
+    os.makedirs(path, exist_ok=True)
+    n = len(wanted)
+    tmp_j = os.path.join(path, 'J.npy.tmp')
+    tmp_dj = os.path.join(path, 'dJ.npy.tmp')
+    J = np.lib.format.open_memmap(tmp_j, mode='w+', dtype=dtype, shape=(n,) + tuple(shape))
+    dJ = np.lib.format.open_memmap(tmp_dj, mode='w+', dtype=dtype, shape=(n,) + tuple(shape))
+
+    kept, sources, repacked = [], {}, 0
+    for d in wanted:
+        if old is not None and d in old and (d not in index or old.is_current(d, index[d])):
+            j, dj = old.day(d)
+            sources[d] = old.sources.get(d)
+        else:
+            if old is not None and d in old: repacked += 1
+            sources[d] = _source(index[d])
+            j, dj = _read_day(index[d])
+            if j is None or j.shape != tuple(shape):
+                log.warning("[CUBE] Пропуск дня %s: нет Jday формы %s", d, shape)
+                continue
+        i = len(kept)
+        J[i] = j
+        dJ[i] = dj if dj is not None else 0.0
+        kept.append(d)
+
+    J.flush(); dJ.flush()
+    del J, dJ, old
+    n_kept = len(kept)
+    if n_kept != n:
+        # Обрезаем хвост пропущенных дней
+        for tmp in (tmp_j, tmp_dj):
+            arr = np.load(tmp, mmap_mode='r')[:n_kept]
+            np.save(tmp + '.cut', np.ascontiguousarray(arr))
+            del arr
+            os.replace(tmp + '.cut.npy', tmp)
+    os.replace(tmp_j, os.path.join(path, 'J.npy'))
+    os.replace(tmp_dj, os.path.join(path, 'dJ.npy'))
+    np.save(os.path.join(path, 'days.npy'), np.array(kept, dtype=np.int32))
+    with open(os.path.join(path, 'meta.json'), 'w') as f:
+        json.dump({'version': CUBE_VERSION, 'geo': geo, 'selection': sel, 'flux_version': ver,
+                   'stdbinning': binn, 'shape': [n_kept] + list(shape), 'dtype': dtype.str,
+                   'sources': {str(d): sources.get(d) for d in kept}}, f, indent=1)
+    log.info("[CUBE] Собран куб %s: %d дней (переупаковано устаревших: %d), ячейка %s",
+             path, n_kept, repacked, tuple(shape))
+    return open_cube(geo, sel, ver, binn)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Сборка куба миссии из RBflux-файлов")
+    parser.add_argument('geo'); parser.add_argument('selection')
+    parser.add_argument('version'); parser.add_argument('stdbinning')
+    parser.add_argument('--first', type=int, default=None, help="первый pam-день")
+    parser.add_argument('--last', type=int, default=None, help="последний pam-день")
+    parser.add_argument('--base', default=None, help="корень данных (по умолчанию config.BASE_DATA_PATH)")
+    args = parser.parse_args(argv)
+    days = None
+    if args.first is not None or args.last is not None:
+        days = range(args.first or 0, (args.last if args.last is not None else 10 ** 6) + 1)
+    build_cube(args.geo, args.selection, args.version, args.stdbinning, days=days, base=args.base)
+
+
+if __name__ == '__main__':
+    main()
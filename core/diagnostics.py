@@ -0,0 +1,105 @@
+"""
+Диагностика ядра на базе стандартного logging.
+- Ленивое форматирование: сообщения пишутся в стиле log.debug("... %s", x) и форматируются,
+  только если запись прошла уровень логгера.
+- Уровни по модулям: config.LOG_LEVELS или переменная окружения
+  PAMELA_LOG="file_manager=DEBUG,processing=INFO" (пустое имя - общий уровень).
+- Кольцевой буфер в памяти (RingBufferHandler) хранит последние записи без форматирования;
+  GUI показывает их по запросу (desktop_app/dialogs/log_dialog.py).
+Консольный вывод сохраняет прежний вид (только текст сообщения).
+"""
+import os
+import sys
+import logging
+import threading
+from collections import deque
+from . import config
+
+ROOT = 'pamela'
+DEBUG, INFO, WARNING, ERROR = logging.DEBUG, logging.INFO, logging.WARNING, logging.ERROR
+LINE_FORMAT = '%(asctime)s %(levelname)-7s %(name)s: %(message)s'
+
+_configured = False
+_setup_lock = threading.Lock()
+
+
+class RingBufferHandler(logging.Handler):
+    """Последние capacity записей (LogRecord); форматирование - только при чтении."""
+
+    def __init__(self, capacity=5000):
+        super().__init__(logging.NOTSET)
+        self.records = deque(maxlen=capacity)
+        self.setFormatter(logging.Formatter(LINE_FORMAT, '%H:%M:%S'))
+
+    def emit(self, record):
+        self.records.append(record)
+
+    def clear(self):
+        self.acquire()
+        try: self.records.clear()
+        finally: self.release()
+
+    def lines(self, min_level=logging.NOTSET):
+        self.acquire()
+        try: records = list(self.records)
+        finally: self.release()
+        return [self.format(r) for r in records if r.levelno >= min_level]
+
+
+class _StdoutHandler(logging.StreamHandler):
+    """Консоль: всегда текущий sys.stdout (работает с contextlib.redirect_stdout, как print)."""
+
+    @property
+    def stream(self): return sys.stdout
+    @stream.setter
+    def stream(self, value): pass
+
+
+RING = RingBufferHandler(config.LOG_RING_SIZE)
+
+
+def _parse_levels(spec):
+    """'file_manager=DEBUG,=INFO' -> {'file_manager': 'DEBUG', '': 'INFO'}."""
+    levels = {}
+    for part in (spec or '').split(','):
+        if not part.strip(): continue
+        name, _, level = part.rpartition('=')
+        levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def _logger_name(module):
+    """'core.file_manager' -> 'pamela.file_manager'; '' -> 'pamela'."""
+    short = module.split('.', 1)[1] if module.startswith('core.') else module
+    return f"{ROOT}.{short}" if short else ROOT
+
+
+def set_level(module, level):
+    """Уровень одного модуля ('' - всего ядра). level: имя ('DEBUG') или число."""
+    logging.getLogger(_logger_name(module)).setLevel(level.upper() if isinstance(level, str) else level)
+
+
+def configure(force=False):
+    """Обработчики и уровни (однократно при первом get_logger)."""
+    global _configured
+    with _setup_lock:
+        if _configured and not force: return
+        root = logging.getLogger(ROOT)
+        root.propagate = False
+        for h in list(root.handlers): root.removeHandler(h)
+        console = _StdoutHandler()
+        console.setFormatter(logging.Formatter('%(message)s'))
+        root.addHandler(console)
+        root.addHandler(RING)
+        levels = dict(config.LOG_LEVELS)
+        levels.update(_parse_levels(os.environ.get('PAMELA_LOG')))
+        root.setLevel(levels.pop('', config.LOG_LEVEL).upper())
+        for module, level in levels.items():
+            set_level(module, level)
+        _configured = True
+
+
+def get_logger(module):
+    """Логгер модуля ядра: log = diagnostics.get_logger(__name__)."""
+    configure()
+    return logging.getLogger(_logger_name(module))
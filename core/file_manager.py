@@ -1,26 +1,36 @@
 """
-Менеджер файлов (DEBUG EDITION).
-Показывает каждый шаг поиска файлов и полные пути, которые проверяет программа.
+Менеджер файлов.
+Каждый шаг поиска файлов и проверяемые пути пишутся на уровне DEBUG
+(PAMELA_LOG="file_manager=DEBUG"); по умолчанию - только итог.
+Быстрый путь: манифест (core.manifest) - один скан корня данных и один поиск на диапазон дней.
 """
 import os
 from . import config
+from . import manifest
+from . import tracing
+from . import diagnostics
 
-def get_input_filenames(app_state, data_type='flux'):
-    files = []
-    base = config.BASE_DATA_PATH 
-    
-    print(f"\n[FILE MANAGER] === НАЧАЛО ПОИСКА ===")
-    print(f"[DEBUG PATH] Корневая папка (Base): {base}")
+log = diagnostics.get_logger(__name__)
 
+def get_input_filenames(app_state, data_type='flux'):
     # === AUX DATA (MagParam) ===
     if data_type == 'aux':
         if config.MAGPARAM_FILE and os.path.exists(config.MAGPARAM_FILE):
             return [config.MAGPARAM_FILE]
         return []
+    return [path for _, path in get_input_day_files(app_state)]
+
+def get_input_day_files(app_state, days=None):
+    """Список пар (day, path) для выбранных дней (в порядке app_state.pam_pers или days)."""
+    base = config.BASE_DATA_PATH
+
+    log.debug("[FILE MANAGER] === НАЧАЛО ПОИСКА ===")
+    log.debug("[DEBUG PATH] Корневая папка (Base): %s", base)
 
     # === FLUX DATA (Потоки) ===
-    if not app_state.pam_pers: 
-        print("[FILE MANAGER] ⚠️ Не выбраны дни для построения!")
+    days = app_state.pam_pers if days is None else days
+    if not days: 
+        log.warning("[FILE MANAGER] ⚠️ Не выбраны дни для построения!")
         return []
 
     # 1. Параметры из интерфейса
@@ -29,11 +39,26 @@ def get_input_filenames(app_state, data_type='flux'):
     ver = app_state.flux_version or 'v09'
     binn = app_state.stdbinning     # например: P3L4E4
 
-    print(f"[DEBUG INFO] Geo='{geo}', Sel='{sel}', Ver='{ver}', Bin='{binn}'")
+    log.debug("[DEBUG INFO] Geo='%s', Sel='%s', Ver='%s', Bin='%s'", geo, sel, ver, binn)
+
+    with tracing.span('discover', days=len(days)) as sp:
+        if config.USE_FILE_MANIFEST:
+            day_files = manifest.get_manifest(base).resolve(geo, sel, ver, binn, days)
+        else:
+            day_files = _probe_day_files(base, geo, sel, ver, binn, days)
+        sp.add(items=len(day_files))
+
+    log.info("[FILE MANAGER] Итог: найдено %d файлов из %d дней.", len(day_files), len(days))
+    return day_files
+
+def _probe_day_files(base, geo, sel, ver, binn, days):
+    """Старый поиск: проверка путей по каждому дню (без манифеста)."""
+    files = []
+    debug = log.isEnabledFor(diagnostics.DEBUG)  # в цикле по дням - без форматирования строк
 
     # 2. Перебор дней
-    for day in app_state.pam_pers:
-        print(f"\n  > Обработка Дня: {day}")
+    for day in days:
+        if debug: log.debug("  > Обработка Дня: %s", day)
         
         day_folder_name = f"day_{day}"
         
@@ -47,21 +72,20 @@ def get_input_filenames(app_state, data_type='flux'):
         target_dir = None
         
         # ДЕБАГ ПРОВЕРКИ ПАПОК
-        print(f"    [CHECK DIR 1] {path_structure}")
+        if debug: log.debug("    [CHECK DIR 1] %s", path_structure)
         if os.path.exists(path_structure):
-            print("      -> НАЙДЕНО!")
+            if debug: log.debug("      -> НАЙДЕНО!")
             target_dir = path_structure
         else:
-            print("      -> пусто")
-            print(f"    [CHECK DIR 2] {path_root}")
+            if debug: log.debug("      -> пусто\n    [CHECK DIR 2] %s", path_root)
             if os.path.exists(path_root):
-                print("      -> НАЙДЕНО!")
+                if debug: log.debug("      -> НАЙДЕНО!")
                 target_dir = path_root
-            else:
-                print("      -> пусто")
+            elif debug:
+                log.debug("      -> пусто")
 
         if not target_dir:
-            print(f"  [-] ПАПКА ДЛЯ ДНЯ {day} НЕ НАЙДЕНА ни по одному из путей.")
+            if debug: log.debug("  [-] ПАПКА ДЛЯ ДНЯ %s НЕ НАЙДЕНА ни по одному из путей.", day)
             continue
 
         # 3. Ищем ФАЙЛ внутри найденной папки
@@ -73,19 +97,19 @@ def get_input_filenames(app_state, data_type='flux'):
 
         found_file = None
         
-        print(f"    [SEARCH FILE] Ищем один из: {candidates}")
+        if debug: log.debug("    [SEARCH FILE] Ищем один из: %s", candidates)
         
         # А. Проверяем прямо в целевой папке
         for cand in candidates:
             p = os.path.join(target_dir, cand)
-            # print(f"      [CHECK FILE] {p}") # Раскомментировать для супер-детальности
+            # log.debug("      [CHECK FILE] %s", p) # Раскомментировать для супер-детальности
             if os.path.exists(p):
                 found_file = p
                 break
         
         # Б. Если не нашли, проверяем подпапку RBfullfluxes (иногда бывает)
         if not found_file:
-            # print("      [INFO] Проверяем подпапку RBfullfluxes...")
+            # log.debug("      [INFO] Проверяем подпапку RBfullfluxes...")
             for cand in candidates:
                 p = os.path.join(target_dir, 'RBfullfluxes', cand)
                 if os.path.exists(p):
@@ -93,16 +117,15 @@ def get_input_filenames(app_state, data_type='flux'):
                     break
         
         if found_file:
-            files.append(found_file)
-            print(f"  [+] ФАЙЛ НАЙДЕН: {found_file}")
-        else:
-            print(f"  [-] Файл НЕ найден в папке {target_dir}")
+            files.append((day, found_file))
+            if debug: log.debug("  [+] ФАЙЛ НАЙДЕН: %s", found_file)
+        elif debug:
+            log.debug("  [-] Файл НЕ найден в папке %s", target_dir)
             # Для помощи выведем, что там вообще лежит
             try:
                 content = os.listdir(target_dir)
                 mats = [f for f in content if f.endswith('.mat')]
-                print(f"      В этой папке лежат ({len(mats)} шт): {mats[:3]} ...")
+                log.debug("      В этой папке лежат (%d шт): %s ...", len(mats), mats[:3])
             except: pass
 
-    print(f"[FILE MANAGER] Итог: найдено {len(files)} файлов.")
     return files
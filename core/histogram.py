@@ -0,0 +1,86 @@
+"""
+Потоковая гистограмма значений потока.
+Бины фиксированы заранее (логарифмическая шкала, config.HIST_RANGE), поэтому память
+не зависит от числа дней: каждый день или блок дней куба превращается в вектор счетчиков,
+счетчики складываются. Дневные гистограммы независимы - их можно считать параллельно
+(пул core.loader) и объединять в конце (StreamingHistogram.merge).
+Счетчик дня: [underflow, бины..., overflow]; NaN и значения <= 0 не считаются.
+"""
+import numpy as np
+from . import config
+from . import tracing
+from .reduction import select_cells
+
+
+def log_edges(lo=None, hi=None, per_decade=None):
+    """Границы бинов: per_decade бинов на декаду от lo до hi."""
+    lo_, hi_ = config.HIST_RANGE
+    lo = lo_ if lo is None else lo
+    hi = hi_ if hi is None else hi
+    per_decade = config.HIST_BINS_PER_DECADE if per_decade is None else per_decade
+    n = int(round(np.log10(hi / lo) * per_decade))
+    return np.logspace(np.log10(lo), np.log10(hi), n + 1)
+
+
+def histogram_block(j_block, l_indices, e_indices, p_indices, edges):
+    """
+    Гистограммы всех дней блока J (days, L, E, P) по выбранным ячейкам за один вызов.
+    Возвращает int64 (days, len(edges) + 1): [underflow, бины..., overflow].
+    """
+    n_days, n_bins = len(j_block), len(edges) - 1
+    with tracing.span('slice', items=n_days):
+        sub = np.asarray(select_cells(j_block, l_indices, e_indices, p_indices)).reshape(n_days, -1)
+    with tracing.span('histogram', items=n_days):
+        valid = np.isfinite(sub) & (sub > 0)
+        # 0 - underflow, 1..n_bins - бины (правая граница включена, как в np.histogram), n_bins+1 - overflow
+        idx = np.searchsorted(edges, sub, side='right')
+        idx[sub == edges[-1]] = n_bins
+        width = n_bins + 2
+        flat = (np.arange(n_days)[:, None] * width + idx)[valid]
+        counts = np.bincount(flat, minlength=n_days * width)
+    return counts.reshape(n_days, width).astype(np.int64)
+
+
+class StreamingHistogram:
+    """Накопитель счетчиков по фиксированным границам edges."""
+
+    def __init__(self, edges):
+        self.edges = np.asarray(edges, dtype=np.float64)
+        self.counts = np.zeros(len(self.edges) + 1, dtype=np.int64)  # с under/overflow
+        self.n_days = 0
+
+    def add_counts(self, counts):
+        """Добавляет счетчик дня [underflow, бины..., overflow]."""
+        self.counts += np.asarray(counts, dtype=np.int64)
+        self.n_days += 1
+
+    def add_values(self, values):
+        """Добавляет произвольный кусок значений (np.histogram по тем же границам)."""
+        v = np.asarray(values, dtype=np.float64).ravel()
+        v = v[np.isfinite(v) & (v > 0)]
+        hist, _ = np.histogram(v, bins=self.edges)
+        self.counts[1:-1] += hist
+        self.counts[0] += np.count_nonzero(v < self.edges[0])
+        self.counts[-1] += np.count_nonzero(v > self.edges[-1])
+
+    def merge(self, other):
+        if not np.array_equal(self.edges, other.edges):
+            raise ValueError("Гистограммы с разными границами бинов")
+        self.counts += other.counts
+        self.n_days += other.n_days
+        return self
+
+    @property
+    def underflow(self): return int(self.counts[0])
+    @property
+    def overflow(self): return int(self.counts[-1])
+    @property
+    def total(self): return int(self.counts.sum())
+
+    def trimmed(self):
+        """(edges, counts) без пустых бинов по краям; (None, None), если бины пусты."""
+        inner = self.counts[1:-1]
+        nz = np.flatnonzero(inner)
+        if len(nz) == 0: return None, None
+        a, b = nz[0], nz[-1] + 1
+        return self.edges[a:b + 1], inner[a:b]
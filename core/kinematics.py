@@ -3,8 +3,17 @@
 
 Содержит функции для преобразования Энергии (T) в Жесткость (R) и обратно.
 Портировано из ConvertT2R.m и ConvertR2T.m.
+
+Реестр сортов частиц (SPECIES) и кэш таблиц пересчета для строк BIN_INFO['Ebin']:
+t_to_r / r_to_t считают сразу по массиву значений и набору сортов, а table(eb)
+хранит границы, центры и ширины бинов R, так что переключение E/R (ror_e) ничего не пересчитывает.
+Спектр по жесткости получается из спектра по энергии (ConversionTable.projection):
+J(R) = J(T(R)) dT/dR, где J(T(R)) - log-log интерполяция по центрам бинов E;
+processing применяет ее к дневным спектрам блока (дни, E) до усреднения по дням.
 """
 
+import threading
+from collections import namedtuple
 import numpy as np
 
 def convert_T_to_R(T, M, A, Z):
@@ -42,3 +51,158 @@ def convert_R_to_T(R, M, A, Z):
     A = np.where(A == 0, 1.0, A) # Защита от деления на ноль
     E = (1.0 / A) * (np.sqrt(np.power((Z * R), 2) + np.power(M, 2)) - M)
     return E
+
+
+# === Сорта частиц и кэш таблиц T <-> R ===
+
+Species = namedtuple('Species', 'name M A Z')
+
+# M - масса ядра/частицы в ГэВ/c^2, A - число нуклонов (T задается на нуклон), Z - заряд
+SPECIES = {
+    'p': Species('p', 0.938, 1, 1),
+    'He': Species('He', 3.727, 4, 2),
+    'e-': Species('e-', 0.000511, 1, -1),
+    'e+': Species('e+', 0.000511, 1, 1),
+}
+DEFAULT_SPECIES = 'p'
+
+_COLUMNS = {}  # кортеж сортов -> (M, A, |Z|) формы (S, 1)
+_TABLES = {}   # (строка Ebin, кортеж сортов) -> ConversionTable
+_LOCK = threading.Lock()
+
+
+def _species_key(species):
+    """Кортеж имен сортов и признак одиночного сорта (результат без оси сортов)."""
+    if isinstance(species, str): return (species,), True
+    return tuple(species), False
+
+
+def _columns(names):
+    cols = _COLUMNS.get(names)
+    if cols is None:
+        try: rows = [SPECIES[n] for n in names]
+        except KeyError as e: raise KeyError(f"Неизвестный сорт частиц: {e.args[0]}") from None
+        cols = tuple(np.array([[float(getattr(s, k))] for s in rows]) for k in ('M', 'A', 'Z'))
+        cols = (cols[0], cols[1], np.abs(cols[2]))  # жесткость по модулю заряда
+        for c in cols: c.flags.writeable = False
+        _COLUMNS[names] = cols
+    return cols
+
+
+def _apply(func, values, species):
+    names, single = _species_key(species)
+    M, A, Z = _columns(names)
+    values = np.asarray(values, dtype=np.float64)
+    flat = values.reshape(1, -1)
+    out = func(flat, M, A, Z).reshape((len(names),) + values.shape)
+    return out[0] if single else out
+
+
+def t_to_r(T, species=DEFAULT_SPECIES):
+    """
+    Жесткость (ГВ) для энергий T (ГэВ/нуклон) сразу для всех сортов.
+    species - имя ('p') -> форма T; последовательность имен -> форма (S,) + T.shape.
+    """
+    return _apply(convert_T_to_R, T, species)
+
+
+def r_to_t(R, species=DEFAULT_SPECIES):
+    """Кинетическая энергия (ГэВ/нуклон) для жесткостей R; species - как в t_to_r."""
+    return _apply(convert_R_to_T, R, species)
+
+
+def _dT_dR(R, M, A, Z):
+    # dT/dR = Z^2 R / (A (A T + M)) = |Z| beta / A
+    T = convert_R_to_T(R, M, A, Z)
+    return Z * Z * R / (A * (A * T + M))
+
+
+def jacobian(R, species=DEFAULT_SPECIES):
+    """Якобиан dT/dR (ГэВ/нуклон на ГВ) в точках R; species - как в t_to_r."""
+    return _apply(_dT_dR, R, species)
+
+
+class FluxProjection:
+    """
+    Перенос спектра J(T) из центров n бинов E строки в центры тех же бинов по R:
+    log-log интерполяция (экстраполяция у краев) по соседним центрам E и умножение на dT/dR.
+    """
+
+    def __init__(self, t_centers, r_centers, species):
+        self.species = species
+        x = np.log(t_centers)
+        r = np.asarray(r_centers, dtype=np.float64)
+        xi = np.log(r_to_t(r, species))
+        n = len(x)
+        self.lo = np.clip(np.searchsorted(x, xi) - 1, 0, max(n - 2, 0))
+        self.hi = np.minimum(self.lo + 1, n - 1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            self.frac = np.where(self.hi > self.lo, (xi - x[self.lo]) / (x[self.hi] - x[self.lo]), 0.0)
+        self.jac = jacobian(r, species)
+        for arr in (self.lo, self.hi, self.frac, self.jac): arr.flags.writeable = False
+
+    def apply(self, j, dj=None):
+        """J(R), dJ(R) для спектров j (..., n) (все дни блока сразу); J <= 0 и NaN дают NaN."""
+        j = np.asarray(j, dtype=np.float64)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            lj = np.log(np.where(j > 0, j, np.nan))
+            f = self.frac
+            y = np.exp(lj[..., self.lo] * (1.0 - f) + lj[..., self.hi] * f) * self.jac
+            if dj is None: return y, np.zeros_like(y)
+            rel = np.asarray(dj, dtype=np.float64) / np.where(j > 0, j, np.nan)
+            y_err = y * np.hypot((1.0 - f) * rel[..., self.lo], f * rel[..., self.hi])
+        return y, y_err
+
+
+class ConversionTable:
+    """Границы одной строки Ebin в T и R, центры и ширины бинов R для набора сортов."""
+
+    def __init__(self, t_edges, species):
+        self.species = species
+        self.t_edges = np.asarray(t_edges, dtype=np.float64).ravel()
+        self.r_edges = t_to_r(self.t_edges, species)                      # (S, n+1)
+        self.r_centers = np.sqrt(self.r_edges[:, :-1] * self.r_edges[:, 1:])  # геометрические, как Ecenters
+        self.dR = np.diff(self.r_edges, axis=1)
+        for arr in (self.t_edges, self.r_edges, self.r_centers, self.dR): arr.flags.writeable = False
+        self._projections = {}
+
+    def row(self, species=DEFAULT_SPECIES):
+        """Номер сорта в таблице."""
+        return self.species.index(species)
+
+    def rigidity_edges(self, species=DEFAULT_SPECIES):
+        return self.r_edges[self.row(species)]
+
+    def projection(self, species=DEFAULT_SPECIES, n_bins=None):
+        """FluxProjection J(E) -> J(R) для первых n_bins бинов строки (None - всех); кэшируется."""
+        n = len(self.t_edges) - 1 if n_bins is None else int(n_bins)
+        key = (species, n)
+        proj = self._projections.get(key)
+        if proj is None:
+            t_centers = np.sqrt(self.t_edges[:-1] * self.t_edges[1:])[:n]
+            proj = self._projections.setdefault(
+                key, FluxProjection(t_centers, self.r_centers[self.row(species)][:n], species))
+        return proj
+
+
+def table(eb, species=tuple(SPECIES)):
+    """
+    ConversionTable строки биннинга eb (с 1, как app_state.eb).
+    При первом обращении для набора сортов считаются таблицы всех строк BIN_INFO['Ebin'].
+    """
+    names = _species_key(species)[0]
+    key = (int(eb), names)
+    with _LOCK:
+        tbl = _TABLES.get(key)
+        if tbl is not None: return tbl
+        from . import config
+        rows = config.BIN_INFO['Ebin']
+        for i in range(len(rows)):
+            _TABLES.setdefault((i + 1, names), ConversionTable(rows[i], names))
+        return _TABLES[key]
+
+
+def clear():
+    with _LOCK:
+        _TABLES.clear()
+        _COLUMNS.clear()
@@ -0,0 +1,84 @@
+"""
+Параллельный загрузчик дней.
+Пул потоков или процессов (config.LOADER_EXECUTOR / LOADER_WORKERS), который
+читает и сворачивает файлы дней одновременно. Результаты всегда возвращаются
+в исходном порядке, поэтому итог совпадает с последовательным проходом.
+"""
+import os
+import atexit
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from . import config
+from . import mat_reader
+from . import passages as passages_mod
+from . import tracing
+
+_POOLS = {}  # (kind, workers) -> executor (переиспользуется между нажатиями PLOT)
+
+
+def _get_pool(kind, workers):
+    key = (kind, workers)
+    pool = _POOLS.get(key)
+    if pool is None:
+        if kind == 'process':
+            pool = ProcessPoolExecutor(max_workers=workers)
+        else:
+            pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='pamela-loader')
+        _POOLS[key] = pool
+    return pool
+
+
+def resolve_workers(workers=None):
+    workers = config.LOADER_WORKERS if workers is None else workers
+    if not workers or workers < 1:
+        workers = min(8, os.cpu_count() or 1)
+    return int(workers)
+
+
+def map_ordered(func, items, workers=None, kind=None):
+    """
+    Применяет func к каждому элементу items и возвращает итератор результатов в порядке items.
+    workers=1 или один элемент - последовательный проход без пула.
+    kind: 'thread' | 'process' (для 'process' func и items должны сериализоваться pickle).
+    """
+    items = list(items)
+    kind = kind or config.LOADER_EXECUTOR
+    workers = resolve_workers(workers)
+    if workers <= 1 or len(items) < 2 or kind == 'serial':
+        return map(func, items)
+    pool = _get_pool(kind, min(workers, len(items)))
+    chunksize = 1 if kind != 'process' else max(1, len(items) // (workers * 4))
+    return pool.map(func, items, chunksize=chunksize)
+
+
+def load_flux_day(path, passages=None):
+    """
+    (J, dJ) одного RBflux-файла через общий кэш (config.MAT_CACHE).
+    Быстрый путь - выборочный читатель core.mat_reader, иначе полный loadmat.
+    passages - номера пролетов (с 1): объединение только этих пролетов (core.passages);
+    если в файле их нет - (None, None): полный день (Jday) вместо пролетов не подставляется.
+    """
+    with tracing.span('load', items=1):
+        if passages:
+            return passages_mod.load_passages(path, passages)
+        if config.USE_FAST_MAT_READER:
+            mat = config.MAT_CACHE.get(path, _read_flux, tag='flux')
+        else:
+            mat = config._load_mat_file(path)
+    if mat is None: return None, None
+    return mat.get('Jday', mat.get('J')), mat.get('dJday', mat.get('dJ'))
+
+
+def _read_flux(path):
+    """Чтение с диска при промахе кэша (span 'read' с размером файла)."""
+    with tracing.span('read', items=1) as sp:
+        if sp: sp.add(bytes=os.path.getsize(path))
+        return mat_reader.load_flux_mat(path)
+
+
+def shutdown():
+    for pool in _POOLS.values():
+        pool.shutdown(wait=False, cancel_futures=True)
+    _POOLS.clear()
+
+
+atexit.register(shutdown)
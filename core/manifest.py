@@ -0,0 +1,236 @@
+"""
+Манифест файлов потоков (RBflux).
+Один раз сканирует корень данных и запоминает каждый RBflux-файл по ключу
+(geo, selection, version, stdbinning, day). Манифест сохраняется на диск
+(config.CACHE_PATH) и инвалидируется по mtime просканированных папок верхнего уровня.
+Новые файлы и папки selection/version внутри уже известных папок дней этот mtime не меняют,
+поэтому при промахе resolve() заново просматривает папки недостающих дней (не чаще
+REPROBE_SECONDS на день) и дополняет манифест.
+Порядок приоритетов повторяет старый перебор в file_manager:
+новая структура (dirflux_newStructure) важнее старой, папка дня важнее
+подпапки RBfullfluxes, имя с биннингом важнее короткого RBflux_<day>.mat.
+"""
+import os
+import re
+import time
+import pickle
+import hashlib
+import threading
+from . import config
+from . import diagnostics
+
+log = diagnostics.get_logger(__name__)
+
+MANIFEST_VERSION = 1
+REPROBE_SECONDS = 2.0  # повторный просмотр папки дня при промахе - не чаще
+
+# Ранг 0 - новая структура, ранг 1 - старая (сразу в корне)
+_LAYOUTS = (('dirflux_newStructure',), ())
+_SUBDIRS = ('', 'RBfullfluxes')
+_FILE_RE = re.compile(r'^RBflux_(Day)?(\d+)(?:_stdbinning_([A-Za-z0-9]+))?\.mat$')
+
+_MANIFESTS = {}  # base -> FluxManifest (кэш в памяти процесса)
+
+
+def _scan_dirs(path):
+    """Список подпапок (имя, путь). Пустой список, если папки нет."""
+    try:
+        with os.scandir(path) as it:
+            return [(e.name, e.path) for e in it if e.is_dir()]
+    except OSError:
+        return []
+
+
+def _mtime(path):
+    try: return os.stat(path).st_mtime
+    except OSError: return None
+
+
+class FluxManifest:
+    """
+    Индекс RBflux-файлов одного корня данных.
+
+    days[(geo, sel, ver)][day] = (layout_rank, [(sub_rank, pat_rank, binning|None, path), ...])
+    Короткое имя RBflux_<day>.mat не содержит биннинга (binning=None) и подходит к любому.
+    """
+
+    def __init__(self, base, days=None, roots=None, dirs=None):
+        self.base = base
+        self.days = days or {}
+        self.roots = roots or {}   # папки верхнего уровня -> mtime (быстрая проверка)
+        self.dirs = dirs or {}     # все папки версий -> mtime (глубокая проверка)
+        self._compiled = {}
+        self._probed = {}          # (geo, sel, ver, day) -> время последнего просмотра при промахе
+        self._lock = threading.Lock()
+
+    # --- Построение ---
+    @classmethod
+    def build(cls, base):
+        man = cls(base)
+        man.roots[base] = _mtime(base)
+        for rank, prefix in enumerate(_LAYOUTS):
+            root = os.path.join(base, *prefix)
+            if prefix:
+                man.roots[root] = _mtime(root)
+            for geo, geo_path in _scan_dirs(root):
+                days_path = os.path.join(geo_path, 'days')
+                day_dirs = _scan_dirs(days_path)
+                if not day_dirs: continue
+                man.roots[days_path] = _mtime(days_path)
+                for day_name, day_path in day_dirs:
+                    if not day_name.startswith('day_'): continue
+                    try: day = int(day_name[4:])
+                    except ValueError: continue
+                    for sel, sel_path in _scan_dirs(day_path):
+                        fluxdata = os.path.join(sel_path, 'Loc', 'Fluxdata')
+                        for ver, ver_path in _scan_dirs(fluxdata):
+                            man._add_version_dir(rank, geo, sel, ver, day, ver_path)
+        return man
+
+    def _add_version_dir(self, rank, geo, sel, ver, day, ver_path):
+        table = self.days.setdefault((geo, sel, ver), {})
+        prev = table.get(day)
+        # Папка новой структуры "затеняет" старую целиком, даже если в ней нет нужного файла
+        if prev is not None and prev[0] <= rank: return
+        self.dirs[ver_path] = _mtime(ver_path)
+        files = []
+        for sub_rank, sub in enumerate(_SUBDIRS):
+            folder = os.path.join(ver_path, sub) if sub else ver_path
+            try:
+                names = os.listdir(folder)
+            except OSError:
+                continue
+            for name in names:
+                m = _FILE_RE.match(name)
+                if not m or int(m.group(2)) != day: continue
+                has_day, binn = bool(m.group(1)), m.group(3)
+                if binn is None:
+                    if has_day: continue  # RBflux_Day<d>.mat без биннинга старый поиск не принимал
+                    pat_rank = 2
+                else:
+                    pat_rank = 1 if has_day else 0
+                files.append((sub_rank, pat_rank, binn, os.path.join(folder, name)))
+        files.sort()
+        table[day] = (rank, files)
+
+    # --- Проверка актуальности ---
+    def is_fresh(self, deep=False):
+        """Сравнивает mtime папок с сохраненными. deep=True проверяет и все папки версий."""
+        checked = dict(self.roots)
+        if deep: checked.update(self.dirs)
+        return all(_mtime(p) == t for p, t in checked.items())
+
+    # --- Поиск ---
+    def lookup(self, geo, sel, ver, binn):
+        """Словарь {day: path} для одного (geo, sel, ver, stdbinning). Кэшируется."""
+        key = (geo, sel, ver, binn)
+        index = self._compiled.get(key)
+        if index is None:
+            index = {}
+            for day, (_, files) in self.days.get((geo, sel, ver), {}).items():
+                for _, _, f_binn, path in files:
+                    if f_binn is None or f_binn == binn:
+                        index[day] = path
+                        break
+            self._compiled[key] = index
+        return index
+
+    def resolve(self, geo, sel, ver, binn, days):
+        """
+        Пары (day, path) для всех найденных дней диапазона, в порядке days.
+        Папки недостающих дней просматриваются заново (файл другого биннинга или новая папка
+        selection/version могли появиться после сканирования).
+        """
+        index = self.lookup(geo, sel, ver, binn)
+        missing = [d for d in days if d not in index]
+        if missing and self._probe(geo, sel, ver, missing):
+            index = self.lookup(geo, sel, ver, binn)
+            _save_to_disk(self)
+        return [(d, index[d]) for d in days if d in index]
+
+    def _probe(self, geo, sel, ver, days):
+        """Повторный просмотр папок версий дней days. True - манифест дополнен."""
+        now = time.monotonic()
+        changed = False
+        with self._lock:
+            for day in days:
+                key = (geo, sel, ver, day)
+                if now - self._probed.get(key, -REPROBE_SECONDS) < REPROBE_SECONDS: continue
+                self._probed[key] = now
+                table = self.days.get((geo, sel, ver), {})
+                for rank, prefix in enumerate(_LAYOUTS):
+                    ver_path = os.path.join(self.base, *prefix, geo, 'days', f'day_{day}',
+                                            sel, 'Loc', 'Fluxdata', ver)
+                    if not os.path.isdir(ver_path): continue
+                    prev = table.get(day)
+                    if prev is not None and prev[0] < rank: break  # новая структура затеняет старую
+                    old_files = prev[1] if prev is not None else None
+                    if prev is not None and prev[0] == rank: del table[day]
+                    self._add_version_dir(rank, geo, sel, ver, day, ver_path)
+                    table = self.days[(geo, sel, ver)]
+                    changed |= table[day][1] != old_files
+                    break
+            if changed:
+                self._compiled = {k: v for k, v in self._compiled.items() if k[:3] != (geo, sel, ver)}
+        return changed
+
+    # --- Диск ---
+    def to_dict(self):
+        return {'version': MANIFEST_VERSION, 'base': self.base,
+                'days': self.days, 'roots': self.roots, 'dirs': self.dirs}
+
+    @classmethod
+    def from_dict(cls, data):
+        if data.get('version') != MANIFEST_VERSION: return None
+        return cls(data['base'], data['days'], data['roots'], data['dirs'])
+
+
+def manifest_path(base):
+    digest = hashlib.md5(os.path.abspath(base).encode('utf-8')).hexdigest()[:12]
+    return os.path.join(config.CACHE_PATH, f"manifest_{digest}.pkl")
+
+
+def _load_from_disk(base):
+    path = manifest_path(base)
+    if not os.path.exists(path): return None
+    try:
+        with open(path, 'rb') as f:
+            man = FluxManifest.from_dict(pickle.load(f))
+    except Exception:
+        return None
+    if man is None or man.base != base: return None
+    return man
+
+
+def _save_to_disk(man):
+    path = manifest_path(man.base)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + '.tmp'
+        with open(tmp, 'wb') as f:
+            pickle.dump(man.to_dict(), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+    except OSError as e:
+        log.error("[MANIFEST] Не удалось сохранить манифест: %s", e)
+
+
+def get_manifest(base=None, rebuild=False, deep=False):
+    """
+    Возвращает актуальный манифест для корня данных.
+    Порядок: память процесса -> файл на диске -> полное сканирование.
+    """
+    base = base or config.BASE_DATA_PATH
+    if not rebuild:
+        man = _MANIFESTS.get(base)
+        if man is not None and man.is_fresh(deep): return man
+        man = _load_from_disk(base)
+        if man is not None and man.is_fresh(deep):
+            _MANIFESTS[base] = man
+            return man
+    log.info("[MANIFEST] Сканирование %s ...", base)
+    man = FluxManifest.build(base)
+    n_files = sum(len(t) for t in man.days.values())
+    log.info("[MANIFEST] Готово: %d наборов (geo/sel/ver), %d дней.", len(man.days), n_files)
+    _MANIFESTS[base] = man
+    _save_to_disk(man)
+    return man
@@ -0,0 +1,118 @@
+"""
+Кэш декодированных MAT-файлов (LRU с бюджетом памяти).
+Ключ - путь файла (и необязательная метка вида чтения), запись действительна, пока не изменились mtime и размер.
+При превышении бюджета вытесняются давно не использованные записи.
+Возвращаемые объекты общие для всех вызывающих - их нельзя изменять на месте.
+"""
+import os
+import sys
+import threading
+from collections import OrderedDict
+import numpy as np
+
+
+def estimate_nbytes(obj, _depth=0):
+    """Приблизительный объем памяти результата loadmat (массивы, dict, mat_struct)."""
+    if _depth > 32: return 0
+    if isinstance(obj, np.ndarray):
+        if obj.dtype == object:
+            return obj.nbytes + sum(estimate_nbytes(x, _depth + 1) for x in obj.flat)
+        return obj.nbytes
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(estimate_nbytes(v, _depth + 1) for v in obj.values())
+    if isinstance(obj, (list, tuple)):
+        return sys.getsizeof(obj) + sum(estimate_nbytes(v, _depth + 1) for v in obj)
+    if hasattr(obj, '_fieldnames'):  # scipy mat_struct
+        return sum(estimate_nbytes(getattr(obj, f, None), _depth + 1) for f in obj._fieldnames)
+    return sys.getsizeof(obj)
+
+
+class MatCache:
+    """Потокобезопасный LRU-кэш с ограничением по байтам и счетчиками попаданий."""
+
+    def __init__(self, budget_bytes):
+        self.budget_bytes = int(budget_bytes)
+        self._entries = OrderedDict()  # (path, tag) -> (stamp, value, nbytes)
+        self._lock = threading.RLock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _stamp(path):
+        st = os.stat(path)
+        return (st.st_mtime_ns, st.st_size)
+
+    def get(self, path, loader, tag=None):
+        """
+        Значение из кэша или loader(path). None от loader не кэшируется.
+        tag различает разные виды чтения одного файла (например, полный loadmat и только потоки).
+        """
+        key = (os.path.abspath(path), tag)
+        try:
+            stamp = self._stamp(key[0])
+        except OSError:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == stamp:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        value = loader(path)
+        if value is not None:
+            self.put(path, value, stamp, tag)
+        return value
+
+    def peek(self, path, tag=None):
+        """True, если актуальная запись для path уже в кэше (без учета в LRU и счетчиках)."""
+        key = (os.path.abspath(path), tag)
+        try: stamp = self._stamp(key[0])
+        except OSError: return False
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and entry[0] == stamp
+
+    def put(self, path, value, stamp=None, tag=None):
+        key = (os.path.abspath(path), tag)
+        nbytes = estimate_nbytes(value)
+        if nbytes > self.budget_bytes: return
+        if stamp is None:
+            try: stamp = self._stamp(key[0])
+            except OSError: return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None: self.current_bytes -= old[2]
+            self._entries[key] = (stamp, value, nbytes)
+            self.current_bytes += nbytes
+            self._evict()
+
+    def _evict(self):
+        while self.current_bytes > self.budget_bytes and self._entries:
+            _, (_, _, nbytes) = self._entries.popitem(last=False)
+            self.current_bytes -= nbytes
+            self.evictions += 1
+
+    def set_budget(self, budget_bytes):
+        with self._lock:
+            self.budget_bytes = int(budget_bytes)
+            self._evict()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                    'entries': len(self._entries), 'bytes': self.current_bytes,
+                    'budget': self.budget_bytes}
+
+    def stats_str(self):
+        s = self.stats()
+        return (f"hits={s['hits']} misses={s['misses']} evictions={s['evictions']} "
+                f"entries={s['entries']} {s['bytes'] / 2**20:.1f}/{s['budget'] / 2**20:.0f} MB")
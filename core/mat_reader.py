@@ -0,0 +1,262 @@
+"""
+Быстрый выборочный читатель MAT v5 для RBflux-файлов.
+Находит в файле только нужные переменные (Jday/dJday или J/dJ) и распаковывает только их:
+у остальных сжатых переменных читается и распаковывается лишь заголовок с именем.
+Числовые массивы возвращаются как обычные ndarray без обертки в mat_struct,
+с теми же dtype, формой и порядком (Fortran), что дает loadmat(squeeze_me=True).
+Неизвестные форматы (v4, v7.3/HDF5, ячейки, комплексные, разреженные) читаются через loadmat.
+Ячейки по пролетам (J{i}, dJ{i}, LTpitchp{i}) читаются поэлементно: read_cell_items
+распаковывает переменную только до последнего нужного элемента.
+"""
+import zlib
+import struct
+import numpy as np
+
+FLUX_VARS = ('Jday', 'dJday', 'J', 'dJ')
+
+# Типы элементов MAT v5
+_MI_DTYPES = {1: 'i1', 2: 'u1', 3: 'i2', 4: 'u2', 5: 'i4', 6: 'u4',
+              7: 'f4', 9: 'f8', 12: 'i8', 13: 'u8'}
+_MI_INT8, _MI_INT32, _MI_UINT32, _MI_MATRIX, _MI_COMPRESSED = 1, 5, 6, 14, 15
+_MX_CELL = 1
+_STREAM_CHUNK = 64 * 1024
+_NUMERIC_CLASSES = set(range(6, 16))  # mxDOUBLE ... mxUINT64
+_FLAG_COMPLEX, _FLAG_LOGICAL = 0x08, 0x02
+
+
+class UnsupportedMat(Exception):
+    """Файл или переменная вне поддерживаемого подмножества - нужен loadmat."""
+
+
+def _read_tag(buf, pos, bo):
+    """(тип, длина, смещение данных, смещение следующего элемента)."""
+    first, second = struct.unpack_from(bo + 'II', buf, pos)
+    if first >> 16:  # small data element: данные в тех же 8 байтах
+        return first & 0xFFFF, first >> 16, pos + 4, pos + 8
+    end = pos + 8 + second
+    if second % 8: end += 8 - second % 8
+    return first, second, pos + 8, end
+
+
+def _parse_matrix_header(buf, pos, bo):
+    """Заголовок miMATRIX: (класс, флаги, размеры, имя, смещение данных)."""
+    t, n, data, nxt = _read_tag(buf, pos, bo)
+    if t != _MI_UINT32: raise UnsupportedMat("array flags")
+    flags_word = struct.unpack_from(bo + 'I', buf, data)[0]
+    mclass, flags = flags_word & 0xFF, (flags_word >> 8) & 0xFF
+    t, n, data, nxt2 = _read_tag(buf, nxt, bo)
+    if t != _MI_INT32: raise UnsupportedMat("dims")
+    dims = struct.unpack_from(bo + f'{n // 4}i', buf, data)
+    t, n, data, nxt3 = _read_tag(buf, nxt2, bo)
+    if t != _MI_INT8: raise UnsupportedMat("name")
+    name = bytes(buf[data:data + n]).decode('latin1')
+    return mclass, flags, dims, name, nxt3
+
+
+def _numeric_from_matrix(buf, bo):
+    """Числовой массив из распакованного miMATRIX (buf начинается с его тега)."""
+    t, n, pos, _ = _read_tag(buf, 0, bo)
+    if t != _MI_MATRIX: raise UnsupportedMat("not a matrix")
+    mclass, flags, dims, name, pos = _parse_matrix_header(buf, pos, bo)
+    if mclass not in _NUMERIC_CLASSES or flags & _FLAG_COMPLEX:
+        raise UnsupportedMat(f"class {mclass}")
+    t, n, data, _ = _read_tag(buf, pos, bo)
+    if t not in _MI_DTYPES: raise UnsupportedMat(f"data type {t}")
+    dtype = np.dtype(_MI_DTYPES[t]).newbyteorder(bo)
+    arr = np.frombuffer(buf, dtype=dtype, count=n // dtype.itemsize, offset=data)
+    if not dtype.isnative: arr = arr.astype(dtype.newbyteorder('='))
+    else: arr = arr.copy()
+    arr = arr.reshape(dims, order='F')
+    return name, _squeeze(arr)
+
+
+def _squeeze(arr):
+    # Как squeeze_me=True в scipy: пустые не трогаем, 0-d превращаем в скаляр
+    if not arr.size: return arr
+    arr = np.squeeze(arr)
+    if not arr.shape and arr.dtype.isbuiltin: return arr.item()
+    return arr
+
+
+def _compressed_name(f, nbytes, bo):
+    """Имя переменной из начала сжатого элемента. Возвращает (имя, прочитанные байты)."""
+    d = zlib.decompressobj()
+    raw, out = b'', b''
+    while len(raw) < nbytes:
+        chunk = f.read(min(256, nbytes - len(raw)))
+        if not chunk: break
+        raw += chunk
+        out += d.decompress(chunk)
+        if len(out) >= 64:
+            try:
+                _, _, pos, _ = _read_tag(out, 0, bo)
+                return _parse_matrix_header(out, pos, bo)[3], raw
+            except (struct.error, UnsupportedMat):
+                if len(out) > 4096: raise UnsupportedMat("header too long")
+    _, _, pos, _ = _read_tag(out, 0, bo)
+    return _parse_matrix_header(out, pos, bo)[3], raw
+
+
+def scan(path):
+    """
+    Каталог переменных файла: список (имя, смещение, длина, сжат).
+    Сжатые переменные распаковываются только до имени.
+    """
+    with open(path, 'rb') as f:
+        header = f.read(128)
+        if len(header) < 128 or not header.startswith(b'MATLAB 5.0'):
+            raise UnsupportedMat("not a MAT v5 file")
+        endian = header[126:128]
+        if endian == b'IM': bo = '<'
+        elif endian == b'MI': bo = '>'
+        else: raise UnsupportedMat("endian")
+        entries = []
+        while True:
+            offset = f.tell()
+            tag = f.read(8)
+            if len(tag) < 8: break
+            t, n = struct.unpack(bo + 'II', tag)
+            if t == _MI_COMPRESSED:
+                name, raw = _compressed_name(f, n, bo)
+                f.seek(n - len(raw), 1)
+                entries.append((name, offset, n, True))
+            elif t == _MI_MATRIX:
+                head = f.read(min(n, 512))
+                _, _, _, name, _ = _parse_matrix_header(head, 0, bo)
+                f.seek(offset + 8 + n + (-n % 8))
+                entries.append((name, offset, n, False))
+            else:
+                raise UnsupportedMat(f"top-level type {t}")
+    return bo, entries
+
+
+def read_variables(path, names, catalog=None):
+    """
+    dict {имя: массив} только для переменных из names, которые есть в файле.
+    catalog - результат scan(path), если он уже есть.
+    Бросает UnsupportedMat, если формат вне поддерживаемого подмножества.
+    """
+    bo, entries = catalog or scan(path)
+    result = {}
+    with open(path, 'rb') as f:
+        for name, offset, n, compressed in entries:
+            if name not in names: continue
+            f.seek(offset if not compressed else offset + 8)
+            data = f.read(n + 8 if not compressed else n)
+            if compressed:
+                data = zlib.decompress(data)
+            result[name] = _numeric_from_matrix(data, bo)[1]
+    return result
+
+
+class _VarStream:
+    """
+    Содержимое одной переменной (с тегом miMATRIX), читаемое по мере надобности.
+    Сжатая переменная распаковывается потоком; уже пройденное начало отбрасывается.
+    """
+
+    def __init__(self, f, offset, n, compressed):
+        self.f = f
+        self.compressed = compressed
+        self.offset = offset
+        self.remaining = n if compressed else n + 8
+        self.decomp = zlib.decompressobj() if compressed else None
+        self.base = 0            # смещение buf[0] от начала переменной
+        self.buf = bytearray()
+        f.seek(offset + 8 if compressed else offset)
+
+    def ensure(self, end, partial=False):
+        while self.base + len(self.buf) < end and self.remaining > 0:
+            chunk = self.f.read(min(_STREAM_CHUNK, self.remaining))
+            if not chunk: break
+            self.remaining -= len(chunk)
+            self.buf += self.decomp.decompress(chunk) if self.compressed else chunk
+        if not partial and self.base + len(self.buf) < end: raise UnsupportedMat("truncated variable")
+
+    def read(self, start, end, partial=False):
+        """Байты [start, end) переменной (partial=True - сколько есть)."""
+        if not self.compressed and start >= self.base + len(self.buf):
+            # Несжатая переменная: переход прямо к элементу
+            self.f.seek(self.offset + start)
+            self.remaining = max(0, self.remaining - (start - self.base - len(self.buf)))
+            self.base, self.buf = start, bytearray()
+        self.ensure(end, partial)
+        return bytes(self.buf[start - self.base:end - self.base])
+
+    def discard(self, upto):
+        """Отбрасывает прочитанное до upto (не дальше уже распакованного)."""
+        upto = min(upto, self.base + len(self.buf))
+        if upto > self.base:
+            del self.buf[:upto - self.base]
+            self.base = upto
+
+
+def read_cell_items(path, name, items, catalog=None, offsets=None):
+    """
+    Элементы items (индексы с 0) ячейки name: (dims, {i: массив}, offsets).
+    offsets - известные границы элементов [(начало, конец), ...] внутри переменной
+    (индекс, возвращенный прошлым вызовом); дополняется по мере чтения.
+    Переменная читается/распаковывается только до конца последнего нужного элемента.
+    Пустые элементы возвращаются пустыми массивами.
+    """
+    bo, entries = catalog or scan(path)
+    entry = next((e for e in entries if e[0] == name), None)
+    if entry is None: raise KeyError(name)
+    _, offset, n, compressed = entry
+    offsets = list(offsets or [])
+    wanted = sorted({int(i) for i in items})
+    out = {}
+    with open(path, 'rb') as f:
+        stream = _VarStream(f, offset, n, compressed)
+        head = stream.read(0, 256, partial=True)  # тег + заголовок ячейки
+        t, _, pos, _ = _read_tag(head, 0, bo)
+        if t != _MI_MATRIX: raise UnsupportedMat("not a matrix")
+        mclass, _, dims, _, pos = _parse_matrix_header(head, pos, bo)
+        if mclass != _MX_CELL: raise UnsupportedMat(f"class {mclass} is not a cell")
+        n_items = int(np.prod(dims))
+        wanted = [i for i in wanted if 0 <= i < n_items]
+        for i in range(wanted[-1] + 1 if wanted else 0):
+            if i < len(offsets):
+                start, end = offsets[i]
+            else:
+                start = offsets[-1][1] if offsets else pos
+                tag = stream.read(start, start + 8)
+                end = start + _read_tag(tag, 0, bo)[3]
+                offsets.append((start, end))
+            if i == wanted[0]:
+                wanted.pop(0)
+                out[i] = _cell_numeric(stream.read(start, end), bo)
+            stream.discard(end)
+    return dims, out, offsets
+
+
+def _cell_numeric(data, bo):
+    """Числовой элемент ячейки (как loadmat(squeeze_me=True)); пустой элемент - пустой массив."""
+    _, _, pos, _ = _read_tag(data, 0, bo)
+    _, _, dims, _, _ = _parse_matrix_header(data, pos, bo)
+    if 0 in dims: return np.empty(dims)
+    return _numeric_from_matrix(data, bo)[1]
+
+
+def _pick_flux_vars(entries):
+    names = {e[0] for e in entries}
+    # Как в processing: Jday, иначе J; dJday, иначе dJ
+    return [('Jday' if 'Jday' in names else 'J'), ('dJday' if 'dJday' in names else 'dJ')]
+
+
+def load_flux_mat(path):
+    """
+    Подмножество loadmat(path, squeeze_me=True, struct_as_record=False) с переменными потока:
+    {'Jday': ..., 'dJday': ...} (или J/dJ). None, если файл не читается.
+    """
+    try:
+        catalog = scan(path)
+        return read_variables(path, _pick_flux_vars(catalog[1]), catalog)
+    except (UnsupportedMat, struct.error, zlib.error, ValueError, OSError):
+        pass
+    from scipy.io import loadmat  # только для запасного пути
+    try:
+        mat = loadmat(path, squeeze_me=True, struct_as_record=False, variable_names=list(FLUX_VARS))
+    except Exception:
+        return None
+    return {k: v for k, v in mat.items() if not k.startswith('__')}
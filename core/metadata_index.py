@@ -0,0 +1,138 @@
+"""
+Индекс file_metadata.mat.
+Таблица метаданных загружается один раз и сворачивается в словари
+(geo, selection, version) -> биннинги, поэтому запросы доступности не строят
+булевы маски по 20k строк. Скомпилированный индекс кэшируется рядом с MAT-файлом
+(<имя>.index.pkl) и пересобирается при изменении mtime/размера MAT-файла.
+"""
+import os
+import pickle
+from . import config
+from . import diagnostics
+
+log = diagnostics.get_logger(__name__)
+
+INDEX_VERSION = 1
+
+_INDEXES = {}  # path -> MetadataIndex
+
+
+def parse_version(version):
+    """'v09' -> 9.0; числа возвращаются как float."""
+    if isinstance(version, str):
+        return float(version.replace('v', ''))
+    return float(version)
+
+
+def _as_str(value):
+    # В MAT пустые ячейки приходят как пустые массивы, а не ''
+    return value if isinstance(value, str) else ''
+
+
+class MetadataIndex:
+    """Свернутая таблица метаданных (только потоки с непустым stdbinning попадают в binnings)."""
+
+    def __init__(self, versions, by_version, by_key, keys_with_files, stamp=None):
+        self.versions = versions               # отсортированные fluxVersions (как в таблице)
+        self.by_version = by_version           # version -> frozenset(binnings)
+        self.by_key = by_key                   # (geo, sel, version) -> tuple(sorted binnings)
+        self.keys_with_files = keys_with_files # (geo, sel, version), для которых есть любые строки
+        self.stamp = stamp
+
+    @classmethod
+    def from_table(cls, meta, stamp=None):
+        versions = [float(v) for v in meta['fluxVersions']]
+        geos = [_as_str(g) for g in meta['GeoSelections']]
+        sels = [_as_str(s) for s in meta['Selections']]
+        binns = [_as_str(b) for b in meta['stdbinnings']]
+
+        by_version, by_key, keys_with_files = {}, {}, set()
+        for geo, sel, ver, binn in zip(geos, sels, versions, binns):
+            key = (geo, sel, ver)
+            keys_with_files.add(key)
+            if not binn: continue
+            by_version.setdefault(ver, set()).add(binn)
+            by_key.setdefault(key, set()).add(binn)
+        return cls(sorted(set(versions)),
+                   {v: frozenset(b) for v, b in by_version.items()},
+                   {k: tuple(sorted(b)) for k, b in by_key.items()},
+                   frozenset(keys_with_files), stamp)
+
+    def binnings_for_version(self, version):
+        return self.by_version.get(parse_version(version), frozenset())
+
+    def binnings_for(self, geo, sel, version):
+        return self.by_key.get((geo, sel, parse_version(version)), ())
+
+    def has_files(self, geo, sel, version):
+        return (geo, sel, parse_version(version)) in self.keys_with_files
+
+    def to_dict(self):
+        return {'version': INDEX_VERSION, 'stamp': self.stamp, 'versions': self.versions,
+                'by_version': self.by_version, 'by_key': self.by_key,
+                'keys_with_files': self.keys_with_files}
+
+    @classmethod
+    def from_dict(cls, data):
+        if data.get('version') != INDEX_VERSION: return None
+        return cls(data['versions'], data['by_version'], data['by_key'],
+                   data['keys_with_files'], data['stamp'])
+
+
+def index_path(mat_path):
+    return os.path.splitext(mat_path)[0] + '.index.pkl'
+
+
+def _stamp(path):
+    st = os.stat(path)
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _load_compiled(mat_path, stamp):
+    path = index_path(mat_path)
+    if not os.path.exists(path): return None
+    try:
+        with open(path, 'rb') as f:
+            idx = MetadataIndex.from_dict(pickle.load(f))
+    except Exception:
+        return None
+    if idx is None or idx.stamp != stamp: return None
+    return idx
+
+
+def _save_compiled(mat_path, idx):
+    path = index_path(mat_path)
+    try:
+        tmp = path + '.tmp'
+        with open(tmp, 'wb') as f:
+            pickle.dump(idx.to_dict(), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+    except OSError as e:
+        log.error("[METADATA] Не удалось сохранить индекс %s: %s", path, e)
+
+
+def get_index(mat_path=None):
+    """
+    Индекс метаданных (память -> .index.pkl -> file_metadata.mat).
+    None, если MAT-файл недоступен или не читается.
+    """
+    mat_path = mat_path or config.METADATA_FILE
+    try:
+        stamp = _stamp(mat_path)
+    except OSError:
+        return None
+    idx = _INDEXES.get(mat_path)
+    if idx is not None and idx.stamp == stamp: return idx
+
+    idx = _load_compiled(mat_path, stamp)
+    if idx is None:
+        meta = config._load_mat_file(mat_path)
+        if not meta: return None
+        try:
+            idx = MetadataIndex.from_table(meta, stamp)
+        except (KeyError, TypeError, ValueError) as e:
+            log.error("[METADATA] Неожиданная структура %s: %s", mat_path, e)
+            return None
+        _save_compiled(mat_path, idx)
+    _INDEXES[mat_path] = idx
+    return idx
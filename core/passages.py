@@ -0,0 +1,158 @@
+"""
+Потоки по пролетам (tbin 'passage' / выбор app_state.passages при fullday=False).
+RBflux-файл хранит пролеты дня в ячейках J{i}, dJ{i} и LTpitchp{i} (живое время ячеек).
+Индекс пролетов файла (число пролетов и границы элементов ячеек) строится при первом
+чтении и хранится по (path, mtime): повторный выбор не разбирает файл заново,
+а распаковка идет только до последнего выбранного пролета (core.mat_reader.read_cell_items).
+
+Выбранные пролеты объединяются с весами живого времени (NaN-ячейки пролета не входят):
+  J = sum(J_i LT_i) / sum(LT_i),  dJ = sqrt(sum((dJ_i LT_i)^2)) / sum(LT_i).
+Без LTpitchp веса равные. Нет ячеек J или ни один номер не попал в файл - (None, None)
+и WARNING: день пропускается, полный день (Jday) вместо пролетов не подставляется.
+"""
+import os
+import struct
+import threading
+import zlib
+import warnings
+import numpy as np
+from . import config
+from . import mat_reader
+from . import diagnostics
+
+log = diagnostics.get_logger(__name__)
+
+PASSAGE_VARS = ('J', 'dJ', 'LTpitchp')
+
+_INDEX = {}  # abspath -> (mtime, PassageIndex | None)
+_LOCK = threading.Lock()
+_READ_ERRORS = (mat_reader.UnsupportedMat, struct.error, zlib.error, ValueError, KeyError)
+
+
+class PassageIndex:
+    """Каталог переменных файла и границы элементов ячеек пролетов (дополняются при чтении)."""
+
+    def __init__(self, path, stamp, catalog):
+        self.path = path
+        self.stamp = stamp
+        self.catalog = catalog
+        names = {e[0] for e in catalog[1]}
+        self.vars = [v for v in PASSAGE_VARS if v in names]
+        self.n_passages = None
+        self.offsets = {v: [] for v in self.vars}
+        self._lock = threading.Lock()
+
+    def read(self, items):
+        """{var: {i: массив}} для индексов items (с 0) по всем ячейкам пролетов файла."""
+        out = {}
+        for var in self.vars:
+            with self._lock:
+                known = list(self.offsets[var])
+            dims, values, offsets = mat_reader.read_cell_items(self.path, var, items, self.catalog, known)
+            with self._lock:
+                if len(offsets) > len(self.offsets[var]): self.offsets[var] = offsets
+                self.n_passages = int(np.prod(dims))
+            out[var] = values
+        return out
+
+
+def _stamp(path):
+    try: return os.stat(path).st_mtime_ns
+    except OSError: return None
+
+
+def get_index(path):
+    """PassageIndex файла (None - файл не читается или в нем нет ячеек J; такой ответ тоже кэшируется)."""
+    key = os.path.abspath(path)
+    stamp = _stamp(path)
+    with _LOCK:
+        entry = _INDEX.get(key)
+        if entry is not None and entry[0] == stamp: return entry[1]
+    try:
+        idx = PassageIndex(path, stamp, mat_reader.scan(path))
+        if 'J' not in idx.vars: idx = None
+    except (mat_reader.UnsupportedMat, struct.error, OSError):
+        idx = None
+    with _LOCK:
+        _INDEX[key] = (stamp, idx)
+    return idx
+
+
+def passage_count(path):
+    """Число пролетов в файле (0, если ячеек пролетов нет)."""
+    idx = get_index(path)
+    if idx is None: return 0
+    if idx.n_passages is None:
+        try: idx.read([])
+        except _READ_ERRORS: return 0
+    return idx.n_passages
+
+
+def selection(app_state):
+    """Номера выбранных пролетов (с 1) или None, если нужен полный день."""
+    if getattr(app_state, 'fullday', True): return None
+    sel = tuple(sorted({int(p) for p in (getattr(app_state, 'passages', None) or []) if int(p) >= 1}))
+    return sel or None
+
+
+def cache_tag(passages):
+    """Тег записи config.MAT_CACHE для объединенных пролетов."""
+    return ('passages', tuple(passages))
+
+
+def combine(j_list, dj_list=None, lt_list=None):
+    """Объединение пролетов с весами живого времени. Возвращает (J, dJ) в dtype J."""
+    j = np.stack([np.asarray(a, dtype=np.float64) for a in j_list])
+    if lt_list is not None: lt = np.stack([np.asarray(a, dtype=np.float64) for a in lt_list])
+    else: lt = np.ones_like(j)
+    w = np.where(np.isnan(j) | np.isnan(lt), 0.0, lt)
+    with warnings.catch_warnings(), np.errstate(invalid='ignore', divide='ignore'):
+        warnings.simplefilter("ignore")
+        w_sum = w.sum(axis=0)
+        y = np.where(w_sum > 0, np.nansum(np.where(w > 0, j * w, 0.0), axis=0) / w_sum, np.nan)
+        if dj_list is not None:
+            dj = np.stack([np.asarray(a, dtype=np.float64) for a in dj_list])
+            sq = np.nansum(np.where(w > 0, (dj * w) ** 2, 0.0), axis=0)
+            y_err = np.where(w_sum > 0, np.sqrt(sq) / w_sum, np.nan)
+        else:
+            y_err = np.zeros_like(y)
+    dtype = np.result_type(np.asarray(j_list[0]).dtype, np.float32)
+    return y.astype(dtype), y_err.astype(dtype)
+
+
+def _read_passages(path, passages):
+    """(J, dJ) выбранных пролетов с диска (индекс файла + выборочная распаковка)."""
+    idx = get_index(path)
+    if idx is None:
+        log.warning("[PASSAGES] %s: нет ячеек пролетов J, день пропускается", os.path.basename(path))
+        return None
+    items = [p - 1 for p in passages]
+    try:
+        data = idx.read(items)
+    except _READ_ERRORS as e:
+        log.warning("[PASSAGES] %s: ячейки пролетов не читаются (%s)", os.path.basename(path), e)
+        return None
+    found = [i for i in items if i in data['J'] and np.size(data['J'][i])]
+    if not found:
+        log.warning("[PASSAGES] %s: нет пролетов %s (всего %s), день пропускается",
+                    os.path.basename(path), list(passages), idx.n_passages)
+        return None
+    if len(found) < len(items):
+        log.debug("[PASSAGES] %s: нет пролетов %s (всего %s)", os.path.basename(path),
+                  [i + 1 for i in items if i not in found], idx.n_passages)
+    lt = [data['LTpitchp'][i] for i in found] if 'LTpitchp' in data else None
+    dj = [data['dJ'][i] for i in found] if 'dJ' in data else None
+    j, dj = combine([data['J'][i] for i in found], dj, lt)
+    return {'J': j, 'dJ': dj}
+
+
+def load_passages(path, passages):
+    """(J, dJ) объединенных пролетов через общий кэш config.MAT_CACHE; (None, None) - пролетов нет."""
+    mat = config.MAT_CACHE.get(path, lambda p: _read_passages(p, passages), tag=cache_tag(passages))
+    if mat is None: return None, None
+    return mat['J'], mat['dJ']
+
+
+def clear():
+    with _LOCK:
+        _INDEX.clear()
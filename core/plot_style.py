@@ -0,0 +1,108 @@
+"""
+Научный стиль графиков без зависимости от Qt.
+Общий код для виджета MplCanvas (desktop_app) и пакетного рендера (batch_render.py):
+rcParams, сетка/деления с основанием 10^n и отрисовка словаря plot_data на оси.
+Модуль не импортирует pyplot, поэтому не выбирает backend.
+"""
+import numpy as np
+import matplotlib
+from matplotlib import style as mpl_style
+from matplotlib.ticker import LogFormatterMathtext, LogLocator, ScalarFormatter
+
+DEFAULT_COLOR = '#1f77b4'
+# Цвета серий одного графика (plot_data['series']: 0, 1, ...), первая - DEFAULT_COLOR
+SERIES_COLORS = [DEFAULT_COLOR, '#d62728', '#2ca02c', '#ff7f0e', '#9467bd',
+                 '#8c564b', '#e377c2', '#17becf', '#bcbd22', '#7f7f7f']
+
+SCIENCE_RC = {
+    'font.size': 10,
+    'axes.linewidth': 1.2,
+    'xtick.direction': 'in',
+    'ytick.direction': 'in',
+    'xtick.major.size': 6,
+    'ytick.major.size': 6,
+    'xtick.minor.size': 3,
+    'ytick.minor.size': 3,
+    'legend.frameon': True,
+    'figure.facecolor': 'white'
+}
+
+
+def apply_rc():
+    """Установка научного стиля для четкости линий и делений (глобально для matplotlib)."""
+    try:
+        mpl_style.use('seaborn-v0_8-ticks')
+    except Exception:
+        mpl_style.use('ggplot')
+    matplotlib.rcParams.update(SCIENCE_RC)
+
+
+def apply_scientific_styling(ax, xscale='linear', yscale='linear'):
+    """Настройка сетки и делений с полным основанием 10^n."""
+    ax.grid(True, which='major', linestyle='-', linewidth='0.7', color='0.85')
+    ax.grid(True, which='minor', linestyle='--', linewidth='0.3', color='0.9', alpha=0.6)
+    ax.minorticks_on()
+
+    if xscale == 'log':
+        ax.set_xscale('log')
+        ax.xaxis.set_major_locator(LogLocator(base=10.0, numticks=10))
+        ax.xaxis.set_minor_locator(LogLocator(base=10.0, subs=np.arange(2, 10) * 0.1, numticks=10))
+        ax.xaxis.set_major_formatter(LogFormatterMathtext())
+    else:
+        ax.xaxis.set_major_formatter(ScalarFormatter())
+
+    if yscale == 'log':
+        ax.set_yscale('log')
+        ax.yaxis.set_major_locator(LogLocator(base=10.0, numticks=10))
+        ax.yaxis.set_minor_locator(LogLocator(base=10.0, subs=np.arange(2, 10) * 0.1, numticks=10))
+        ax.yaxis.set_major_formatter(LogFormatterMathtext())
+    else:
+        ax.yaxis.set_major_formatter(ScalarFormatter())
+
+
+def series_color(series):
+    return SERIES_COLORS[series % len(SERIES_COLORS)]
+
+
+def draw_plot_data(ax, plot_data):
+    """Отрисовка одного словаря plot_data (результат processing.get_plot_data) на оси ax."""
+    apply_scientific_styling(
+        ax,
+        xscale=plot_data.get("xscale", "linear"),
+        yscale=plot_data.get("yscale", "linear")
+    )
+
+    plot_type = plot_data.get("plot_type", "errorbar")
+    label = plot_data.get("label", "")
+
+    if plot_type == "errorbar":
+        ax.errorbar(
+            plot_data.get("x", []),
+            plot_data.get("y", []),
+            xerr=plot_data.get("x_err", None),
+            yerr=plot_data.get("y_err", None),
+            label=label,
+            color=plot_data.get("color") or series_color(plot_data.get("series", 0)),
+            linestyle='-', marker='o', markersize=4,
+            capsize=2, linewidth=1.2, elinewidth=1.0
+        )
+        if label: ax.legend(framealpha=0.8, loc='best')
+
+    elif plot_type == "stairs":
+        # Гистограмма: y - счетчики, edges - границы бинов (len(y) + 1)
+        ax.stairs(
+            plot_data.get("y", []),
+            plot_data.get("edges", None),
+            label=label,
+            color=plot_data.get("color") or series_color(plot_data.get("series", 0)),
+            fill=False, linewidth=1.2, baseline=None if plot_data.get("yscale") == "log" else 0
+        )
+        if label: ax.legend(framealpha=0.8, loc='best')
+
+    # Установка подписей осей
+    ax.set_xlabel(plot_data.get("xlabel", ""), labelpad=6, fontweight='bold')
+    # labelpad=2 существенно приближает название к оси Y
+    ax.set_ylabel(plot_data.get("ylabel", ""), labelpad=2, fontweight='bold')
+
+    if plot_data.get("title"):
+        ax.set_title(plot_data.get("title"), loc='left', fontsize=11, pad=10)
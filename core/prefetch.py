@@ -0,0 +1,117 @@
+"""
+Фоновая предзагрузка выбранных дней.
+После изменения pam_pers (DaysDialog, периоды) фоновый поток по порядку дней читает
+RBflux-файлы в общий кэш декодированных файлов (config.MAT_CACHE), пока пользователь
+настраивает L и pitch. Новый выбор отменяет текущий проход. Предзагрузка
+останавливается, не заполнив бюджет кэша, чтобы не вытеснять уже прочитанные первые дни.
+"""
+import threading
+from types import SimpleNamespace
+from . import config
+from . import cube
+from . import file_manager
+from . import loader
+from . import mat_cache
+from . import passages
+from . import diagnostics
+
+log = diagnostics.get_logger(__name__)
+
+# Сигналы ApplicationState, после которых меняется набор файлов
+_TRIGGERS = ('pam_pers_changed', 'stdbinning_changed', 'geo_selection_changed',
+             'selection_changed', 'flux_version_changed', 'passages_changed', 'fullday_changed')
+
+
+class Prefetcher:
+    """Один фоновый поток; каждый новый запрос увеличивает generation и прерывает старый."""
+
+    def __init__(self, app_state, delay=None, budget_fraction=None):
+        self.app_state = app_state
+        self.delay = config.PREFETCH_DELAY if delay is None else delay
+        self.budget_fraction = config.PREFETCH_BUDGET_FRACTION if budget_fraction is None else budget_fraction
+        self._cond = threading.Condition()
+        self._generation = 0
+        self._request = None
+        self._stopped = False
+        self._thread = None
+        self.loaded = 0  # прочитано файлов за все проходы
+
+    # --- Подписка ---
+    def start(self):
+        for name in _TRIGGERS:
+            getattr(self.app_state, name).connect(self._on_changed, sender=self.app_state)
+        self._thread = threading.Thread(target=self._run, name='pamela-prefetch', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        for name in _TRIGGERS:
+            getattr(self.app_state, name).disconnect(self._on_changed, sender=self.app_state)
+        with self._cond:
+            self._stopped = True
+            self._generation += 1
+            self._cond.notify_all()
+
+    def _on_changed(self, sender, **kwargs):
+        self.schedule()
+
+    def schedule(self):
+        """Снимок текущего выбора ставится в очередь; незаконченный проход отменяется."""
+        s = self.app_state
+        request = SimpleNamespace(pam_pers=list(s.pam_pers or []), geo_selection=s.geo_selection,
+                                  selection=s.selection, flux_version=s.flux_version,
+                                  stdbinning=s.stdbinning, fullday=s.fullday, passages=list(s.passages or []))
+        with self._cond:
+            self._generation += 1
+            self._request = request if request.pam_pers and request.stdbinning else None
+            self._cond.notify_all()
+
+    def cancel(self):
+        with self._cond:
+            self._generation += 1
+            self._request = None
+
+    # --- Поток ---
+    def _cancelled(self, generation):
+        return self._stopped or generation != self._generation
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._request is None and not self._stopped:
+                    self._cond.wait()
+                if self._stopped: return
+                request, generation = self._request, self._generation
+                # Пауза: пользователь часто задает начало и конец диапазона подряд
+                self._cond.wait(self.delay)
+                if self._cancelled(generation): continue
+                self._request = None
+            try:
+                self._prefetch(request, generation)
+            except Exception as e:
+                log.error("[PREFETCH] Ошибка предзагрузки: %s", e)
+
+    def _prefetch(self, request, generation):
+        days = request.pam_pers
+        passage_sel = passages.selection(request)
+        mc = cube.open_cube_for(request) if config.USE_MISSION_CUBE and not passage_sel else None
+        if not days: return
+        day_files = file_manager.get_input_day_files(request, days)
+        if mc is not None:
+            # Актуальные строки куба не читаются; переписанные после сборки файлы - читаются
+            day_files = [(d, p) for d, p in day_files if not (d in mc and mc.is_current(d, p))]
+
+        budget = config.MAT_CACHE.budget_bytes * self.budget_fraction
+        used, done = 0, 0
+        for _, path in day_files:
+            if self._cancelled(generation): return
+            if used >= budget: break
+            tag = passages.cache_tag(passage_sel) if passage_sel else ('flux' if config.USE_FAST_MAT_READER else None)
+            if config.MAT_CACHE.peek(path, tag):
+                continue
+            j, dj = loader.load_flux_day(path, passage_sel)
+            used += mat_cache.estimate_nbytes(j) + mat_cache.estimate_nbytes(dj)
+            done += 1
+        self.loaded += done
+        log.info("[PREFETCH] Предзагружено %d файлов из %d (%.1f MB); %s",
+                 done, len(day_files), used / 2**20, config.MAT_CACHE.stats_str())
@@ -7,43 +7,246 @@
 """
 import os
 import numpy as np
-import warnings
-from scipy.io import loadmat
+from functools import partial
+from types import SimpleNamespace
 from . import config
 from . import state
 from . import file_manager
+from . import cube
+from . import loader
+from . import spectra_cache
+from . import tracing
+from . import timeseries
+from . import histogram
+from . import binning
+from . import passages
+from . import rollup
+from . import kinematics
+from . import diagnostics
+from .reduction import SpectrumAccumulator, reduce_cells
+
+log = diagnostics.get_logger(__name__)
+
+PROJECTION_CHUNK = 256  # дней в одном векторном переносе J(E) -> J(R)
 
 def _load_mat_file(file_path):
-    if not os.path.exists(file_path): return None
-    try: return loadmat(file_path, squeeze_me=True, struct_as_record=False)
-    except: return None
-
-def _find_bin_indices(edges, values):
-    if values is None or (isinstance(values, (list, np.ndarray)) and len(values) == 0):
-        return np.array([0])
-    if not isinstance(values, (list, np.ndarray)): values = [values]
-    indices = np.searchsorted(edges, values, side='right') - 1
-    indices[indices < 0] = 0
-    indices[indices >= len(edges) - 1] = len(edges) - 2
-    return np.unique(indices)
-
-def _get_spectra_data(app_state, ax_index):
-    print(f"\n[PROCESSING] -> Построение спектра (Day {app_state.pam_pers})...")
+    # Через общий LRU-кэш декодированных файлов (config.MAT_CACHE)
+    return config._load_mat_file(file_path)
+
+def _days_str(days):
+    """Краткая запись списка дней для сообщений: [200] или 195..329 (135 дней)."""
+    days = list(days or [])
+    if len(days) <= 3: return str(days)
+    return f"{days[0]}..{days[-1]} ({len(days)} дней)"
+
+def _load_and_reduce(fpath, reducer, passage_sel=None):
+    """Воркер загрузчика: чтение файла (или выбранных пролетов) и свертка дня. Возвращает (результат, ошибка)."""
+    try:
+        j_data, dj_data = loader.load_flux_day(fpath, passage_sel)
+        if j_data is None: return None, None
+        return reducer(j_data, dj_data), None
+    except Exception as e:
+        return None, e
+
+def _resolve_days(app_state, days):
+    """
+    Источники дней: (куб или None, дни из куба, {day: path} RBflux-файлов остальных дней).
+    Строка куба берется, если файла дня нет (диск не подключен) или он не менялся после сборки куба.
+    При выборе пролетов (core.passages) куб (только полные дни) не используется.
+    """
+    mc = cube.open_cube_for(app_state) if config.USE_MISSION_CUBE and not passages.selection(app_state) else None
+    files = dict(file_manager.get_input_day_files(app_state, days))
+    in_cube = set()
+    if mc is not None:
+        in_cube = {d for d in days if d in mc and (d not in files or mc.is_current(d, files[d]))}
+        files = {d: p for d, p in files.items() if d not in in_cube}
+    return mc, in_cube, files
+
+def _day_stamps(app_state, days):
+    """Отметки источников дней (как их прочитает _iter_reduced_days): {day: mtime файла | ['cube', stamp]}."""
+    mc, in_cube, files = _resolve_days(app_state, days)
+    stamps = {d: ['cube', mc.stamp] for d in in_cube}
+    for day, path in files.items():
+        try: stamps[day] = os.stat(path).st_mtime_ns
+        except OSError: continue
+    return stamps
+
+def _iter_reduced_days(app_state, reducer, day_cache=None, block_reducer=None):
+    """
+    Источник данных по дням: (день, метка, результат reducer(J, dJ), ошибка) в порядке app_state.pam_pers.
+    Дни из собранного куба миссии (core.cube) сворачиваются строками memmap,
+    остальные RBflux-файлы читаются и сворачиваются в пуле core.loader.
+    day_cache (core.spectra_cache): дни с актуальным сохраненным результатом не читаются,
+    новые результаты дописываются в кэш после полного прохода.
+    block_reducer(mc, days) -> {day: результат}: векторная свертка дней куба блоками.
+    При выборе пролетов (core.passages) куб (только полные дни) не используется.
+    """
+    days = list(app_state.pam_pers or [])
+    passage_sel = passages.selection(app_state)
+    mc, in_cube, files = _resolve_days(app_state, days)
+    with tracing.span('cache_lookup', items=len(files)) as sp:
+        cached, mtimes = day_cache.lookup(files) if day_cache is not None else ({}, {})
+        sp.add(hits=len(cached))
+
+    cube_results = {}
+    if block_reducer is not None and in_cube:
+        try: cube_results = block_reducer(mc, [d for d in days if d in in_cube])
+        except Exception as e: log.error("    [ERROR] Блочная свертка куба: %s", e)
+
+    file_days = [d for d in days if d not in in_cube and d in files and d not in cached]
+    results = loader.map_ordered(partial(_load_and_reduce, reducer=reducer, passage_sel=passage_sel),
+                                 [files[d] for d in file_days])
+
+    fresh = {}
+    for day in days:
+        if day in cube_results:
+            yield day, f"cube day {day}", cube_results[day], None
+        elif day in in_cube:
+            try: yield day, f"cube day {day}", reducer(*mc.day(day)), None
+            except Exception as e: yield day, f"cube day {day}", None, e
+        elif day in cached:
+            yield day, os.path.basename(files[day]), cached[day], None
+        elif day in files:
+            result, error = next(results)
+            if result is None and error is None: continue
+            if result is not None: fresh[day] = result
+            yield day, os.path.basename(files[day]), result, error
+
+    if day_cache is not None and fresh:
+        day_cache.store(fresh, mtimes)
+
+def _reduce_day_cells(j_data, dj_data, l_indices, e_indices, p_indices, keep):
+    """
+    Свертка одного дня по выбранным ячейкам (L, E, P), оставляются оси keep.
+    Возвращает (y, y_err, n_valid) - см. core.reduction.reduce_cells.
+    """
+    # MATLAB: Jday(L, E, P)
+    y, y_err, n_valid = reduce_cells(j_data[None], dj_data[None] if dj_data is not None else None,
+                                     l_indices, e_indices, p_indices, keep)
+    return y[0], y_err[0], n_valid[0]
+
+def _reduce_cube_cells(mc, days, l_indices, e_indices, p_indices, keep, chunk=512):
+    """Свертка дней куба блоками (days, L, E, P) за один векторный вызов на блок: {day: (y, y_err, n)}."""
+    out = {}
+    for start in range(0, len(days), chunk):
+        found, j_block, dj_block = mc.take(days[start:start + chunk])
+        y, y_err, n_valid = reduce_cells(j_block, dj_block, l_indices, e_indices, p_indices, keep)
+        for i, day in enumerate(found):
+            out[int(day)] = (y[i], y_err[i], n_valid[i])
+    return out
+
+def _iter_cell_days(app_state, kind, l_indices, e_indices, p_indices, keep):
+    """_iter_reduced_days со сверткой по ячейкам (L, E, P) и кэшем свернутых дней вида kind."""
+    params = dict(l_indices=l_indices, e_indices=e_indices, p_indices=p_indices, keep=keep)
+    reducer = partial(_reduce_day_cells, **params)
+    block_reducer = partial(_reduce_cube_cells, **params)
+    day_cache = _spectra_cache_for(app_state, kind, **params)
+    return _iter_reduced_days(app_state, reducer, day_cache, block_reducer)
+
+def _with_days(app_state, days):
+    """Снимок запроса app_state с другим набором дней (как в core.prefetch)."""
+    return SimpleNamespace(pam_pers=list(days), geo_selection=app_state.geo_selection,
+                           selection=app_state.selection, flux_version=app_state.flux_version or 'v09',
+                           stdbinning=app_state.stdbinning, fullday=getattr(app_state, 'fullday', True),
+                           passages=list(getattr(app_state, 'passages', None) or []))
+
+def _accumulate_plain(app_state, kind, l_indices, e_indices, p_indices, keep, projection=None):
+    """
+    Свертка каждого дня app_state.pam_pers в накопитель.
+    projection (kinematics.FluxProjection) применяется к дневным спектрам до накопления -
+    векторно блоками по PROJECTION_CHUNK дней (память не растет с длиной диапазона).
+    """
+    acc = SpectrumAccumulator()
+    rows = []
+
+    def flush():
+        y_block, y_err_block = projection.apply(np.stack([r[0] for r in rows]), np.stack([r[1] for r in rows]))
+        for y_day, y_err_day in zip(y_block, y_err_block):
+            acc.add(y_day, y_err_day)
+        rows.clear()
+
+    for _, label, result, error in _iter_cell_days(app_state, kind, l_indices, e_indices, p_indices, keep):
+        if error is not None:
+            log.error("    [ERROR] Ошибка среза в %s: %s", label, error)
+            continue
+        y_day, y_err_day, _ = result
+        if projection is None:
+            acc.add(y_day, y_err_day)
+            continue
+        rows.append((y_day, y_err_day))
+        if len(rows) >= PROJECTION_CHUNK: flush()
+    if rows: flush()
+    return acc
+
+def _accumulate_days(app_state, kind, l_indices, e_indices, p_indices, keep, projection=None):
+    """
+    Общий проход по дням для всех профилей (спектр, питч, радиальный):
+    куб миссии / кэш свернутых дней / RBflux-файлы в пуле -> SpectrumAccumulator по осям keep.
+    Целиком выбранные месяцы, годы и периоды берутся из пирамиды агрегатов (core.rollup).
+    projection - перенос дневных спектров J(E) -> J(R) до накопления (см. _accumulate_plain):
+    кэш свернутых дней общий с J(E), блоки пирамиды - свои.
+    """
+    params = dict(l_indices=l_indices, e_indices=e_indices, p_indices=p_indices, keep=keep)
+    blocks, rest = [], list(app_state.pam_pers or [])
+    if config.USE_ROLLUPS:
+        blocks, rest = rollup.plan(rest)
+    if not blocks:
+        acc = _accumulate_plain(app_state, kind, l_indices, e_indices, p_indices, keep, projection)
+    else:
+        store_params = _cache_params(app_state, **params)
+        if projection is not None: store_params['projection'] = f"R:{projection.species}"
+        store = rollup.get_store(kind, store_params)
+        block_days = [d for b in blocks for d in b.days]
+        day_stamps = _day_stamps(_with_days(app_state, block_days), block_days)
+        build = lambda days: _accumulate_plain(_with_days(app_state, days), kind, projection=projection, **params)
+        acc = SpectrumAccumulator()
+        for block in blocks:
+            acc.merge(store.get(block, day_stamps, build))
+        log.info("[ROLLUP] Блоков: %d (%s), краевых дней: %d; собрано блоков за сеанс: %d",
+                 len(blocks), ", ".join(b.name for b in blocks[:4]) + (" ..." if len(blocks) > 4 else ""),
+                 len(rest), store.builds)
+        if rest:
+            acc.merge(_accumulate_plain(_with_days(app_state, rest), kind, projection=projection, **params))
+    log.info("[MAT CACHE] %s", config.MAT_CACHE.stats_str())
+    return acc
+
+def _range_str(edges, indices):
+    """Диапазон выбранных бинов по краям: '1.20-1.50'."""
+    return f"{edges[int(np.min(indices))]:.3g}-{edges[int(np.max(indices)) + 1]:.3g}"
+
+def _cache_params(app_state, **params):
+    """Ключ свертки: параметры + набор данных (+ выбранные пролеты) - для кэша дней и пирамиды."""
+    passage_sel = passages.selection(app_state)
+    if passage_sel: params['passages'] = passage_sel
+    return dict(params, geo=app_state.geo_selection, selection=app_state.selection,
+                version=app_state.flux_version or 'v09', stdbinning=app_state.stdbinning)
+
+def _spectra_cache_for(app_state, kind, **params):
+    """Кэш свернутых дней (core.spectra_cache) для текущего набора данных и параметров свертки."""
+    if not config.USE_SPECTRA_CACHE: return None
+    return spectra_cache.get_cache(kind, _cache_params(app_state, **params))
+
+def _get_spectra_data(app_state, ax_index, rigidity=None):
+    """Спектр J(E) или J(R) (rigidity=None - по переключателю app_state.ror_e)."""
+    log.info("[PROCESSING] -> Построение спектра (Day %s)...", _days_str(app_state.pam_pers))
 
     # 1. Параметры биннинга
     try:
-        idx_L, idx_P, idx_E = app_state.lb - 1, app_state.pitchb - 1, app_state.eb - 1
-        L_edges = config.BIN_INFO['Lbin'][idx_L]
-        P_edges = config.BIN_INFO['pitchbin'][idx_P]
+        idx_E = app_state.eb - 1
         
-        if app_state.ror_e == 1: # Energy
+        if rigidity is None: rigidity = app_state.ror_e != 1
+        if not rigidity: # Energy
             x_centers_all = config.BIN_INFO['Ecenters'][idx_E]
             x_err_half_all = config.BIN_INFO['dE'][idx_E] / 2.0
             x_label = "E (GeV)"
-        else: # Rigidity
-            x_centers_all = config.BIN_INFO['Rigcenters'][idx_E]
-            x_err_half_all = config.BIN_INFO['dR'][idx_E] / 2.0
+            y_label = "Flux (MeV cm^2 sr s)^-1"
+        else: # Rigidity: те же бины Ebin по жесткости протонов (таблица core.kinematics)
+            conv = kinematics.table(app_state.eb)
+            row = conv.row(kinematics.DEFAULT_SPECIES)
+            x_centers_all = conv.r_centers[row]
+            x_err_half_all = conv.dR[row] / 2.0
             x_label = "Rigidity (GV)"
+            y_label = "Flux (MV cm^2 sr s)^-1"
             
         # УДАЛЯЕМ ПОСЛЕДНИЙ БИН (Overflow) для соответствия валидации
         x_centers = x_centers_all[:-1]
@@ -51,58 +254,63 @@ def _get_spectra_data(app_state, ax_index):
         n_E_valid = len(x_centers)
         
     except Exception as e:
-        print(f"[ERROR] Ошибка биннинга: {e}")
+        log.error("[ERROR] Ошибка биннинга: %s", e)
         return []
 
     # 2. Индексы L и Pitch
-    l_indices = _find_bin_indices(L_edges, app_state.l)
-    p_indices = _find_bin_indices(P_edges, app_state.pitch)
+    l_indices = binning.indices('L', app_state.lb, app_state.l, app_state.l_max)
+    p_indices = binning.indices('pitch', app_state.pitchb, app_state.pitch, app_state.pitch_max)
 
-    # 3. Загрузка данных
-    files = file_manager.get_input_filenames(app_state, 'flux')
-    if not files: return []
+    # 3. Загрузка и свертка дней (куб миссии или RBflux-файлы, параллельно).
+    # J(R) = J(T(R)) dT/dR считается для каждого дня до усреднения (кэш свернутых дней общий с J(E))
+    e_indices = np.arange(n_E_valid)
+    projection = conv.projection(kinematics.DEFAULT_SPECIES, n_E_valid) if rigidity else None
+    acc = _accumulate_days(app_state, 'spectrum', l_indices, e_indices, p_indices, keep='E', projection=projection)
+    if acc.n_days == 0: return []
 
-    accumulated_y = []
-    accumulated_y_err = []
+    # 4. Финальный расчет (без множителя 10^7): среднее по дням, ошибка - std / sqrt(N)
+    final_y, final_y_err = acc.result()
 
-    for fpath in files:
-        mat = _load_mat_file(fpath)
-        if mat is None: continue
-        
-        j_data = mat.get('Jday', mat.get('J'))
-        dj_data = mat.get('dJday', mat.get('dJ'))
-        
-        if j_data is None: continue
+    mask = ~np.isnan(final_y) & (final_y > 0)
+    if not np.any(mask): return []
 
-        try:
-            # MATLAB: Jday(L, E, P). Срезаем по осям.
-            # Нам нужны только первые n_E_valid бинов по энергии (ось 1)
-            subset_j = j_data[l_indices, :n_E_valid, :] # <--- Срез до n_E_valid!
-            subset_j = subset_j[:, :, p_indices]
-            
-            subset_dj = dj_data[l_indices, :n_E_valid, :] if dj_data is not None else np.zeros_like(subset_j)
-            subset_dj = subset_dj[:, :, p_indices]
-
-            with warnings.catch_warnings():
-                warnings.simplefilter("ignore")
-                # Усреднение по L и Pitch
-                y_day = np.nanmean(subset_j, axis=(0, 2))
-                y_err_day = np.sqrt(np.nansum(subset_dj**2, axis=(0, 2))) / np.sum(~np.isnan(subset_j), axis=(0, 2))
-
-            accumulated_y.append(y_day)
-            accumulated_y_err.append(y_err_day)
-        except Exception as e:
-            print(f"    [ERROR] Ошибка среза в {os.path.basename(fpath)}: {e}")
-            continue
+    return [{
+        "ax_index": ax_index,
+        "plot_type": "errorbar",
+        "x": x_centers[mask],
+        "y": final_y[mask],
+        "y_err": final_y_err[mask],
+        "x_err": x_err_half[mask],
+        "xlabel": x_label,
+        "ylabel": y_label,
+        "xscale": "log", "yscale": "log",
+        "label": f"PAMELA Spectrum (Day {app_state.pam_pers})"
+    }]
 
-    if not accumulated_y: return []
+def _get_pitch_data(app_state, ax_index):
+    """Питч-угловое распределение J(alpha) по всем pitch-бинам для выбранных L и E."""
+    log.info("[PROCESSING] -> Питч-угловое распределение (Day %s)...", _days_str(app_state.pam_pers))
 
-    # 4. Финальный расчет (без множителя 10^7)
-    final_y = np.nanmean(accumulated_y, axis=0)
-    if len(accumulated_y) > 1:
-        final_y_err = np.nanstd(accumulated_y, axis=0) / np.sqrt(len(accumulated_y))
-    else:
-        final_y_err = accumulated_y_err[0]
+    # 1. Параметры биннинга
+    try:
+        idx_P = app_state.pitchb - 1
+        L_edges = binning.edges('L', app_state.lb)
+        E_edges = binning.edges('E', app_state.eb)
+        x_centers = np.asarray(config.BIN_INFO['pitchcenters'][idx_P])
+        x_err_half = np.asarray(config.BIN_INFO['dPitch'][idx_P]) / 2.0
+    except Exception as e:
+        log.error("[ERROR] Ошибка биннинга: %s", e)
+        return []
+
+    # 2. Индексы L и E; по pitch - все бины
+    l_indices = binning.indices('L', app_state.lb, app_state.l, app_state.l_max)
+    e_indices = binning.indices('E', app_state.eb, app_state.e, app_state.e_max)
+    p_indices = np.arange(len(x_centers))
+
+    # 3. Тот же проход по дням, что и для спектра (куб / кэш / пул), свертка по L и E
+    acc = _accumulate_days(app_state, 'pitch', l_indices, e_indices, p_indices, keep='P')
+    if acc.n_days == 0: return []
+    final_y, final_y_err = acc.result()
 
     mask = ~np.isnan(final_y) & (final_y > 0)
     if not np.any(mask): return []
@@ -114,14 +322,196 @@ def _get_spectra_data(app_state, ax_index):
         "y": final_y[mask],
         "y_err": final_y_err[mask],
         "x_err": x_err_half[mask],
-        "xlabel": x_label,
+        "xlabel": "Pitch angle (deg)",
         "ylabel": "Flux (MeV cm^2 sr s)^-1",
+        "xscale": "linear", "yscale": "log",
+        "label": (f"PAMELA J(α), L {_range_str(L_edges, l_indices)}, "
+                  f"E {_range_str(E_edges, e_indices)} GeV (Day {_days_str(app_state.pam_pers)})")
+    }]
+
+def _get_radial_data(app_state, ax_index):
+    """Радиальные профили J(L) по всем L-бинам: одна серия на каждый выбранный E-бин за один проход по дням."""
+    log.info("[PROCESSING] -> Радиальное распределение (Day %s)...", _days_str(app_state.pam_pers))
+
+    # 1. Параметры биннинга
+    try:
+        idx_L = app_state.lb - 1
+        E_edges = binning.edges('E', app_state.eb)
+        x_centers = np.asarray(config.BIN_INFO['Lcenters'][idx_L])
+        x_err_half = np.asarray(config.BIN_INFO['dL'][idx_L]) / 2.0
+    except Exception as e:
+        log.error("[ERROR] Ошибка биннинга: %s", e)
+        return []
+
+    # 2. Индексы: все L, выбранные E (каждый - отдельная серия), выбранные Pitch
+    l_indices = np.arange(len(x_centers))
+    e_indices = binning.indices('E', app_state.eb, app_state.e, app_state.e_max)
+    p_indices = binning.indices('pitch', app_state.pitchb, app_state.pitch, app_state.pitch_max)
+
+    # 3. Один проход по дням для всех энергий: свертка только по Pitch -> (L, E)
+    acc = _accumulate_days(app_state, 'radial', l_indices, e_indices, p_indices, keep='LE')
+    if acc.n_days == 0: return []
+    final_y, final_y_err = acc.result()
+
+    plots = []
+    for k, e_idx in enumerate(e_indices):
+        y, y_err = final_y[:, k], final_y_err[:, k]
+        mask = ~np.isnan(y) & (y > 0)
+        if not np.any(mask): continue
+        plots.append({
+            "ax_index": ax_index,
+            "plot_type": "errorbar",
+            "series": k,
+            "x": x_centers[mask],
+            "y": y[mask],
+            "y_err": y_err[mask],
+            "x_err": x_err_half[mask],
+            "xlabel": "L",
+            "ylabel": "Flux (MeV cm^2 sr s)^-1",
+            "xscale": "linear", "yscale": "log",
+            "label": f"E {_range_str(E_edges, [e_idx])} GeV (Day {_days_str(app_state.pam_pers)})"
+        })
+    return plots
+
+def _get_temporal_data(app_state, ax_index):
+    """
+    Временной ход J(t) выбранной ячейки (L, E, Pitch) по pam-дням.
+    Ряд (core.timeseries) дополняется только днями, которых в нем еще нет.
+    """
+    log.info("[PROCESSING] -> Временные вариации (Day %s)...", _days_str(app_state.pam_pers))
+
+    # 1. Параметры биннинга
+    try:
+        L_edges = binning.edges('L', app_state.lb)
+        E_edges = binning.edges('E', app_state.eb)
+    except Exception as e:
+        log.error("[ERROR] Ошибка биннинга: %s", e)
+        return []
+
+    # 2. Ячейка: выбранные L, E и Pitch сворачиваются в одно значение на день
+    l_indices, e_indices, p_indices = binning.selection(app_state)
+
+    version = app_state.flux_version or 'v09'
+    passage_sel = passages.selection(app_state)
+    series = timeseries.get_series((app_state.geo_selection, app_state.selection, version, app_state.stdbinning,
+                                    tuple(l_indices.tolist()), tuple(e_indices.tolist()), tuple(p_indices.tolist()),
+                                    passage_sel))
+
+    # 3. Только новые и изменившиеся дни (отметки источников - как в пирамиде):
+    # куб / кэш свернутых дней / RBflux-файлы в пуле
+    days = list(app_state.pam_pers or [])
+    stamps = _day_stamps(app_state, days)
+    days = [d for d in days if d in stamps]
+    missing = series.missing(days, stamps)
+    log.info("[TIMESERIES] В ряду %d дней, дочитывается %d.", len(days) - len(missing), len(missing))
+    if missing:
+        request = _with_days(app_state, missing)
+        fresh = {}
+        for day, label, result, error in _iter_cell_days(request, 'timeseries', l_indices, e_indices, p_indices, keep=''):
+            if error is not None:
+                log.error("    [ERROR] Ошибка среза в %s: %s", label, error)
+                continue
+            fresh[day] = (result[0], result[1])
+        series.update(fresh, stamps)
+
+    x_days, y, y_err = series.select(days)
+    mask = ~np.isnan(y) & (y > 0)
+    if not np.any(mask): return []
+
+    return [{
+        "ax_index": ax_index,
+        "plot_type": "errorbar",
+        "x": x_days[mask],
+        "y": y[mask],
+        "y_err": y_err[mask],
+        "dates": timeseries.dates(x_days[mask]),
+        "xlabel": "Pamela day",
+        "ylabel": "Flux (MeV cm^2 sr s)^-1",
+        "xscale": "linear", "yscale": "log",
+        "label": (f"PAMELA J(t), L {_range_str(L_edges, l_indices)}, E {_range_str(E_edges, e_indices)} GeV, "
+                  f"{timeseries.pam_to_date_str(x_days[0])}..{timeseries.pam_to_date_str(x_days[-1])}")
+    }]
+
+def _histogram_day(j_data, dj_data, l_indices, e_indices, p_indices, edges):
+    """Счетчики одного дня [underflow, бины..., overflow] (кортеж - для кэша свернутых дней)."""
+    return (histogram.histogram_block(j_data[None], l_indices, e_indices, p_indices, edges)[0],)
+
+def _histogram_cube_days(mc, days, l_indices, e_indices, p_indices, edges, chunk=512):
+    """Гистограммы дней куба блоками: {day: (counts,)}."""
+    out = {}
+    for start in range(0, len(days), chunk):
+        found, j_block, _ = mc.take(days[start:start + chunk])
+        counts = histogram.histogram_block(j_block, l_indices, e_indices, p_indices, edges)
+        for i, day in enumerate(found):
+            out[int(day)] = (counts[i],)
+    return out
+
+def _get_histogram_data(app_state, ax_index):
+    """
+    Гистограмма значений J в выбранных ячейках (L, E, Pitch) по всем выбранным дням.
+    Дневные гистограммы считаются параллельно (пул загрузчика) и складываются;
+    в памяти - только вектор счетчиков.
+    """
+    log.info("[PROCESSING] -> Гистограмма потоков (Day %s)...", _days_str(app_state.pam_pers))
+
+    # 1. Параметры биннинга
+    try:
+        L_edges = binning.edges('L', app_state.lb)
+        E_edges = binning.edges('E', app_state.eb)
+    except Exception as e:
+        log.error("[ERROR] Ошибка биннинга: %s", e)
+        return []
+
+    l_indices, e_indices, p_indices = binning.selection(app_state)
+    edges = histogram.log_edges()
+
+    # 2. Дневные гистограммы: куб / кэш свернутых дней / RBflux-файлы в пуле
+    params = dict(l_indices=l_indices, e_indices=e_indices, p_indices=p_indices, edges=edges)
+    reducer = partial(_histogram_day, **params)
+    block_reducer = partial(_histogram_cube_days, **params)
+    day_cache = _spectra_cache_for(app_state, 'histogram', **params)
+
+    hist = histogram.StreamingHistogram(edges)
+    for _, label, result, error in _iter_reduced_days(app_state, reducer, day_cache, block_reducer):
+        if error is not None:
+            log.error("    [ERROR] Ошибка среза в %s: %s", label, error)
+            continue
+        hist.add_counts(result[0])
+    if hist.n_days == 0: return []
+    if hist.underflow or hist.overflow:
+        log.warning("[HISTOGRAM] Вне диапазона %s: %d ниже, %d выше.", config.HIST_RANGE, hist.underflow, hist.overflow)
+
+    bin_edges, counts = hist.trimmed()
+    if counts is None: return []
+
+    return [{
+        "ax_index": ax_index,
+        "plot_type": "stairs",
+        "edges": bin_edges,
+        "y": counts,
+        "xlabel": "Flux (MeV cm^2 sr s)^-1",
+        "ylabel": "Counts",
         "xscale": "log", "yscale": "log",
-        "label": f"PAMELA Spectrum (Day {app_state.pam_pers})"
+        "label": (f"L {_range_str(L_edges, l_indices)}, E {_range_str(E_edges, e_indices)} GeV "
+                  f"(Day {_days_str(app_state.pam_pers)}, N={hist.total})")
     }]
 
+# Движки по имени вида графика (config.PLOT_KINDS); номер из GUI -> имя: config.PLOT_KIND_IDS
+_ENGINES = {
+    'Energy spectra': _get_spectra_data,
+    'Rigidity spectra': partial(_get_spectra_data, rigidity=True),
+    'pitch-angular distribution': _get_pitch_data,
+    'Radial distribution': _get_radial_data,
+    'Temporal variations': _get_temporal_data,
+    'Fluxes Histogram': _get_histogram_data,
+}
+
 def get_plot_data(app_state, ax_index=0):
     pk = app_state.plot_kind
-    if pk == 0 or pk == 1:
-        return _get_spectra_data(app_state, ax_index)
-    return []
+    with tracing.span('process', plot_kind=pk, days=len(app_state.pam_pers or [])):
+        engine = _ENGINES.get(config.PLOT_KIND_IDS.get(pk))
+        if engine is None:
+            log.warning("[PROCESSING] Вид графика %s (%s) пока не поддерживается.",
+                        pk, config.PLOT_KIND_IDS.get(pk, '?'))
+            return []
+        return engine(app_state, ax_index)
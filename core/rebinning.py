@@ -0,0 +1,110 @@
+"""
+Перебиннинг потоков между строками BinningInfo.mat (Lbin, pitchbin, Ebin) без чтения исходных файлов.
+Для пары строк одной оси строится разреженная матрица перекрытий W (n_dst x n_src):
+W[j, i] - длина пересечения бина-приемника j с бином-источником i. Матрицы кэшируются.
+
+Поток на новой сетке - среднее по перекрытию с учетом только не-NaN источников:
+  J_j = sum_i W_ji J_i / sum_i W_ji [J_i не NaN],  dJ_j = sqrt(sum_i (W_ji dJ_i)^2) / sum_i W_ji [...].
+Бин-приемник без перекрытия с не-NaN источниками - NaN. Оси блока (..., L, E, P) пересчитываются
+по очереди (разреженно-плотное произведение по всем дням сразу).
+
+    J2, dJ2 = rebinning.project(J, dJ, 'P3L4E4', 'P3L3E3')   # J: (дни, L, E, P) или (L, E, P)
+"""
+import re
+import threading
+import warnings
+import numpy as np
+from . import binning
+
+AXES = ('L', 'E', 'pitch')  # порядок осей в блоке потока (L, E, P)
+_BINNING_RE = re.compile(r'P(\d+)L(\d+)([ER])(\d+)')
+
+_MATRICES = {}
+_LOCK = threading.Lock()
+
+
+def overlap(src_edges, dst_edges):
+    """Разреженная (CSR) матрица длин перекрытий бинов dst (строки) и src (столбцы)."""
+    from scipy import sparse  # scipy импортируется только при первом перебиннинге
+    src = np.asarray(src_edges, dtype=np.float64).ravel()
+    dst = np.asarray(dst_edges, dtype=np.float64).ravel()
+    # Для каждого бина-приемника - диапазон пересекающихся с ним источников
+    first = np.searchsorted(src, dst[:-1], side='right') - 1
+    last = np.searchsorted(src, dst[1:], side='left')
+    first, last = np.clip(first, 0, len(src) - 2), np.clip(last, 0, len(src) - 1)
+    rows = np.repeat(np.arange(len(dst) - 1), np.maximum(last - first, 0))
+    cols = np.concatenate([np.arange(a, b) for a, b in zip(first, last)] or [np.empty(0, dtype=np.intp)])
+    cols = cols.astype(np.intp)
+    w = np.minimum(src[cols + 1], dst[rows + 1]) - np.maximum(src[cols], dst[rows])
+    keep = w > 0
+    return sparse.csr_matrix((w[keep], (rows[keep], cols[keep])), shape=(len(dst) - 1, len(src) - 1))
+
+
+def matrix(axis, src_row, dst_row):
+    """Кэшированная матрица перекрытий оси 'L' | 'E' | 'pitch' между строками биннинга (с 1)."""
+    key = (axis, int(src_row), int(dst_row))
+    with _LOCK:
+        m = _MATRICES.get(key)
+    if m is None:
+        m = overlap(binning.edges(axis, src_row), binning.edges(axis, dst_row))
+        with _LOCK:
+            m = _MATRICES.setdefault(key, m)
+    return m
+
+
+def binning_rows(stdbinning):
+    """Номера строк {'L', 'E', 'pitch'} и ось энергии ('E' | 'R') из имени stdbinning ('P3L4E4')."""
+    m = _BINNING_RE.search(stdbinning or '')
+    if not m: raise ValueError(f"Не удалось разобрать биннинг: {stdbinning}")
+    return {'pitch': int(m.group(1)), 'L': int(m.group(2)), 'E': int(m.group(4))}, m.group(3)
+
+
+def _apply_axis(j, dj, valid, w, axis):
+    """Перебиннинг одной оси: произведения W на блоки, развернутые в (n_src, остальное)."""
+    j, dj, valid = (np.moveaxis(a, axis, 0) for a in (j, dj, valid))
+    shape, n_src = j.shape[1:], j.shape[0]
+    num = w @ np.where(valid, j, 0.0).reshape(n_src, -1)
+    den = w @ valid.reshape(n_src, -1).astype(np.float64)
+    err = w.multiply(w) @ (np.where(valid, dj, 0.0) ** 2).reshape(n_src, -1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        j = np.where(den > 0, num / den, np.nan)
+        dj = np.where(den > 0, np.sqrt(err) / den, np.nan)
+    out_shape = (w.shape[0],) + shape
+    j, dj = j.reshape(out_shape), dj.reshape(out_shape)
+    return (np.moveaxis(j, 0, axis), np.moveaxis(dj, 0, axis), np.moveaxis(~np.isnan(j), 0, axis))
+
+
+def apply(j_block, dj_block, matrices):
+    """
+    Перебиннинг блока (..., L, E, P). matrices - {ось: матрица перекрытий} (оси без матрицы не меняются).
+    dj_block=None - без ошибок. Возвращает (J, dJ) в dtype блока.
+    """
+    j = np.asarray(j_block, dtype=np.float64)
+    dj = np.zeros_like(j) if dj_block is None else np.asarray(dj_block, dtype=np.float64)
+    valid = ~np.isnan(j)
+    dj = np.where(np.isnan(dj), 0.0, dj)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        for k, axis in enumerate(AXES):
+            w = matrices.get(axis)
+            if w is None: continue
+            pos = j.ndim - len(AXES) + k
+            if j.shape[pos] != w.shape[1]:
+                raise ValueError(f"Ось {axis}: {j.shape[pos]} бинов в блоке, матрица на {w.shape[1]}")
+            j, dj, valid = _apply_axis(j, dj, valid, w, pos)
+    dtype = np.result_type(np.asarray(j_block).dtype, np.float32)
+    return j.astype(dtype), dj.astype(dtype)
+
+
+def project(j_block, dj_block, src_binning, dst_binning):
+    """Блок (..., L, E, P) из биннинга src_binning на сетку dst_binning (имена stdbinning)."""
+    (src, src_kind), (dst, dst_kind) = binning_rows(src_binning), binning_rows(dst_binning)
+    if src_kind != dst_kind:
+        raise ValueError(f"{src_binning} -> {dst_binning}: перебиннинг между E и R не поддерживается")
+    mats = {axis: matrix(axis, src[axis], dst[axis]) for axis in AXES if src[axis] != dst[axis]}
+    return apply(j_block, dj_block, mats)
+
+
+def clear():
+    with _LOCK:
+        _MATRICES.clear()
@@ -0,0 +1,186 @@
+"""
+Свертка дневных спектров.
+SpectrumAccumulator - потоковое усреднение по дням (NaN-устойчивый алгоритм Уэлфорда):
+память O(nE), промежуточный результат доступен после любого дня.
+reduce_cells - векторная свертка блока дней (days, L, E, P) по выбранным L, E и Pitch
+(спектры, питч-распределения, радиальные профили).
+"""
+import warnings
+import numpy as np
+from . import tracing
+
+
+AXES = 'LEP'  # оси ячейки дня Jday(L, E, P); в блоке перед ними ось дней
+
+
+def _axis_selector(idx):
+    """Непрерывный набор индексов -> срез (без копирования), иначе массив индексов."""
+    idx = np.asarray(idx, dtype=np.intp).ravel()
+    if len(idx) and np.all(np.diff(idx) == 1):
+        return slice(int(idx[0]), int(idx[-1]) + 1)
+    return idx
+
+
+def select_cells(block, l_indices, e_indices, p_indices):
+    """
+    Подблок (days, nL, nE, nP) одной комбинированной выборкой np.ix_ (одна копия данных).
+    Если все наборы индексов непрерывны, возвращается срез (без копирования).
+    """
+    sels = [_axis_selector(i) for i in (l_indices, e_indices, p_indices)]
+    if all(isinstance(sl, slice) for sl in sels):
+        return block[(slice(None),) + tuple(sels)]
+    idx = [np.arange(block.shape[ax + 1])[sl] if isinstance(sl, slice) else sl for ax, sl in enumerate(sels)]
+    return block[np.ix_(np.arange(block.shape[0]), *idx)]
+
+
+def select_block(block, l_indices, p_indices, n_E):
+    """Подблок спектра (days, nL, n_E, nP): первые n_E энергетических бинов."""
+    return select_cells(block, l_indices, np.arange(min(n_E, block.shape[2])), p_indices)
+
+
+def reduce_cells(j_block, dj_block, l_indices, e_indices, p_indices, keep='E'):
+    """
+    Свертка всех дней блока J, dJ (days, L, E, P) за один вызов.
+    Усредняются оси, не перечисленные в keep ('E' - спектр, 'P' - питч-распределение,
+    'LE' - радиальные профили для нескольких энергий).
+    Возвращает (y, y_err, n_valid) формы (days, *оставленные оси):
+      y     - nanmean J по сворачиваемым осям,
+      y_err - sqrt(nansum dJ^2) / n_valid,
+      n_valid - число не-NaN ячеек J.
+    dj_block=None - ошибки нулевые.
+    """
+    axes = tuple(i + 1 for i, ax in enumerate(AXES) if ax not in keep)
+    n_days = len(j_block)
+    with tracing.span('slice', items=n_days):
+        sub_j = select_cells(j_block, l_indices, e_indices, p_indices)
+        sub_dj = select_cells(dj_block, l_indices, e_indices, p_indices) if dj_block is not None else None
+    with tracing.span('reduce', items=n_days), warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        n_valid = np.sum(~np.isnan(sub_j), axis=axes)
+        y = np.nanmean(sub_j, axis=axes)
+        sq = np.zeros_like(y) if sub_dj is None else np.nansum(sub_dj ** 2, axis=axes)
+        y_err = np.sqrt(sq) / n_valid
+    return y, y_err, n_valid
+
+
+def reduce_spectra_block(j_block, dj_block, l_indices, p_indices, n_E):
+    """
+    Спектры всех дней блока: (y, y_err, n_valid) формы (days, n_E),
+    усреднение J по выбранным L и Pitch (см. reduce_cells).
+    """
+    e_indices = np.arange(min(n_E, j_block.shape[2]))
+    return reduce_cells(j_block, dj_block, l_indices, e_indices, p_indices, keep='E')
+
+
+class SpectrumAccumulator:
+    """
+    Накопитель дневных спектров (y, y_err) по энергетическим бинам.
+    result() совпадает с прежним расчетом по спискам:
+      y     = nanmean(y_days)
+      y_err = nanstd(y_days) / sqrt(N_days), а для одного дня - его собственная y_err.
+    Дополнительно копится квадратурная сумма дневных ошибок (quadrature_error).
+    """
+
+    def __init__(self):
+        self.n_days = 0
+        self.count = None   # число дней с не-NaN значением в каждом бине
+        self.mean = None
+        self.m2 = None      # сумма квадратов отклонений от среднего
+        self.err2 = None    # сумма y_err^2 (без NaN)
+        self.err_count = None
+        self.dtype = None
+        self._first_err = None
+
+    def _init(self, y, y_err):
+        shape = np.shape(y)
+        self.dtype = np.result_type(y, np.float32)
+        self.count = np.zeros(shape, dtype=np.int64)
+        self.mean = np.zeros(shape, dtype=np.float64)
+        self.m2 = np.zeros(shape, dtype=np.float64)
+        self.err2 = np.zeros(shape, dtype=np.float64)
+        self.err_count = np.zeros(shape, dtype=np.int64)
+        self._first_err = np.array(y_err, copy=True)
+
+    def add(self, y, y_err):
+        """Добавляет спектр одного дня."""
+        y = np.asarray(y)
+        if self.n_days == 0: self._init(y, y_err)
+        elif y.shape != self.mean.shape:
+            raise ValueError(f"Форма спектра {y.shape} не совпадает с {self.mean.shape}")
+        self.n_days += 1
+
+        y64 = y.astype(np.float64)
+        valid = ~np.isnan(y64)
+        self.count += valid
+        delta = np.where(valid, y64 - self.mean, 0.0)
+        self.mean += delta / np.maximum(self.count, 1)
+        self.m2 += np.where(valid, delta * (y64 - self.mean), 0.0)
+
+        e64 = np.asarray(y_err, dtype=np.float64)
+        e_valid = ~np.isnan(e64)
+        self.err2 += np.where(e_valid, e64 * e64, 0.0)
+        self.err_count += e_valid
+
+    def merge(self, other):
+        """Объединяет с другим накопителем (параллельные части диапазона, Чан и др.)."""
+        if other.n_days == 0: return self
+        if self.n_days == 0:
+            self.__dict__.update({k: (v.copy() if isinstance(v, np.ndarray) else v)
+                                  for k, v in other.__dict__.items()})
+            return self
+        n = self.count + other.count
+        delta = other.mean - self.mean
+        safe_n = np.maximum(n, 1)
+        self.mean = self.mean + delta * other.count / safe_n
+        self.m2 = self.m2 + other.m2 + delta * delta * self.count * other.count / safe_n
+        self.count = n
+        self.err2 += other.err2
+        self.err_count += other.err_count
+        self.n_days += other.n_days
+        return self
+
+    def sums(self):
+        """
+        Накопленное в виде сумм (для core.rollup): sum y, sum y^2, sum y_err^2,
+        число не-NaN y и y_err по элементам, число дней.
+        """
+        if self.n_days == 0: return None
+        return {'sum': self.mean * self.count, 'sumsq': self.m2 + self.count * self.mean ** 2,
+                'err2': self.err2.copy(), 'count': self.count.copy(), 'err_count': self.err_count.copy(),
+                'n_days': self.n_days, 'dtype': np.dtype(self.dtype).str}
+
+    @classmethod
+    def from_sums(cls, sums):
+        """Накопитель из сумм sums() - результат тот же, что при добавлении этих дней по одному."""
+        acc = cls()
+        if not sums or int(sums['n_days']) == 0: return acc
+        count = np.asarray(sums['count'], dtype=np.int64)
+        safe = np.maximum(count, 1)
+        acc.n_days = int(sums['n_days'])
+        acc.count = count.copy()
+        acc.mean = np.where(count > 0, np.asarray(sums['sum'], dtype=np.float64) / safe, 0.0)
+        acc.m2 = np.maximum(np.asarray(sums['sumsq'], dtype=np.float64) - count * acc.mean ** 2, 0.0)
+        acc.err2 = np.asarray(sums['err2'], dtype=np.float64).copy()
+        acc.err_count = np.asarray(sums['err_count'], dtype=np.int64).copy()
+        acc.dtype = np.dtype(str(sums['dtype']))
+        # Один день: его собственная ошибка
+        acc._first_err = np.where(acc.err_count > 0, np.sqrt(acc.err2), np.nan).astype(acc.dtype)
+        return acc
+
+    def result(self):
+        """(y, y_err) по уже добавленным дням или None, если дней еще нет."""
+        if self.n_days == 0: return None
+        with np.errstate(invalid='ignore', divide='ignore'):
+            y = np.where(self.count > 0, self.mean, np.nan)
+            if self.n_days == 1:
+                y_err = self._first_err.copy()
+            else:
+                std = np.sqrt(np.where(self.count > 0, self.m2 / self.count, np.nan))
+                y_err = std.astype(self.dtype) / np.sqrt(self.n_days)
+        return y.astype(self.dtype), y_err
+
+    def quadrature_error(self):
+        """sqrt(sum y_err^2) / N по дням с известной ошибкой (NaN, если таких нет)."""
+        if self.n_days == 0: return None
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.sqrt(self.err2) / np.where(self.err_count > 0, self.err_count, np.nan)
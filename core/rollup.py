@@ -0,0 +1,204 @@
+"""
+Пирамида агрегатов свернутых дней: пользовательские периоды, годы, месяцы.
+Для вида свертки и параметров запроса (тот же ключ, что у кэша свернутых дней
+core.spectra_cache: вид + индексы бинов + version/selection/geo/stdbinning) каждый блок хранит
+  sum y, sum y^2, sum y_err^2, число не-NaN y и y_err по элементам, число дней
+(SpectrumAccumulator.sums). Длинный запрос складывает несколько блоков, целиком покрытых
+выбранными днями, и сворачивает как обычно только краевые дни.
+
+Блок действителен, пока не изменился набор (день, источник) его дней: источники те же, что
+у посуточного чтения (куб миссии с его отметкой или mtime RBflux-файла). Устаревший или
+отсутствующий блок пересобирается из дней (через кэш свернутых дней) при первом запросе;
+блок, в котором свернулись не все дни с данными, не сохраняется.
+
+Сборка заранее (все блоки в диапазоне для текущих L/E/pitch):
+    python -m core.rollup RB3 ItalianH v09 P3L4E4 --first 1 --last 3650 --plot-kind 1 --l 1.2 --pitch 50
+"""
+import os
+import json
+import hashlib
+import argparse
+import threading
+import numpy as np
+from . import config
+from . import spectra_cache
+from . import timeseries
+from . import rebinning
+from . import diagnostics
+from .reduction import SpectrumAccumulator
+
+log = diagnostics.get_logger(__name__)
+
+LEVELS = ('period', 'year', 'month')  # порядок выбора блоков: сначала пользовательские периоды
+
+_STORES = {}
+_LOCK = threading.Lock()
+
+
+class Block:
+    """Блок пирамиды: уровень, имя ('2008', '2008-03', имя периода) и все pam-дни блока."""
+    __slots__ = ('level', 'name', 'days')
+
+    def __init__(self, level, name, days):
+        self.level = level
+        self.name = name
+        self.days = list(days)
+
+    def __repr__(self):
+        return f"Block({self.level} {self.name}: {self.days[0]}..{self.days[-1]})"
+
+
+def calendar_blocks(days):
+    """Блоки-годы и блоки-месяцы, пересекающиеся с днями (все календарные дни каждого блока)."""
+    days = sorted({int(d) for d in days})
+    if not days: return []
+    first, last = timeseries.pam_to_date(days[0]), timeseries.pam_to_date(days[-1])
+    blocks = []
+    for year in range(first.year, last.year + 1):
+        y0 = timeseries.date_str_to_pam(f"{year}-01-01")
+        y1 = timeseries.date_str_to_pam(f"{year + 1}-01-01")
+        blocks.append(Block('year', str(year), range(y0, y1)))
+        for month in range(1, 13):
+            m0 = timeseries.date_str_to_pam(f"{year}-{month:02d}-01")
+            m1 = timeseries.date_str_to_pam(f"{year + month // 12}-{month % 12 + 1:02d}-01")
+            if m1 <= days[0] or m0 > days[-1]: continue
+            blocks.append(Block('month', f"{year}-{month:02d}", range(m0, m1)))
+    return blocks
+
+
+def period_blocks(periods=None):
+    """Пользовательские периоды {имя: (первый, последний pam-день)} (config.ROLLUP_PERIODS)."""
+    periods = config.ROLLUP_PERIODS if periods is None else periods
+    return [Block('period', name, range(int(a), int(b) + 1)) for name, (a, b) in sorted(periods.items())]
+
+
+def plan(days, periods=None):
+    """
+    Блоки, целиком покрытые днями запроса (без пересечений; крупные - первыми),
+    и оставшиеся (краевые) дни в исходном порядке.
+    """
+    selected = {int(d) for d in days}
+    claimed, chosen = set(), []
+    candidates = period_blocks(periods) + calendar_blocks(selected)
+    order = {level: i for i, level in enumerate(LEVELS)}
+    candidates.sort(key=lambda b: (order[b.level], -len(b.days)))
+    for block in candidates:
+        bdays = set(block.days)
+        if bdays <= selected and not bdays & claimed:
+            chosen.append(block)
+            claimed |= bdays
+    chosen.sort(key=lambda b: b.days[0])
+    return chosen, [d for d in days if int(d) not in claimed]
+
+
+def _stamp(block, day_stamps):
+    """Хэш набора (день, отметка источника) дней блока: mtime файла или отметка куба."""
+    items = [(day, day_stamps[day]) for day in block.days if day in day_stamps]
+    return hashlib.sha1(json.dumps(items).encode('ascii')).hexdigest()
+
+
+class RollupStore:
+    """Блоки одного вида свертки и набора параметров (каталог ROLLUP_PATH/<kind>_<digest>)."""
+
+    def __init__(self, kind, params):
+        self.kind = kind
+        self.path = os.path.join(config.ROLLUP_PATH, f"{kind}_{spectra_cache.digest(kind, params)}")
+        self._memory = {}  # (level, name) -> (stamp, sums)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.builds = 0
+
+    def _file(self, block):
+        return os.path.join(self.path, f"{block.level}_{block.name}.npz")
+
+    def _load(self, block):
+        key = (block.level, block.name)
+        with self._lock:
+            if key in self._memory: return self._memory[key]
+        fpath = self._file(block)
+        if not os.path.exists(fpath): return None
+        try:
+            with np.load(fpath) as z:
+                entry = (str(z['stamp']), {k: z[k] for k in z.files if k != 'stamp'})
+        except Exception as e:
+            log.warning("[ROLLUP] Поврежденный блок %s: %s", fpath, e)
+            return None
+        with self._lock:
+            self._memory[key] = entry
+        return entry
+
+    def _save(self, block, stamp, sums):
+        with self._lock:
+            self._memory[(block.level, block.name)] = (stamp, sums)
+        try:
+            os.makedirs(self.path, exist_ok=True)
+            fpath = self._file(block)
+            tmp = fpath + '.tmp.npz'
+            np.savez(tmp, stamp=np.array(stamp), **sums)
+            os.replace(tmp, fpath)
+        except OSError as e:
+            log.error("[ROLLUP] Не удалось записать блок %s: %s", block, e)
+
+    def get(self, block, day_stamps, build):
+        """
+        Накопитель блока. day_stamps: {day: отметка источника} (куб или файл; хотя бы для дней блока);
+        build(days) -> SpectrumAccumulator - свертка дней блока при промахе.
+        Блок сохраняется, только если свернуты все его дни, для которых есть данные.
+        """
+        stamp = _stamp(block, day_stamps)
+        entry = self._load(block)
+        if entry is not None and entry[0] == stamp:
+            self.hits += 1
+            return SpectrumAccumulator.from_sums(entry[1])
+        days = [d for d in block.days if d in day_stamps]
+        if not days: return SpectrumAccumulator()
+        acc = build(days)
+        if acc.n_days < len(days):
+            log.warning("[ROLLUP] %s: свернуто %d дней из %d, блок не сохраняется", block, acc.n_days, len(days))
+            return acc
+        self._save(block, stamp, {k: np.asarray(v) for k, v in acc.sums().items()})
+        self.builds += 1
+        return acc
+
+
+def get_store(kind, params):
+    """Хранилище блоков для вида свертки и параметров (один объект на процесс)."""
+    probe = RollupStore(kind, params)
+    with _LOCK:
+        return _STORES.setdefault(probe.path, probe)
+
+
+def clear_memory():
+    with _LOCK:
+        _STORES.clear()
+
+
+def main(argv=None):
+    from types import SimpleNamespace
+    from . import processing
+    parser = argparse.ArgumentParser(description="Сборка блоков пирамиды (месяцы, годы, периоды) для запроса")
+    parser.add_argument('geo'); parser.add_argument('selection')
+    parser.add_argument('version'); parser.add_argument('stdbinning')
+    parser.add_argument('--first', type=int, required=True, help="первый pam-день")
+    parser.add_argument('--last', type=int, required=True, help="последний pam-день")
+    parser.add_argument('--plot-kind', type=int, default=1, help="номер вида графика (config.PLOT_KIND_IDS)")
+    parser.add_argument('--lb', type=int, default=None); parser.add_argument('--eb', type=int, default=None)
+    parser.add_argument('--pitchb', type=int, default=None)
+    for axis in ('l', 'e', 'pitch'):
+        parser.add_argument(f'--{axis}', type=float, nargs='*', default=[])
+        parser.add_argument(f'--{axis}-max', type=float, nargs='*', default=[])
+    args = parser.parse_args(argv)
+
+    # Номера строк биннинга из имени stdbinning (P3L4E4, P3L12E10)
+    rows, energy_axis = rebinning.binning_rows(args.stdbinning)
+    state = SimpleNamespace(
+        geo_selection=args.geo, selection=args.selection, flux_version=args.version,
+        stdbinning=args.stdbinning, pam_pers=list(range(args.first, args.last + 1)),
+        lb=args.lb or rows['L'], eb=args.eb or rows['E'], pitchb=args.pitchb or rows['pitch'],
+        ror_e=1 if energy_axis == 'E' else 2, plot_kind=args.plot_kind, fullday=True, passages=[],
+        l=args.l, l_max=args.l_max, e=args.e, e_max=args.e_max, pitch=args.pitch, pitch_max=args.pitch_max)
+    processing.get_plot_data(state)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+"""
+Дисковый кэш свернутых дневных результатов (спектров).
+Для одного набора параметров запроса (version, selection, geo, stdbinning,
+биннинги, набор L-бинов, набор pitch-бинов, ...) хранит по каждому дню результат
+свертки (y, y_err, число валидных ячеек) в компактных бинарных шардах .npz
+(по SHARD_DAYS дней). Запись дня действительна, пока не изменился mtime исходного файла.
+Повторный PLOT того же диапазона с теми же L/pitch не читает RBflux-файлы.
+"""
+import os
+import json
+import hashlib
+import threading
+import numpy as np
+from . import config
+from . import diagnostics
+
+log = diagnostics.get_logger(__name__)
+
+CACHE_VERSION = 1
+SHARD_DAYS = 256
+
+_CACHES = {}
+_LOCK = threading.Lock()
+
+
+def _mtime_ns(path):
+    try: return os.stat(path).st_mtime_ns
+    except OSError: return None
+
+
+def _normalize(value):
+    if isinstance(value, np.ndarray): return [_normalize(v) for v in value.tolist()]
+    if isinstance(value, (list, tuple)): return [_normalize(v) for v in value]
+    if isinstance(value, np.generic): return value.item()
+    return value
+
+
+def normalize_params(params):
+    return {k: _normalize(v) for k, v in sorted(params.items())}
+
+
+def digest(kind, params):
+    """Короткий хэш вида свертки и параметров (имя каталога кэша; тот же ключ у core.rollup)."""
+    blob = json.dumps({'kind': kind, 'v': CACHE_VERSION, 'params': normalize_params(params)}, sort_keys=True)
+    return hashlib.sha1(blob.encode('utf-8')).hexdigest()[:16]
+
+
+class ReducedDayCache:
+    """
+    Кэш результатов одного вида свертки.
+    Результат дня - кортеж массивов одинаковой формы для всех дней (например, (y, y_err, n_valid)).
+    """
+
+    def __init__(self, kind, params):
+        self.kind = kind
+        self.params = normalize_params(params)
+        self.digest = digest(kind, params)
+        self.path = os.path.join(config.SPECTRA_CACHE_PATH, f"{kind}_{self.digest}")
+        self._shards = {}  # shard_id -> (file_mtime, dict)
+        self.hits = 0
+        self.misses = 0
+
+    # --- Шарды ---
+    def _shard_file(self, shard_id):
+        return os.path.join(self.path, f"shard_{shard_id:05d}.npz")
+
+    def _load_shard(self, shard_id):
+        fpath = self._shard_file(shard_id)
+        stamp = _mtime_ns(fpath)
+        cached = self._shards.get(shard_id)
+        if cached is not None and cached[0] == stamp: return cached[1]
+        data = {}
+        if stamp is not None:
+            try:
+                with np.load(fpath) as z:
+                    n_fields = int(z['n_fields'])
+                    fields = [z[f'f{i}'] for i in range(n_fields)]
+                    for i, day in enumerate(z['days']):
+                        data[int(day)] = (int(z['mtimes'][i]), tuple(f[i] for f in fields))
+            except Exception as e:
+                log.warning("[SPECTRA CACHE] Поврежденный шард %s: %s", fpath, e)
+                data = {}
+        self._shards[shard_id] = (stamp, data)
+        return data
+
+    def _save_shard(self, shard_id, data):
+        os.makedirs(self.path, exist_ok=True)
+        days = sorted(data)
+        n_fields = len(data[days[0]][1])
+        arrays = {'days': np.array(days, dtype=np.int32),
+                  'mtimes': np.array([data[d][0] for d in days], dtype=np.int64),
+                  'n_fields': np.array(n_fields)}
+        for i in range(n_fields):
+            arrays[f'f{i}'] = np.stack([np.asarray(data[d][1][i]) for d in days])
+        fpath = self._shard_file(shard_id)
+        tmp = fpath + '.tmp.npz'
+        np.savez(tmp, **arrays)
+        os.replace(tmp, fpath)
+        self._shards[shard_id] = (_mtime_ns(fpath), data)
+
+    # --- API ---
+    def lookup(self, day_files):
+        """
+        {day: результат} для дней, чей результат есть в кэше и исходный файл не менялся.
+        day_files: {day: path}. Возвращает также mtimes всех файлов для последующего store().
+        """
+        found, mtimes = {}, {}
+        for day, path in day_files.items():
+            mtimes[day] = _mtime_ns(path)
+            entry = self._load_shard(day // SHARD_DAYS).get(day)
+            if entry is not None and entry[0] == mtimes[day]:
+                found[day] = entry[1]
+        self.hits += len(found)
+        self.misses += len(day_files) - len(found)
+        return found, mtimes
+
+    def store(self, results, mtimes):
+        """Сохраняет {day: результат} с mtime исходных файлов (дни без mtime пропускаются)."""
+        by_shard = {}
+        for day, result in results.items():
+            if mtimes.get(day) is None: continue
+            by_shard.setdefault(day // SHARD_DAYS, {})[day] = (mtimes[day], tuple(result))
+        for shard_id, new in by_shard.items():
+            data = dict(self._load_shard(shard_id))
+            data.update(new)
+            try:
+                self._save_shard(shard_id, data)
+            except OSError as e:
+                log.error("[SPECTRA CACHE] Не удалось записать шард: %s", e)
+
+
+def get_cache(kind, params):
+    """Кэш для вида свертки и параметров запроса (один объект на процесс)."""
+    probe = ReducedDayCache(kind, params)
+    with _LOCK:
+        return _CACHES.setdefault(probe.path, probe)
+
+
+def clear_memory():
+    with _LOCK:
+        _CACHES.clear()
@@ -6,6 +6,9 @@
 
 from blinker import signal
 from . import config
+from . import diagnostics
+
+log = diagnostics.get_logger(__name__)
 
 class ApplicationState:
     # --- Сигналы ---
@@ -58,7 +61,7 @@ class ApplicationState:
     what_changed = signal('what_changed')
 
     def __init__(self):
-        print("Инициализация ApplicationState...")
+        log.debug("Инициализация ApplicationState...")
         
         self._gen = 1
         self._flux_version = 'v09'
@@ -107,7 +110,7 @@ class ApplicationState:
         self._units = 1
         self._n_min = 0
 
-        print("ApplicationState инициализирован.")
+        log.debug("ApplicationState инициализирован.")
 
     # --- Properties ---
 
@@ -310,9 +313,9 @@ class ApplicationState:
         if self._n_min != value: self._n_min = value; self.n_min_changed.send(self, value=value)
 
     def update_multiple(self, **kwargs):
-        print(f"Обновление нескольких полей: {kwargs}")
+        log.debug("Обновление нескольких полей: %s", kwargs)
         for key, value in kwargs.items():
             if hasattr(self, key):
                 setattr(self, key, value)
             else:
-                print(f"ВНИМАНИЕ: Попытка обновить несуществующее поле '{key}'")
+                log.warning("ВНИМАНИЕ: Попытка обновить несуществующее поле '%s'", key)
@@ -0,0 +1,96 @@
+"""
+Временные ряды J(t) одной ячейки (L, E, Pitch) по pam-дням.
+Ряд хранится в памяти процесса как {день: (J, dJ, отметка источника)}; при расширении
+диапазона дней читаются только недостающие дни и дни, чей источник изменился (mtime
+RBflux-файла или отметка куба миссии, как в core.rollup); остальное берется из ряда
+(дни - из куба миссии, кэша свернутых дней или RBflux-файлов, см. processing._get_temporal_data).
+Здесь же перевод pam-дней в календарные даты (отсчет от 2005-12-31).
+"""
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+import numpy as np
+
+PAM_BASE_DATE = datetime(2005, 12, 31)  # pam-день 0
+MAX_SERIES = 64                         # рядов в памяти (самые старые вытесняются)
+
+_SERIES = OrderedDict()
+_LOCK = threading.Lock()
+
+
+def pam_to_date(pam_day):
+    return PAM_BASE_DATE + timedelta(days=float(pam_day))
+
+
+def pam_to_date_str(pam_day):
+    try:
+        return pam_to_date(pam_day).strftime('%Y-%m-%d')
+    except Exception: return ""
+
+
+def date_str_to_pam(date_str):
+    try:
+        dt = datetime.strptime(date_str, '%Y-%m-%d')
+        return int((dt - PAM_BASE_DATE).days)
+    except ValueError: return None
+
+
+class TimeSeries:
+    """Ряд одной ячейки: значения по pam-дням, дополняемый новыми днями."""
+
+    def __init__(self):
+        self._values = {}  # day -> (y, y_err, отметка источника)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._values)
+
+    def __contains__(self, day):
+        return int(day) in self._values
+
+    def missing(self, days, stamps=None):
+        """
+        Дни из запроса, которых еще нет в ряду или чья отметка источника
+        отличается от stamps {day: отметка} (в порядке запроса).
+        """
+        with self._lock:
+            if stamps is None: return [d for d in days if int(d) not in self._values]
+            return [d for d in days if int(d) not in self._values
+                    or self._values[int(d)][2] != stamps.get(d)]
+
+    def update(self, values, stamps=None):
+        """values: {day: (y, y_err)}; stamps: {day: отметка источника} тех же дней."""
+        stamps = stamps or {}
+        with self._lock:
+            for day, (y, y_err) in values.items():
+                self._values[int(day)] = (float(y), float(y_err), stamps.get(day))
+
+    def select(self, days):
+        """(days, y, y_err) - массивы по дням запроса, которые есть в ряду (по возрастанию дня)."""
+        with self._lock:
+            found = sorted({int(d) for d in days if int(d) in self._values})
+            vals = [self._values[d] for d in found]
+        y = np.array([v[0] for v in vals], dtype=np.float64)
+        y_err = np.array([v[1] for v in vals], dtype=np.float64)
+        return np.array(found, dtype=np.int64), y, y_err
+
+
+def get_series(key):
+    """Ряд для ключа (набор данных + ячейка); создается пустым при первом запросе."""
+    with _LOCK:
+        series = _SERIES.pop(key, None)
+        if series is None: series = TimeSeries()
+        _SERIES[key] = series
+        while len(_SERIES) > MAX_SERIES:
+            _SERIES.popitem(last=False)
+        return series
+
+
+def dates(days):
+    """Календарные даты 'YYYY-MM-DD' для pam-дней."""
+    return [pam_to_date_str(d) for d in days]
+
+
+def clear():
+    with _LOCK:
+        _SERIES.clear()
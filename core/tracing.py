@@ -0,0 +1,126 @@
+"""
+Трассировка горячего пути (discover, load, read, slice, reduce, draw).
+Вложенные интервалы (span) с временем, байтами и числом элементов; экспорт в формат
+Chrome trace (chrome://tracing, Perfetto), вложенность видна по времени внутри потока. Выключено по умолчанию: span() возвращает
+общий пустой объект, поэтому в выключенном состоянии цена - один вызов функции.
+
+Включение: переменная окружения PAMELA_TRACE=1 или config.TRACE_ENABLED / tracing.enable().
+
+    with tracing.span('load', items=1) as sp:
+        ...
+        if sp: sp.add(bytes=os.path.getsize(path))   # аргументы считаются только при включенной трассировке
+"""
+import os
+import json
+import time
+import threading
+from . import config
+
+MAX_EVENTS = 200000
+
+_enabled = bool(config.TRACE_ENABLED)
+_events = []
+_lock = threading.Lock()
+_t0 = time.perf_counter()
+_pid = os.getpid()
+
+
+class _NullSpan:
+    """Пустой span выключенной трассировки (ложный в bool)."""
+    __slots__ = ()
+    def __enter__(self): return self
+    def __exit__(self, *exc): return False
+    def __bool__(self): return False
+    def add(self, **counters): pass
+
+
+_NULL = _NullSpan()
+
+
+class Span:
+    __slots__ = ('name', 'args', 'start')
+
+    def __init__(self, name, args):
+        self.name = name
+        self.args = args
+        self.start = 0.0
+
+    def __bool__(self): return True
+
+    def add(self, **counters):
+        """Прибавляет счетчики (bytes, items, ...) к аргументам span."""
+        for k, v in counters.items():
+            self.args[k] = self.args.get(k, 0) + v
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter()
+        if exc_type is not None: self.args['error'] = exc_type.__name__
+        if len(_events) < MAX_EVENTS:
+            _events.append({'name': self.name, 'ph': 'X', 'pid': _pid, 'tid': threading.get_ident(),
+                            'ts': (self.start - _t0) * 1e6, 'dur': (end - self.start) * 1e6,
+                            'args': self.args})
+        return False
+
+
+def span(name, **args):
+    """Контекст интервала name; args - начальные счетчики/метки."""
+    if not _enabled: return _NULL
+    return Span(name, args)
+
+
+def enabled():
+    return _enabled
+
+
+def enable(on=True):
+    global _enabled
+    _enabled = bool(on)
+
+
+def reset():
+    """Очищает накопленные события (например, перед новым PLOT)."""
+    with _lock:
+        _events.clear()
+
+
+def events():
+    with _lock:
+        return list(_events)
+
+
+def summary():
+    """{name: {'count', 'seconds', счетчики...}} по всем событиям."""
+    out = {}
+    for ev in events():
+        s = out.setdefault(ev['name'], {'count': 0, 'seconds': 0.0})
+        s['count'] += 1
+        s['seconds'] += ev['dur'] / 1e6
+        for k, v in ev['args'].items():
+            if isinstance(v, (int, float)) and not isinstance(v, bool):
+                s[k] = s.get(k, 0) + v
+    return out
+
+
+def summary_str():
+    lines = [f"{'span':<12} {'count':>7} {'total, ms':>11} {'bytes':>12} {'items':>7}"]
+    for name, s in sorted(summary().items(), key=lambda kv: -kv[1]['seconds']):
+        lines.append(f"{name:<12} {s['count']:>7} {s['seconds'] * 1e3:11.2f} "
+                     f"{s.get('bytes', ''):>12} {s.get('items', ''):>7}")
+    return "\n".join(lines)
+
+
+def export_chrome(path):
+    """Пишет события в JSON формата Chrome trace. Возвращает путь."""
+    evs = events()
+    tids = {ev['tid'] for ev in evs}
+    threads = {t.ident: t.name for t in threading.enumerate()}
+    meta = [{'name': 'thread_name', 'ph': 'M', 'pid': _pid, 'tid': tid,
+             'args': {'name': threads.get(tid, str(tid))}} for tid in tids]
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump({'traceEvents': meta + evs, 'displayTimeUnit': 'ms'}, f)
+    return path
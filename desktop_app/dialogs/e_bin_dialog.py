@@ -5,7 +5,7 @@ import numpy as np
 from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QTableWidget, QTableWidgetItem,
                              QPushButton, QHBoxLayout, QAbstractItemView)
 from PyQt5.QtCore import Qt
-from core import config
+from core import kinematics
 from core.state import ApplicationState
 
 class EBinDialog(QDialog):
@@ -49,13 +49,13 @@ class EBinDialog(QDialog):
 
     def populate_table(self):
         """
-        Заполняет E/R бинами из config.BIN_INFO
+        Заполняет E/R бинами строки Ebin (R - из core.kinematics)
         """
         try:
-            # -1 т.к. Eb в MATLAB начинается с 1
-            eb_idx = self.app_state.eb - 1
-            e_bins = config.BIN_INFO['Ebin'][eb_idx]
-            r_bins = config.BIN_INFO['Rig'][eb_idx]
+            # Границы R протонов из кэша core.kinematics (строка Ebin с 1, как eb)
+            conv = kinematics.table(self.app_state.eb)
+            e_bins = conv.t_edges
+            r_bins = conv.rigidity_edges('p')
         except (IndexError, TypeError, KeyError):
             self.table.setRowCount(1)
             self.table.setColumnCount(1)
@@ -90,9 +90,9 @@ class EBinDialog(QDialog):
             return
             
         try:
-            eb_idx = self.app_state.eb - 1
-            e_bins = config.BIN_INFO['Ebin'][eb_idx]
-            r_bins = config.BIN_INFO['Rig'][eb_idx]
+            conv = kinematics.table(self.app_state.eb)
+            e_bins = conv.t_edges
+            r_bins = conv.rigidity_edges('p')
             
             e_values = [e_bins[row] for row in selected_rows]
             e_max_values = [e_bins[row + 1] for row in selected_rows]
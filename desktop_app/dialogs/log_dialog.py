@@ -0,0 +1,77 @@
+"""
+Диалог журнала диагностики.
+Показывает записи кольцевого буфера core.diagnostics (последние LOG_RING_SIZE сообщений ядра)
+с фильтром по уровню и позволяет включить подробный (DEBUG) режим на время сеанса.
+"""
+from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QPlainTextEdit,
+                             QPushButton, QComboBox, QLabel, QCheckBox)
+from PyQt5.QtGui import QFont
+from core import diagnostics
+
+LEVELS = [('DEBUG', diagnostics.DEBUG), ('INFO', diagnostics.INFO),
+          ('WARNING', diagnostics.WARNING), ('ERROR', diagnostics.ERROR)]
+
+
+class LogDialog(QDialog):
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+
+        self.setWindowTitle("Diagnostics Log")
+        self.setGeometry(150, 150, 900, 500)
+
+        main_layout = QVBoxLayout()
+        self.setLayout(main_layout)
+
+        # 1. Фильтр и режим
+        top_layout = QHBoxLayout()
+        top_layout.addWidget(QLabel("Show level:"))
+        self.level_combo = QComboBox()
+        for name, _ in LEVELS: self.level_combo.addItem(name)
+        self.level_combo.setCurrentIndex(0)
+        self.level_combo.currentIndexChanged.connect(self.refresh)
+        top_layout.addWidget(self.level_combo)
+
+        self.debug_check = QCheckBox("Verbose core (DEBUG)")
+        self.debug_check.setChecked(diagnostics.get_logger('').level == diagnostics.DEBUG)
+        self.debug_check.toggled.connect(self.on_debug_toggled)
+        top_layout.addWidget(self.debug_check)
+        top_layout.addStretch()
+        main_layout.addLayout(top_layout)
+
+        # 2. Текст журнала
+        self.text = QPlainTextEdit()
+        self.text.setReadOnly(True)
+        self.text.setFont(QFont("Courier New", 9))
+        main_layout.addWidget(self.text)
+
+        # 3. Кнопки
+        button_layout = QHBoxLayout()
+        btn_refresh = QPushButton("Refresh")
+        btn_refresh.clicked.connect(self.refresh)
+        btn_clear = QPushButton("Clear")
+        btn_clear.clicked.connect(self.on_clear)
+        btn_close = QPushButton("Close")
+        btn_close.clicked.connect(self.accept)
+        button_layout.addStretch()
+        button_layout.addWidget(btn_refresh)
+        button_layout.addWidget(btn_clear)
+        button_layout.addWidget(btn_close)
+        main_layout.addLayout(button_layout)
+
+        self.refresh()
+
+    def refresh(self):
+        """Форматирует записи буфера (только при показе)."""
+        min_level = LEVELS[self.level_combo.currentIndex()][1]
+        lines = diagnostics.RING.lines(min_level)
+        self.text.setPlainText("\n".join(lines))
+        bar = self.text.verticalScrollBar()
+        bar.setValue(bar.maximum())
+
+    def on_clear(self):
+        diagnostics.RING.clear()
+        self.refresh()
+
+    def on_debug_toggled(self, checked):
+        diagnostics.set_level('', diagnostics.DEBUG if checked else diagnostics.INFO)
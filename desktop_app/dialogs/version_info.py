@@ -4,12 +4,11 @@
 Создает диалоговое окно, показывающее таблицу версий и биннингов.
 """
 import re
-import numpy as np
 from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QTableWidget, QTableWidgetItem,
                              QPushButton, QHBoxLayout, QWidget, QAbstractItemView,
                              QHeaderView)
 from PyQt5.QtCore import Qt
-from core import config
+from core import metadata_index
 from core.state import ApplicationState
 
 class VersionInfoDialog(QDialog):
@@ -63,9 +62,9 @@ class VersionInfoDialog(QDialog):
         Заполняет таблицу, портируя логику из VersionInfo.m
         """
         
-        # --- (Эта логика почти 1-в-1 скопирована из binnings.py) ---
-        meta_data = config._load_mat_file(config.METADATA_FILE)
-        if not meta_data:
+        # --- Запросы к индексу метаданных (core.metadata_index) ---
+        index = metadata_index.get_index()
+        if index is None:
             self.table.setRowCount(1)
             self.table.setColumnCount(1)
             self.table.setItem(0, 0, QTableWidgetItem("Ошибка: file_metadata.mat не найден"))
@@ -73,14 +72,11 @@ class VersionInfoDialog(QDialog):
 
         # TODO: Портировать чтение versioninfo.dat
         # ВРЕМЕННАЯ ЗАГЛУШКА: Используем только fluxVersions
-        all_flux_versions = sorted(np.unique(meta_data['fluxVersions']))
+        all_flux_versions = index.versions
         
         current_geo = self.app_state.geo_selection
         current_sel = self.app_state.selection
         
-        flux_pre_indices = (meta_data['GeoSelections'] == current_geo) & \
-                           (meta_data['Selections'] == current_sel)
-        
         table_headers = []
         table_columns_data = [] # Список списков [ ('P3L3E3', 'binning'), ('P1L1E1', 'binning'), ... ]
         self.cell_info_map = {} # Карта для хранения данных о ячейке 'row,col' -> info
@@ -93,12 +89,9 @@ class VersionInfoDialog(QDialog):
             
             # (Пропускаем aux_ver, pre_ver... для простоты, т.к. нет versioninfo.dat)
             
-            flux_files = flux_pre_indices & (meta_data['fluxVersions'] == flux_ver)
-            
             column_data = []
-            if np.any(flux_files):
-                flux_stdbinnings = meta_data['stdbinnings'][flux_files]
-                unique_stdbinnings = sorted(list(np.unique(flux_stdbinnings[flux_stdbinnings != ''])))
+            if index.has_files(current_geo, current_sel, flux_ver):
+                unique_stdbinnings = index.binnings_for(current_geo, current_sel, flux_ver)
                 
                 for row, binning in enumerate(unique_stdbinnings):
                     column_data.append(binning)
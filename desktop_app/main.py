@@ -9,6 +9,7 @@
 
 import sys
 import os
+import time
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, 
                              QHBoxLayout, QVBoxLayout, QLabel,
                              QPushButton, QButtonGroup, QScrollArea)
@@ -19,6 +20,9 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from core.state import ApplicationState
 from core import processing 
+from core import config
+from core import tracing
+from core.prefetch import Prefetcher
 from desktop_app.qt_connector import QtConnector
 
 # --- Импорты виджетов ---
@@ -31,6 +35,7 @@ from desktop_app.ui_panels.plot_controls import create_plot_controls_widget
 from desktop_app.ui_panels.geomagnetic_params import create_geomag_params_widget
 from desktop_app.ui_panels.plot_button import create_plot_button_widget 
 from desktop_app.matplotlib_widget import MplCanvas
+from desktop_app.dialogs.log_dialog import LogDialog
 
 class MainWindow(QMainWindow):
     def __init__(self):
@@ -40,6 +45,8 @@ class MainWindow(QMainWindow):
         
         self.app_state = ApplicationState()
         self.connector = QtConnector(self.app_state)
+        # Фоновое чтение выбранных дней, пока пользователь настраивает L/pitch
+        self.prefetcher = Prefetcher(self.app_state).start() if config.USE_PREFETCH else None
 
         self.setWindowTitle(f"PAMELA DrawTool (Python/PyQt) - Фаза 4")
         self.setGeometry(100, 100, 1200, 800)
@@ -100,6 +107,9 @@ class MainWindow(QMainWindow):
         self.view_group.addButton(btn_view_1, 1); self.view_group.addButton(btn_view_4, 4)
         view_controls_layout.addWidget(btn_view_1); view_controls_layout.addWidget(btn_view_4)
         view_controls_layout.addStretch()
+        btn_log = QPushButton("Log...")
+        btn_log.clicked.connect(self.on_show_log)
+        view_controls_layout.addWidget(btn_log)
         right_layout.addLayout(view_controls_layout)
 
         self.plot_canvas = MplCanvas(self) 
@@ -123,32 +133,21 @@ class MainWindow(QMainWindow):
         """Переключает режим отображения графиков."""
         self.plot_canvas.set_layout_mode(mode_id)
 
+    def on_show_log(self):
+        """Журнал диагностики ядра (кольцевой буфер core.diagnostics)."""
+        LogDialog(self).exec_()
+
     def on_plot_button_clicked(self):
         """Обработчик нажатия на кнопку PLOT."""
         print("\n===================================")
         print("Кнопка PLOT нажата!")
         print("Собираем данные из app_state...")
         
+        tracing.reset()
         try:
-            self.plot_canvas.clear_all_axes()
-            
-            # Запрашиваем данные у ядра
-            plot_data_list = processing.get_plot_data(self.app_state, ax_index=0)
-            
-            if not plot_data_list:
-                print(">>> processing.py вернул ПУСТОЙ список.")
-                if self.plot_canvas.axes_list:
-                    ax = self.plot_canvas.axes_list[0]
-                    ax.text(0.5, 0.5, 
-                            "Данные не сгенерированы.\n(processing.py вернул пустой список)", 
-                            ha='center', va='center', 
-                            transform=ax.transAxes)
-                    self.plot_canvas.canvas.draw()
-            else:
-                print(f">>> processing.py успешно вернул {len(plot_data_list)} набор(а) данных.")
-                for plot_data in plot_data_list:
-                    self.plot_canvas.draw_plot(plot_data)
-        
+            with tracing.span('PLOT'):
+                self._draw_plots()
+
         except Exception as e:
             print(f"!!! КРИТИЧЕСКАЯ ОШИБКА: {e}")
             import traceback
@@ -161,8 +160,40 @@ class MainWindow(QMainWindow):
                         transform=ax.transAxes)
                 self.plot_canvas.canvas.draw()
             
+        self._export_trace()
         print("===================================\n")
 
+    def _draw_plots(self):
+        """Запрос данных у ядра и отрисовка на холсте."""
+        self.plot_canvas.clear_all_axes()
+
+        # Запрашиваем данные у ядра
+        plot_data_list = processing.get_plot_data(self.app_state, ax_index=0)
+
+        if not plot_data_list:
+            print(">>> processing.py вернул ПУСТОЙ список.")
+            if self.plot_canvas.axes_list:
+                ax = self.plot_canvas.axes_list[0]
+                ax.text(0.5, 0.5, 
+                        "Данные не сгенерированы.\n(processing.py вернул пустой список)", 
+                        ha='center', va='center', 
+                        transform=ax.transAxes)
+                self.plot_canvas.canvas.draw()
+        else:
+            print(f">>> processing.py успешно вернул {len(plot_data_list)} набор(а) данных.")
+            for plot_data in plot_data_list:
+                self.plot_canvas.draw_plot(plot_data)
+
+    def _export_trace(self):
+        """Chrome trace последнего PLOT (только при включенной трассировке, core.tracing)."""
+        if not tracing.enabled(): return
+        path = os.path.join(config.TRACE_PATH, time.strftime('plot_%Y%m%d_%H%M%S.json'))
+        try:
+            tracing.export_chrome(path)
+            print(f"[TRACE] {path}\n{tracing.summary_str()}")
+        except OSError as e:
+            print(f"[TRACE] Не удалось сохранить трассу: {e}")
+
 if __name__ == "__main__":
     try:
         from PyQt5.QtCore import Qt
@@ -4,33 +4,21 @@
 Исправлена логика парсинга (regex) и регистр (lb, eb).
 """
 import re
-import numpy as np
 from PyQt5.QtWidgets import QWidget, QHBoxLayout, QLabel, QComboBox, QGroupBox
 from PyQt5.QtGui import QColor
 from PyQt5.QtCore import Qt, QSignalBlocker
 from core import config
+from core import metadata_index
 from core.state import ApplicationState
 from desktop_app.qt_connector import QtConnector
 
-# --- (Код _get_available_binnings остается тем же) ---
-try:
-    _META_DATA = config._load_mat_file(config.METADATA_FILE)
-    if _META_DATA is None:
-        print("Binnings.py: Не удалось загрузить file_metadata.mat. Фильтрация будет отключена.")
-        _META_DATA = {}
-except Exception as e:
-    print(f"Binnings.py: Ошибка загрузки file_metadata.mat: {e}. Фильтрация будет отключена.")
-    _META_DATA = {}
-
+# --- Доступные биннинги берутся из индекса метаданных (core.metadata_index) ---
 def _get_available_binnings(flux_version_str: str) -> set:
-    if not _META_DATA:
+    index = metadata_index.get_index()
+    if index is None:
         return set(config.BINNING_STR)
     try:
-        version_num = float(flux_version_str.replace('v', ''))
-        version_matches = (_META_DATA['fluxVersions'] == version_num) & \
-                          (_META_DATA['stdbinnings'] != '')
-        available = np.unique(_META_DATA['stdbinnings'][version_matches])
-        return set(available)
+        return set(index.binnings_for_version(flux_version_str))
     except Exception as e:
         print(f"Ошибка фильтрации биннингов: {e}")
         return set(config.BINNING_STR)
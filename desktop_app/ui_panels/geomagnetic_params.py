@@ -109,7 +109,8 @@ def create_geomag_params_widget(app_state: ApplicationState, connector: QtConnec
     # === L-Shell ===
     # MIN
     def on_l_min_edit():
-        try: app_state.l = [float(v) for v in edit_l_min.text().split(',') if v.strip()]
+        # Введенные значения - отдельные бины: старые l_max из диалога не должны превращать их в диапазоны
+        try: app_state.update_multiple(l=[float(v) for v in edit_l_min.text().split(',') if v.strip()], l_max=[])
         except: connector.l_changed.emit(app_state.l)
     edit_l_min.editingFinished.connect(on_l_min_edit)
     connector.l_changed.connect(lambda v: edit_l_min.setText(_list_to_str(v, ".3f")))
@@ -122,7 +123,7 @@ def create_geomag_params_widget(app_state: ApplicationState, connector: QtConnec
     # === PITCH ===
     # MIN
     def on_pitch_min_edit():
-        try: app_state.pitch = [float(v) for v in edit_pitch_min.text().split(',') if v.strip()]
+        try: app_state.update_multiple(pitch=[float(v) for v in edit_pitch_min.text().split(',') if v.strip()], pitch_max=[])
         except: connector.pitch_changed.emit(app_state.pitch)
     edit_pitch_min.editingFinished.connect(on_pitch_min_edit)
     connector.pitch_changed.connect(lambda v: edit_pitch_min.setText(_list_to_str(v, ".1f")))
@@ -138,8 +139,8 @@ def create_geomag_params_widget(app_state: ApplicationState, connector: QtConnec
         try:
             vals = [float(v) for v in edit_e_min.text().split(',') if v.strip()]
             e_gev = np.array(vals) / (1000.0 if combo_e_units.currentIndex()==0 else 1.0)
-            r_gv = kinematics.convert_T_to_R(e_gev, 0.938, 1.0, 1.0)
-            app_state.update_multiple(e=list(e_gev), rig=list(r_gv), is_e=True)
+            r_gv = kinematics.t_to_r(e_gev, 'p')
+            app_state.update_multiple(e=list(e_gev), rig=list(r_gv), e_max=[], rig_max=[], is_e=True)
         except: connector.e_changed.emit(app_state.e)
     edit_e_min.editingFinished.connect(on_e_edit)
     
@@ -4,30 +4,19 @@
 
 Объединяет управление Tbin/Period, датами, днями и пролетами.
 """
-from datetime import datetime, timedelta
 from PyQt5.QtWidgets import (QWidget, QHBoxLayout, QLabel, QComboBox, 
                              QLineEdit, QPushButton, QGroupBox, QVBoxLayout, QCheckBox, QMessageBox)
 from PyQt5.QtCore import QSignalBlocker
 from core import config
+from core import file_manager
+from core import passages
 from core.state import ApplicationState
+from core.timeseries import pam_to_date_str, date_str_to_pam
 from desktop_app.qt_connector import QtConnector
 from desktop_app.dialogs.long_periods import LongPeriodsDialog
 from desktop_app.dialogs.days_dialog import DaysDialog
 
-def pam_to_date_str(pam_day):
-    try:
-        base_date = datetime(2005, 12, 31)
-        target_date = base_date + timedelta(days=float(pam_day))
-        return target_date.strftime('%Y-%m-%d')
-    except Exception: return ""
-
-def date_str_to_pam(date_str):
-    try:
-        dt = datetime.strptime(date_str, '%Y-%m-%d')
-        base_date = datetime(2005, 12, 31)
-        delta = dt - base_date
-        return int(delta.days)
-    except ValueError: return None
+MAX_PASS_INFO_DAYS = 20
 
 def _list_to_str(val_list):
     if not val_list: return ""
@@ -192,7 +181,12 @@ def create_periods_widget(app_state: ApplicationState, connector: QtConnector, p
     connector.fullday_changed.connect(on_core_fullday_changed)
     
     def on_show_pass_click():
-        QMessageBox.information(parent_window, "TODO", "Диалог выбора пролетов (PassageStat) требует портирования.")
+        # Полный диалог PassageStat еще не портирован: показываем число пролетов по индексу файлов
+        days = list(app_state.pam_pers or [])[:MAX_PASS_INFO_DAYS]
+        lines = [f"Day {day}: {passages.passage_count(path)} passages"
+                 for day, path in file_manager.get_input_day_files(app_state, days)]
+        if len(app_state.pam_pers or []) > len(days): lines.append("...")
+        QMessageBox.information(parent_window, "Passages", "\n".join(lines) or "Нет файлов для выбранных дней.")
     btn_show_pass.clicked.connect(on_show_pass_click)
 
     # 4. Инициализация
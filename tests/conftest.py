@@ -0,0 +1,17 @@
+import pytest
+
+from core import config, rollup, spectra_cache
+
+
+@pytest.fixture
+def cache_dirs(tmp_path, monkeypatch):
+    """Кэши (кубы, свернутые дни, пирамида) во временной папке; без фоновой предзагрузки."""
+    cache = tmp_path / 'cache'
+    monkeypatch.setattr(config, 'CACHE_PATH', str(cache))
+    monkeypatch.setattr(config, 'CUBE_PATH', str(cache / 'cubes'))
+    monkeypatch.setattr(config, 'SPECTRA_CACHE_PATH', str(cache / 'spectra'))
+    monkeypatch.setattr(config, 'ROLLUP_PATH', str(cache / 'rollups'))
+    monkeypatch.setattr(config, 'USE_PREFETCH', False)
+    yield cache
+    rollup.clear_memory()
+    spectra_cache.clear_memory()
@@ -0,0 +1,9 @@
+"""Выбор бинов (core.binning): max пары с min задает диапазон только при min < max."""
+from core import binning
+
+
+def test_leftover_max_does_not_make_a_range():
+    point = binning.indices('L', 4, [1.2]).tolist()
+    assert binning.indices('L', 4, [1.2], [1.1]).tolist() == point   # max < min - остаток диалога
+    assert binning.indices('L', 4, [1.2], [1.2]).tolist() == point
+    assert binning.indices('L', 4, [1.1], [1.2]).tolist() == [0, 1, 2]
@@ -0,0 +1,51 @@
+"""
+Куб миссии (core.cube): строка дня, чей RBflux-файл переписан после сборки куба,
+не используется - день читается из файла, а пересборка переупаковывает строку.
+"""
+import os
+import numpy as np
+import pytest
+from scipy.io import loadmat, savemat
+
+from benchmarks import synthetic
+from core import config, cube, loader, processing
+from core.state import ApplicationState
+
+DAYS = list(range(1, 6))
+ARGS = ('RB3', 'ItalianH', 'v09', 'P3L4E4')
+
+
+@pytest.fixture
+def cubed_tree(tmp_path, cache_dirs, monkeypatch):
+    raw = str(tmp_path / 'raw')
+    synthetic.generate(raw, n_days=len(DAYS), first=DAYS[0], missing_fraction=0.0, workers=1)
+    monkeypatch.setattr(config, 'BASE_DATA_PATH', raw)
+    assert cube.build_cube(*ARGS, base=raw) is not None
+    return raw
+
+
+def _rewrite(path, factor):
+    mat = {k: v for k, v in loadmat(path).items() if not k.startswith('__')}
+    mat['Jday'] = mat['Jday'] * factor
+    savemat(path, mat, do_compression=True)
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+
+def test_rewritten_day_bypasses_cube_and_is_repacked(cubed_tree):
+    st = ApplicationState()
+    st.update_multiple(stdbinning='P3L4E4', pam_pers=list(DAYS))
+    day, path = next(iter(processing.file_manager.get_input_day_files(st, [3])))
+
+    mc, in_cube, files = processing._resolve_days(st, DAYS)
+    assert in_cube == set(DAYS) and not files
+
+    _rewrite(path, 2)
+    mc, in_cube, files = processing._resolve_days(st, DAYS)
+    assert day not in in_cube and files == {day: path}
+    assert in_cube == set(DAYS) - {day}
+
+    mc = cube.build_cube(*ARGS, base=cubed_tree)
+    j_file, _ = loader.load_flux_day(path)
+    np.testing.assert_array_equal(mc.day(day)[0], j_file)
+    assert processing._resolve_days(st, DAYS)[1] == set(DAYS)
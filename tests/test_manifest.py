@@ -0,0 +1,36 @@
+"""
+Манифест RBflux-файлов (core.manifest) находит файлы и папки версий,
+появившиеся в уже просканированных папках дней.
+"""
+import os
+import shutil
+
+from benchmarks import synthetic
+from core import manifest
+
+DAYS = [1, 2, 3]
+
+
+def test_resolve_reprobes_known_day_dirs(tmp_path, cache_dirs, monkeypatch):
+    base = str(tmp_path / 'raw')
+    synthetic.generate(base, n_days=len(DAYS), first=DAYS[0], missing_fraction=0.0, workers=1)
+    monkeypatch.setattr(manifest, 'REPROBE_SECONDS', 0.0)
+    man = manifest.get_manifest(base)
+    assert len(man.resolve('RB3', 'ItalianH', 'v09', 'P3L4E4', DAYS)) == len(DAYS)
+    assert man.resolve('RB3', 'ItalianH', 'v09', 'P3L3E3', DAYS) == []
+    assert man.resolve('RB3', 'ItalianH', 'v10', 'P3L4E4', DAYS) == []
+
+    # Файл другого биннинга в существующей папке версии и новая папка версии в папке дня
+    src = dict(man.resolve('RB3', 'ItalianH', 'v09', 'P3L4E4', [2]))[2]
+    ver_dir = os.path.dirname(src)
+    shutil.copy(src, os.path.join(ver_dir, 'RBflux_2_stdbinning_P3L3E3.mat'))
+    new_ver = os.path.join(os.path.dirname(ver_dir), 'v10')
+    os.makedirs(new_ver)
+    shutil.copy(src, os.path.join(new_ver, os.path.basename(src)))
+
+    man = manifest.get_manifest(base)
+    assert [d for d, _ in man.resolve('RB3', 'ItalianH', 'v09', 'P3L3E3', DAYS)] == [2]
+    assert [d for d, _ in man.resolve('RB3', 'ItalianH', 'v10', 'P3L4E4', DAYS)] == [2]
+    # Дополненный манифест сохранен на диск
+    manifest._MANIFESTS.clear()
+    assert [d for d, _ in manifest.get_manifest(base).resolve('RB3', 'ItalianH', 'v09', 'P3L3E3', DAYS)] == [2]
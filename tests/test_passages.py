@@ -0,0 +1,35 @@
+"""Индекс пролетов (core.passages): кэш файлов без ячеек J и отказ от подмены пролетов полным днем."""
+import numpy as np
+from scipy.io import savemat
+
+from core import mat_reader, passages
+
+
+def test_file_without_passages_is_scanned_once(tmp_path, monkeypatch):
+    path = str(tmp_path / 'RBflux_1_stdbinning_P3L4E4.mat')
+    savemat(path, {'Jday': np.ones((3, 6, 16), dtype=np.float32)}, do_compression=True)
+    calls = []
+    scan = mat_reader.scan
+    monkeypatch.setattr(mat_reader, 'scan', lambda p: calls.append(p) or scan(p))
+    passages.clear()
+    assert passages.get_index(path) is None
+    assert passages.get_index(path) is None
+    assert passages.passage_count(path) == 0
+    assert len(calls) == 1
+
+
+def test_missing_passages_give_no_data(tmp_path, caplog):
+    from core import loader
+    no_cells = str(tmp_path / 'RBflux_1_stdbinning_P3L4E4.mat')
+    savemat(no_cells, {'Jday': np.ones((3, 6, 16), dtype=np.float32)}, do_compression=True)
+    cells = np.empty((1, 2), dtype=object)
+    cells[0, 0] = cells[0, 1] = np.ones((3, 6, 16), dtype=np.float32)
+    two = str(tmp_path / 'RBflux_2_stdbinning_P3L4E4.mat')
+    savemat(two, {'Jday': np.ones((3, 6, 16), dtype=np.float32), 'J': cells}, do_compression=True)
+    passages.clear()
+    with caplog.at_level('WARNING'):
+        # Полный день (Jday) не подставляется вместо пролетов
+        assert loader.load_flux_day(no_cells, (1,)) == (None, None)
+        assert loader.load_flux_day(two, (5,)) == (None, None)
+    assert sum(r.levelname == 'WARNING' for r in caplog.records) == 2
+    assert loader.load_flux_day(two, (2,))[0] is not None
@@ -0,0 +1,55 @@
+"""
+Спектр по жесткости: перенос J(E) -> J(R) (kinematics.FluxProjection) делается для каждого дня
+до усреднения и совпадает с поштучным переносом дневных спектров.
+"""
+import numpy as np
+import pytest
+
+from benchmarks import synthetic
+from core import config, kinematics, loader, processing
+from core.reduction import SpectrumAccumulator, reduce_cells
+from core.state import ApplicationState
+
+DAYS = list(range(1, 41))  # январь 2006 (блок пирамиды) и краевые дни
+
+
+@pytest.fixture
+def flux_tree(tmp_path, cache_dirs, monkeypatch):
+    synthetic.generate(str(tmp_path / 'raw'), n_days=len(DAYS), first=DAYS[0], missing_fraction=0.0, workers=1)
+    monkeypatch.setattr(config, 'BASE_DATA_PATH', str(tmp_path / 'raw'))
+    monkeypatch.setattr(config, 'USE_MISSION_CUBE', False)
+
+
+def _state():
+    st = ApplicationState()
+    st.update_multiple(stdbinning='P3L4E4', lb=4, eb=4, pitchb=3, ror_e=2, plot_kind=1,
+                       pam_pers=list(DAYS), l=[1.2], pitch=[50, 60])
+    return st
+
+
+def _per_day_reference(st):
+    """Каждый день: свертка J(E), отдельный перенос в J(R), затем усреднение."""
+    l_idx = processing.binning.indices('L', st.lb, st.l, st.l_max)
+    p_idx = processing.binning.indices('pitch', st.pitchb, st.pitch, st.pitch_max)
+    n_e = len(config.BIN_INFO['Ecenters'][st.eb - 1]) - 1
+    proj = kinematics.table(st.eb).projection('p', n_e)
+    acc = SpectrumAccumulator()
+    for _, path in processing.file_manager.get_input_day_files(st, DAYS):
+        j, dj = loader.load_flux_day(path)
+        y, y_err, _ = reduce_cells(j[None], dj[None], l_idx, np.arange(n_e), p_idx, 'E')
+        acc.add(*proj.apply(y[0], y_err[0]))
+    return acc.result()
+
+
+@pytest.mark.parametrize('use_rollups, chunk', [(False, 256), (True, 256), (False, 3)])
+def test_rigidity_spectrum_is_projected_per_day(flux_tree, monkeypatch, use_rollups, chunk):
+    monkeypatch.setattr(config, 'USE_ROLLUPS', use_rollups)
+    monkeypatch.setattr(processing, 'PROJECTION_CHUNK', chunk)  # перенос блоками по chunk дней
+    st = _state()
+    ref_y, ref_err = _per_day_reference(st)
+    for _ in range(2):  # второй проход - из кэша свернутых дней / сохраненного блока
+        result = processing._get_spectra_data(st, 0, rigidity=True)[0]
+        mask = ~np.isnan(ref_y) & (ref_y > 0)
+        np.testing.assert_allclose(result['y'], ref_y[mask], rtol=1e-6)
+        np.testing.assert_allclose(result['y_err'], ref_err[mask], rtol=1e-6)
+    assert result['xlabel'] == "Rigidity (GV)"
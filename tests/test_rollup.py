@@ -0,0 +1,43 @@
+"""
+Пирамида агрегатов (core.rollup) должна давать тот же спектр, что и посуточное чтение,
+в том числе когда дни есть только в кубе миссии (исходные RBflux-файлы недоступны).
+"""
+import os
+import numpy as np
+import pytest
+
+from benchmarks import synthetic
+from core import config, cube, processing
+from core.state import ApplicationState
+
+DAYS = list(range(1, 41))  # январь 2006 целиком (блок-месяц) и краевые дни февраля
+
+
+@pytest.fixture
+def cube_only(tmp_path, cache_dirs, monkeypatch):
+    raw, empty = tmp_path / 'raw', tmp_path / 'unmounted'
+    empty.mkdir()
+    synthetic.generate(str(raw), n_days=len(DAYS), first=DAYS[0], missing_fraction=0.0, workers=1)
+    monkeypatch.setattr(config, 'BASE_DATA_PATH', str(raw))
+    assert cube.build_cube('RB3', 'ItalianH', 'v09', 'P3L4E4', base=str(raw)) is not None
+    # Диск с исходными файлами не подключен: остается только куб
+    monkeypatch.setattr(config, 'BASE_DATA_PATH', str(empty))
+
+
+def _spectrum(use_rollups, monkeypatch):
+    monkeypatch.setattr(config, 'USE_ROLLUPS', use_rollups)
+    st = ApplicationState()
+    st.update_multiple(stdbinning='P3L4E4', lb=4, eb=4, pitchb=3, ror_e=1, plot_kind=1,
+                       pam_pers=list(DAYS), l=[1.2], pitch=[50, 60])
+    return processing._get_spectra_data(st, 0, rigidity=False)[0]
+
+
+def test_cube_only_rollup_matches_per_day(cube_only, monkeypatch):
+    plain = _spectrum(False, monkeypatch)
+    first = _spectrum(True, monkeypatch)   # сборка блока января
+    again = _spectrum(True, monkeypatch)   # чтение сохраненного блока
+    for result in (first, again):
+        np.testing.assert_allclose(result['y'], plain['y'], rtol=1e-6)
+        np.testing.assert_allclose(result['y_err'], plain['y_err'], rtol=1e-6)
+    saved = os.listdir(next(os.scandir(config.ROLLUP_PATH)).path)
+    assert saved == ['month_2006-01.npz']
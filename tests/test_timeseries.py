@@ -0,0 +1,44 @@
+"""
+Ряд J(t) (core.timeseries) дочитывает день, если его RBflux-файл переписан во время сеанса.
+"""
+import os
+import pytest
+from scipy.io import loadmat, savemat
+
+from benchmarks import synthetic
+from core import config, processing, timeseries
+from core.state import ApplicationState
+
+DAYS = list(range(1, 11))
+
+
+@pytest.fixture
+def flux_tree(tmp_path, cache_dirs, monkeypatch):
+    synthetic.generate(str(tmp_path / 'raw'), n_days=len(DAYS), first=DAYS[0], missing_fraction=0.0, workers=1)
+    monkeypatch.setattr(config, 'BASE_DATA_PATH', str(tmp_path / 'raw'))
+    monkeypatch.setattr(config, 'USE_MISSION_CUBE', False)
+    yield
+    timeseries.clear()
+
+
+def _series(st):
+    plot = processing._get_temporal_data(st, 0)[0]
+    return dict(zip(plot['x'].tolist(), plot['y'].tolist()))
+
+
+def test_rewritten_day_is_reread(flux_tree):
+    st = ApplicationState()
+    st.update_multiple(stdbinning='P3L4E4', lb=4, eb=4, pitchb=3, plot_kind=5,
+                       pam_pers=list(DAYS), l=[1.2], e=[0.3], pitch=[50, 60])
+    before = _series(st)
+
+    day, path = next(iter(processing.file_manager.get_input_day_files(st, [5])))
+    mat = {k: v for k, v in loadmat(path).items() if not k.startswith('__')}
+    mat['Jday'] = mat['Jday'] * 2
+    savemat(path, mat, do_compression=True)
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    after = _series(st)
+    assert after[day] == pytest.approx(2 * before[day], rel=1e-5)
+    assert all(after[d] == before[d] for d in before if d != day)